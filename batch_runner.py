@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Offline batch runner for CLEARLIST persona questions.
+
+Streams a JSONL file of {"profile_id": ..., "question": ...} records (an
+optional "id" is carried through) and answers them with bounded concurrency,
+appending one result line to an output JSONL as each finishes. The output
+doubles as the checkpoint: a rerun skips every input record already answered
+there, so a crashed run resumes where it stopped, while failed requests are
+tried again. Records are recognized by their content (request, id and how
+many identical records came before), not their line number, so an input
+edited between runs never has answers attributed to the wrong lines; results
+that no longer match any record are counted as stale. Identical requests (same profile, same normalized question) are
+answered once; every later record asking the same still gets its own result
+line, a copy of the first answer marked "duplicate_of" with the request key.
+If that answer failed, the later records get its failure instead, so a rerun
+tries them again too.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from llm_client import ChatClient
+from profile_agent import ProfileAgent, ProfileManager
+from profile_fanout import ERROR, OK, TIMEOUT
+from response_cache import ResponseCache, normalize_question
+from token_counter import count_tokens
+
+DEFAULT_BATCH_CONCURRENCY = 16
+DEFAULT_BATCH_TIMEOUT = 120.0
+# Results written between fsyncs of the output file
+SYNC_EVERY = 50
+
+
+class BatchRequest(NamedTuple):
+    """One question of a batch input file."""
+    key: str
+    profile_id: str
+    question: str
+    # The record's own "id", if it had one
+    record_id: Optional[str]
+    line: int
+    # Digest of the record itself, its identity across runs
+    record: str
+
+
+def request_key(profile_id: str, question: str) -> str:
+    """Digest identifying a request; equivalent questions to one profile share it."""
+    material = json.dumps([profile_id, normalize_question(question)], ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+def record_key(key: str, record_id: Optional[str], occurrence: int) -> str:
+    """Digest identifying an input record: the occurrence-th record with this request key and id."""
+    material = json.dumps([key, record_id, occurrence], ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+def read_requests(path: Path) -> Iterator[Union[BatchRequest, Tuple[int, str]]]:
+    """Requests of a JSONL file in order, read lazily; bad lines come out as (line, error)."""
+    occurrences: Counter = Counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, f"not JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, "not a JSON object"
+                continue
+            profile_id, question = record.get('profile_id'), record.get('question')
+            if not isinstance(profile_id, str) or not isinstance(question, str) or not question.strip():
+                yield line_number, "needs string 'profile_id' and non-empty 'question'"
+                continue
+            record_id = str(record['id']) if record.get('id') is not None else None
+            key = request_key(profile_id, question)
+            occurrence = occurrences[key, record_id]
+            occurrences[key, record_id] += 1
+            yield BatchRequest(key, profile_id, question, record_id, line_number,
+                               record_key(key, record_id, occurrence))
+
+
+def _successful_results(output_path: Path) -> Iterator[Dict]:
+    """Successful results of an earlier run's output.
+
+    A last line cut short by a crash is truncated away so appending resumes
+    on a clean line.
+    """
+    if not output_path.exists():
+        return
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        if result.get('status') == OK and result.get('key'):
+            yield result
+
+
+def completed_keys(output_path: Path) -> Set[str]:
+    """Keys answered successfully in an earlier run's output."""
+    return {result['key'] for result in _successful_results(output_path)}
+
+
+def completed_records(output_path: Path) -> Set[str]:
+    """Record digests with a successful result in an earlier run's output."""
+    return {result['record'] for result in _successful_results(output_path) if result.get('record')}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class BatchStats:
+    """Counts, latencies and token totals of one batch run."""
+
+    def __init__(self):
+        self.read = 0
+        # (line number, problem) of lines that are not valid requests
+        self.invalid: List[Tuple[int, str]] = []
+        # Answered by an earlier run, per the output file
+        self.resumed = 0
+        # Earlier results matching no input record, as after editing the input
+        self.stale = 0
+        self.duplicates = 0
+        self.statuses: Dict[str, int] = {}
+        self.sources: Dict[str, int] = {}
+        self.latencies: List[float] = []
+        # Tokens of requests that reached the model
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.elapsed = 0.0
+
+    @property
+    def answered(self) -> int:
+        return self.statuses.get(OK, 0)
+
+    @property
+    def failed(self) -> int:
+        return sum(count for status, count in self.statuses.items() if status != OK)
+
+    def add(self, result: Dict):
+        self.statuses[result['status']] = self.statuses.get(result['status'], 0) + 1
+        if result['status'] != OK:
+            return
+        self.sources[result['source']] = self.sources.get(result['source'], 0) + 1
+        self.latencies.append(result['latency'])
+        if result['source'] == 'model':
+            self.prompt_tokens += result['prompt_tokens']
+            self.completion_tokens += result['completion_tokens']
+
+    def summary(self) -> Dict[str, Union[int, float, Dict[str, int]]]:
+        return {
+            "read": self.read,
+            "answered": self.answered,
+            "failed": self.failed,
+            "resumed": self.resumed,
+            "stale": self.stale,
+            "duplicates": self.duplicates,
+            "invalid": len(self.invalid),
+            "sources": dict(self.sources),
+            "seconds": self.elapsed,
+            "throughput": self.answered / self.elapsed if self.elapsed else 0.0,
+            "p50": _percentile(self.latencies, 0.50),
+            "p95": _percentile(self.latencies, 0.95),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+async def _answer(request: BatchRequest, manager: ProfileManager, client: ChatClient,
+                  response_cache: Optional[ResponseCache], timeout: Optional[float]) -> Dict:
+    result = {"key": request.key, "record": request.record, "id": request.record_id, "line": request.line,
+              "profile_id": request.profile_id, "question": request.question}
+    profile = manager.get_profile(request.profile_id)
+    if profile is None:
+        return dict(result, status=ERROR, error="profile not found")
+    # One agent per request: concurrent turns must not share turn_metrics
+    agent = ProfileAgent(profile, client, response_cache, linked_sections=manager.linked_section)
+    try:
+        response = await asyncio.wait_for(agent.complete(request.question), timeout)
+    except asyncio.TimeoutError:
+        return dict(result, status=TIMEOUT, error=f"no response within {timeout}s")
+    except Exception as e:
+        return dict(result, status=ERROR, error=str(e))
+    metrics = agent.turn_metrics[-1]
+    return dict(result, status=OK, response=response, source=metrics.source, latency=metrics.total_latency,
+                prompt_tokens=sum((metrics.prompt_tokens or {}).values()),
+                completion_tokens=count_tokens(response or ''))
+
+
+async def run_batch(input_path: Path, output_path: Path, manager: ProfileManager, client: ChatClient,
+                    concurrency: int = DEFAULT_BATCH_CONCURRENCY, timeout: Optional[float] = DEFAULT_BATCH_TIMEOUT,
+                    response_cache: Optional[ResponseCache] = None,
+                    on_result: Optional[Callable[[Dict, BatchStats], None]] = None) -> BatchStats:
+    """Answer every new request of input_path, appending results to output_path.
+
+    At most `concurrency` requests are in flight and only a few more are read
+    ahead. A first pass over the input counts the records per request key, so
+    an answer is only kept in memory until its last duplicate has been written.
+    """
+    stats = BatchStats()
+    done_records = completed_records(output_path)
+    # Request key -> records still to be written
+    remaining: Dict[str, int] = {}
+    records: Set[str] = set()
+    for item in read_requests(input_path):
+        if isinstance(item, BatchRequest):
+            records.add(item.record)
+            if item.record not in done_records:
+                remaining[item.key] = remaining.get(item.key, 0) + 1
+    stats.stale = len(done_records - records)
+    # Results still owed to duplicates: earlier runs' answers (a crash can fall
+    # between an answer and its copies), then this run's results as they come in
+    answers: Dict[str, Dict] = {result['key']: result for result in _successful_results(output_path)
+                                if result['key'] in remaining and 'duplicate_of' not in result}
+    # Key of a request in flight -> its duplicates read meanwhile
+    waiting: Dict[str, List[BatchRequest]] = {}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * max(1, concurrency))
+    start = time.perf_counter()
+
+    with open(output_path, 'a', encoding='utf-8') as out:
+        unsynced = 0
+
+        def write(result: Dict):
+            nonlocal unsynced
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+            unsynced += 1
+            if unsynced >= SYNC_EVERY:
+                os.fsync(out.fileno())
+                unsynced = 0
+
+        def settle(key: str, result: Dict):
+            """Count one record of key as written, keeping its answer while duplicates remain."""
+            remaining[key] -= 1
+            if remaining[key] > 0:
+                answers[key] = result
+            else:
+                del remaining[key]
+                answers.pop(key, None)
+
+        def write_duplicate(request: BatchRequest, result: Dict):
+            """Write a duplicate's result: a copy of the answer, or of the failure to retry later."""
+            copy = dict(result, record=request.record, id=request.record_id, line=request.line,
+                        question=request.question)
+            if result['status'] == OK:
+                write(dict(copy, duplicate_of=request.key))
+                stats.duplicates += 1
+            else:
+                write(copy)
+                stats.add(copy)
+            settle(request.key, result)
+
+        async def produce():
+            for item in read_requests(input_path):
+                stats.read += 1
+                if not isinstance(item, BatchRequest):
+                    stats.invalid.append(item)
+                elif item.record in done_records:
+                    stats.resumed += 1
+                elif item.key in answers:
+                    write_duplicate(item, answers[item.key])
+                elif item.key in waiting:
+                    waiting[item.key].append(item)
+                else:
+                    waiting[item.key] = []
+                    await queue.put(item)
+
+        async def work():
+            while True:
+                request = await queue.get()
+                try:
+                    result = await _answer(request, manager, client, response_cache, timeout)
+                    write(result)
+                    stats.add(result)
+                    settle(request.key, result)
+                    for duplicate in waiting.pop(request.key):
+                        write_duplicate(duplicate, result)
+                    if on_result is not None:
+                        on_result(result, stats)
+                finally:
+                    queue.task_done()
+
+        async def drain():
+            await produce()
+            await queue.join()
+
+        workers = [asyncio.ensure_future(work()) for _ in range(max(1, concurrency))]
+        feeder = asyncio.ensure_future(drain())
+        try:
+            # Workers only ever stop by failing (a full disk, say), which ends the run
+            await asyncio.wait([feeder, *workers], return_when=asyncio.FIRST_COMPLETED)
+            for worker in workers:
+                if worker.done():
+                    worker.result()
+            feeder.result()
+        finally:
+            for task in (feeder, *workers):
+                task.cancel()
+            await asyncio.gather(feeder, *workers, return_exceptions=True)
+            out.flush()
+            os.fsync(out.fileno())
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,779 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the CLEARLIST Profile Agent hot paths.
+Compares the current implementations against the original per-keyword versions.
+
+`python benchmark.py suite` runs a fixed set of named, timed scenarios on a
+synthetic corpus instead, writes them as JSON and compares them with a saved
+baseline, failing when any scenario regresses past a threshold:
+
+    python benchmark.py suite --save-baseline benchmarks/baseline.json
+    python benchmark.py suite --baseline benchmarks/baseline.json --json results.json
+"""
+
+import gc
+import json
+import os
+import platform
+import tempfile
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import typer
+
+import profile_agent
+from conversation_memory import ConversationMemory, ConversationStore
+from profile_agent import ProfileManager
+
+from profile_index import ProfileSearchIndex
+from profile_model import Profile
+from profile_snapshot import default_snapshot_path, write_snapshot
+from prompt_fragments import PromptFragments, category_mask
+from qa_lookup import QAMatcher
+from profile_validation import ValidationCache, default_workers, validate_data, validate_files
+from semantic_prompt_test import analyze_question_semantics as legacy_analyze_question_semantics
+from semantics import SEMANTIC_CATEGORIES, SemanticClassifier, SEMANTIC_CLASSIFIER
+from synthetic_corpus import generate_corpus, write_corpus
+from token_counter import count_tokens, get_token_counter
+
+
+def _time_per_call(func, *args, number: int = 200) -> float:
+    """Best-of-five time per call in microseconds."""
+    return min(timeit.repeat(lambda: func(*args), number=number, repeat=5)) / number * 1e6
+
+
+def bench_semantic_analysis():
+    """Compare the compiled classifier with the per-keyword substring scan."""
+    print("🧠 Semantic analysis (_analyze_question_semantics)")
+    print("-" * 50)
+
+    sentence = "I'm confused about which spiritual path to follow, how to practice devotion and meditation? "
+    for repeats in (1, 10, 100, 1000):
+        message = sentence * repeats
+        assert SEMANTIC_CLASSIFIER.score(message) == legacy_analyze_question_semantics(message)
+        legacy = _time_per_call(legacy_analyze_question_semantics, message)
+        compiled = _time_per_call(SEMANTIC_CLASSIFIER.score, message)
+        print(f"   {len(message):>7} chars: legacy {legacy:9.1f}µs   compiled {compiled:9.1f}µs   ({legacy / compiled:.1f}x)")
+
+    # Growing the keyword list should not grow the per-message cost linearly
+    grown = {category: keywords + [f"{keyword}{i}" for keyword in keywords for i in range(10)]
+             for category, keywords in SEMANTIC_CATEGORIES.items()}
+    classifier = SemanticClassifier(grown)
+    message = sentence * 100
+
+    def legacy_grown(text):
+        lower = text.lower()
+        return {category: sum(1 for keyword in keywords if keyword in lower) for category, keywords in grown.items()}
+
+    assert classifier.score(message) == legacy_grown(message)
+    legacy = _time_per_call(legacy_grown, message)
+    compiled = _time_per_call(classifier.score, message)
+    print(f"   {len(classifier.keywords)} keywords, {len(message)} chars: "
+          f"legacy {legacy:9.1f}µs   compiled {compiled:9.1f}µs   ({legacy / compiled:.1f}x)")
+
+
+def legacy_search_profiles(profiles: Dict[str, Dict], query: str) -> List[str]:
+    """The original linear-scan ProfileManager.search_profiles."""
+    query = query.lower()
+    matches = []
+    for profile_id, profile_data in profiles.items():
+        name = profile_data.get('canonical_name', '').lower()
+        alt_names = [name.lower() for name in profile_data.get('alt_names', [])]
+        keywords = [kw.lower() for kw in profile_data.get('keywords', [])]
+        if (query in name or
+                any(query in alt_name for alt_name in alt_names) or
+                any(query in keyword for keyword in keywords)):
+            matches.append(profile_id)
+    return matches
+
+
+def bench_search(count: int = 10000):
+    """Compare the inverted index with the linear scan on a synthetic corpus."""
+    print(f"\n🔍 Profile search (search_profiles) over {count} synthetic profiles")
+    print("-" * 50)
+
+    profiles = {profile['id']: profile for profile in generate_corpus(count)}
+    start = time.perf_counter()
+    index = ProfileSearchIndex()
+    for profile_id, profile in profiles.items():
+        index.add(profile_id, profile)
+    print(f"   index build: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    sample = next(iter(profiles.values()))
+    queries = [sample['canonical_name'].split()[0].lower(), "nonduality", "self-inq", "sri", "zzz-no-match"]
+    for query in queries:
+        expected = set(legacy_search_profiles(profiles, query))
+        assert expected <= set(index.search(query))
+        legacy = _time_per_call(legacy_search_profiles, profiles, query, number=5)
+        indexed = _time_per_call(index.search, query, 20, 0, number=5)
+        print(f"   {query!r:>16} ({len(expected):>5} hits): legacy {legacy / 1000:8.2f}ms   "
+              f"indexed top-20 {indexed / 1000:8.2f}ms   ({legacy / indexed:.0f}x)")
+
+
+def bench_startup(count: int = 10000):
+    """Compare eager, manifest-driven lazy and snapshot ProfileManager construction."""
+    print(f"\n📂 ProfileManager startup over {count} synthetic profiles")
+    print("-" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_dir = Path(tmp) / "profiles"
+        write_corpus(profiles_dir, count)
+        profile_agent.console.quiet = True
+        try:
+            write_snapshot(ProfileManager(str(profiles_dir), use_snapshot=False),
+                           default_snapshot_path(Path(tmp) / "manifests" / "index.json"))
+            for label, lazy, use_snapshot in (("eager", False, False), ("lazy", True, False), ("snapshot", True, True)):
+                start = time.perf_counter()
+                manager = ProfileManager(str(profiles_dir), lazy=lazy, use_snapshot=use_snapshot)
+                elapsed = time.perf_counter() - start
+                first_id = manager.list_profiles()[0]
+                start = time.perf_counter()
+                manager.get_profile(first_id)
+                first_access = time.perf_counter() - start
+                start = time.perf_counter()
+                manager.search_profiles("nonduality", limit=20)
+                first_search = time.perf_counter() - start
+                print(f"   {label:>8}: startup {elapsed * 1000:8.1f}ms   first get_profile {first_access * 1e6:7.1f}µs"
+                      f"   first search {first_search * 1000:7.1f}ms")
+        finally:
+            profile_agent.console.quiet = False
+
+
+def bench_profile_model(count: int = 10000):
+    """Compare memory and field access of raw dicts and Profile records."""
+    print(f"\n🧱 Profile model over {count} synthetic profiles")
+    print("-" * 50)
+    texts = [json.dumps(profile) for profile in generate_corpus(count)]
+
+    def measure(build):
+        gc.collect()
+        tracemalloc.start()
+        objects = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return objects, size
+
+    dicts, dict_bytes = measure(lambda: [json.loads(text) for text in texts])
+    models, model_bytes = measure(lambda: [Profile.from_dict(json.loads(text)) for text in texts])
+    print(f"   memory per profile: dict {dict_bytes / count:8.0f}B   model {model_bytes / count:8.0f}B"
+          f"   ({dict_bytes / model_bytes:.1f}x smaller)")
+
+    def dict_access():
+        for profile in dicts:
+            profile.get('affiliations', {}).get('traditions', [])
+            profile.get('provenance', {}).get('sources', [])
+
+    def model_access():
+        for profile in models:
+            profile.affiliations.traditions
+            profile.provenance.sources
+
+    dict_time = _time_per_call(dict_access, number=5)
+    model_time = _time_per_call(model_access, number=5)
+    print(f"   nested field access: dict {dict_time / count * 1000:6.1f}ns   model {model_time / count * 1000:6.1f}ns"
+          f"   ({dict_time / model_time:.1f}x)")
+
+
+def bench_validation(count: int = 10000):
+    """Time compiled schema validation: in memory, over files, in parallel and cached."""
+    print(f"\n🛡️  Schema validation over {count} synthetic profiles")
+    print("-" * 50)
+    profiles = generate_corpus(count)
+    validate_data(profiles[0])  # compile the schema outside the timings
+    start = time.perf_counter()
+    for profile in profiles:
+        validate_data(profile)
+    print(f"   in memory:            {(time.perf_counter() - start) / count * 1e6:8.1f}µs per profile")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_dir = Path(tmp) / "profiles"
+        write_corpus(profiles_dir, count)
+        paths = sorted(profiles_dir.glob("*.json"))
+        cache = ValidationCache()
+        workers = default_workers()
+        for label, kwargs in (("files, serial", {"cache": None}),
+                              (f"files, {workers} workers", {"cache": None, "workers": workers}),
+                              ("files, cold cache", {"cache": cache}),
+                              ("files, warm cache", {"cache": cache})):
+            start = time.perf_counter()
+            validate_files(paths, **kwargs)
+            elapsed = time.perf_counter() - start
+            print(f"   {label + ':':22}{elapsed * 1000:8.1f}ms  ({count / elapsed:,.0f} files/s)")
+
+
+def bench_qa_lookup(count: int = 10000):
+    """Time curated qa_pairs matching per query, for hits and misses."""
+    print(f"\n💬 QA pair lookup over {count} synthetic profiles")
+    print("-" * 50)
+    profiles = [Profile.from_dict(profile) for profile in generate_corpus(count)]
+    start = time.perf_counter()
+    matchers = [QAMatcher(profile) for profile in profiles]
+    print(f"   build:  {(time.perf_counter() - start) / count * 1e6:8.1f}µs per profile")
+
+    queries = [(matcher, matcher.questions[0].replace("What did", "What do").rstrip("?")) for matcher in matchers]
+    start = time.perf_counter()
+    hits = sum(matcher.lookup(query) is not None for matcher, query in queries)
+    print(f"   hit:    {(time.perf_counter() - start) / count * 1e6:8.1f}µs per query  ({hits / count:.0%} matched)")
+
+    start = time.perf_counter()
+    misses = sum(matcher.lookup("How should I deal with anxiety about the future?") is None for matcher in matchers)
+    print(f"   miss:   {(time.perf_counter() - start) / count * 1e6:8.1f}µs per query  ({misses / count:.0%} fell through)")
+
+
+def bench_provenance(count: int = 10000, richness: int = 3):
+    """Compare the provenance index with rescanning every profile for reliable claims."""
+    print(f"\n📚 Provenance index over {count} synthetic profiles")
+    print("-" * 50)
+    from provenance_index import ProvenanceIndex
+
+    profiles = [Profile.from_dict(profile) for profile in generate_corpus(count, richness=richness)]
+    start = time.perf_counter()
+    index = ProvenanceIndex((profile.id, profile) for profile in profiles)
+    stats = index.stats()
+    print(f"   build:  {time.perf_counter() - start:8.2f}s  ({stats['citations']} citations -> "
+          f"{stats['sources']} sources, {stats['claims']} claims)")
+
+    def rescan(min_reliability: float) -> int:
+        found = 0
+        for profile in profiles:
+            declared = {source.id: source.reliability for source in profile.provenance.sources}
+            found += sum(max((declared.get(e, 0.0) for e in claim.evidence or ()), default=0.0) >= min_reliability
+                         for claim in profile.claims or ())
+        return found
+
+    index.claims_backed_by(0.8)
+    legacy = _time_per_call(rescan, 0.8, number=3)
+    indexed = _time_per_call(index.claims_backed_by, 0.8, number=50)
+    print(f"   claims with reliability >= 0.8: rescan {legacy / 1000:8.2f}ms   index {indexed / 1000:8.3f}ms "
+          f"({legacy / indexed:.0f}x, {len(index.claims_backed_by(0.8))} claims)")
+    profile = profiles[0]
+    resolve = _time_per_call(index.resolve, profile.id, profile.claims[0].evidence[0], number=100000)
+    print(f"   resolve one evidence id: {resolve:6.2f}µs")
+
+
+def bench_prompt_ranking(count: int = 500, richness: int = 6):
+    """Compare prompt size and build time of ranked vs all-or-nothing item selection."""
+    print(f"\n📐 Prompt item ranking over {count} rich synthetic profiles (richness {richness})")
+    print("-" * 50)
+    profiles = [Profile.from_dict(profile) for profile in generate_corpus(count, richness=richness)]
+    questions = [
+        "How do I practice surrender when my mind is restless?",
+        "What is the truth about emptiness and awareness?",
+        "I'm struggling with grief, can you help me find presence?",
+        "Give me a simple meditation practice for silence.",
+    ]
+    scored = [(question, category_mask(SEMANTIC_CLASSIFIER.score(question))) for question in questions]
+
+    results = {}
+    for label, options in (("all-or-nothing", {"token_budget": 10 ** 9, "top_k": 10 ** 9}), ("ranked", {})):
+        fragments = [PromptFragments(profile, **options) for profile in profiles]
+        if label == "ranked":
+            start = time.perf_counter()
+            for fragment in fragments:
+                fragment.item_vectors
+            print(f"   item vectors:   {(time.perf_counter() - start) / count * 1e6:7.1f}µs per profile, once per version")
+        tokens = 0
+        start = time.perf_counter()
+        for fragment in fragments:
+            for question, mask in scored:
+                # Bypass memoization so every build pays for selection and assembly
+                prompt = fragment._assemble(mask, fragment.relevant_keywords(question),
+                                            fragment.select_items(mask, question))
+                tokens += prompt.total_tokens
+        elapsed = time.perf_counter() - start
+        builds = count * len(questions)
+        results[label] = tokens / builds
+        print(f"   {label + ':':16} ~{tokens / builds:5.0f} tokens per prompt   {elapsed / builds * 1e6:7.1f}µs per build")
+    print(f"   ranked prompts are {1 - results['ranked'] / results['all-or-nothing']:.0%} smaller")
+
+
+def bench_prompt_budget():
+    """Benchmark token counting and prompt assembly under input-token budgets."""
+    print("\n📏 Benchmarking Token-Budgeted Prompts")
+    print("-" * 40)
+
+    counter = get_token_counter()
+    profiles = [Profile.from_dict(data) for data in generate_corpus(500, richness=6)]
+    texts = [f"{profile.thesis} {' '.join(claim['text'] for claim in profile.claims or ())}" for profile in profiles]
+    start = time.perf_counter()
+    tokens = sum(counter._count(text) for text in texts)
+    elapsed = time.perf_counter() - start
+    print(f"   tokenizer ({counter.name}): {tokens / elapsed / 1e6:5.2f}M tokens/s uncached")
+
+    questions = [
+        "How do I practice self-inquiry when my mind keeps wandering?",
+        "What is the truth about emptiness and awareness?",
+        "I'm struggling with grief, can you help me find presence?",
+    ]
+    scores = [SEMANTIC_CLASSIFIER.score(question) for question in questions]
+    fragments = [PromptFragments(profile) for profile in profiles]
+    for fragment in fragments:
+        fragment.item_vectors
+    for budget in (None, 400, 250):
+        total = 0
+        over = 0
+        omitted = 0
+        start = time.perf_counter()
+        for fragment in fragments:
+            for question, score in zip(questions, scores):
+                fragment._prompts.clear()
+                prompt = fragment.assemble(score, question, budget)
+                total += prompt.total_tokens
+                over += budget is not None and prompt.total_tokens > budget
+                omitted += len(prompt.omitted)
+        elapsed = time.perf_counter() - start
+        builds = len(fragments) * len(questions)
+        label = f"budget {budget}" if budget else "no budget"
+        print(f"   {label + ':':12} ~{total / builds:5.0f} tokens per prompt   {elapsed / builds * 1e6:7.1f}µs per build"
+              f"   {over} over budget, {omitted} sections omitted")
+
+
+def bench_conversation_memory():
+    """Benchmark per-turn history size and bookkeeping over a long chat."""
+    print("\n💬 Benchmarking Conversation Memory")
+    print("-" * 40)
+
+    memory = ConversationMemory()
+    naive_tokens = 0
+    sent = []
+    start = time.perf_counter()
+    for turn in range(500):
+        question = f"Question {turn}: how does practice {turn % 7} relate to stillness and awareness of the mind?"
+        answer = f"Answer {turn}. " + "Rest as awareness and let the practice deepen on its own. " * 6
+        sent.append(memory.tokens)
+        memory.add_exchange(question, answer)
+        naive_tokens += count_tokens(question) + count_tokens(answer)
+    elapsed = time.perf_counter() - start
+    print(f"   500 exchanges: {elapsed / 500 * 1e6:7.1f}µs per exchange recorded")
+    print(f"   history per turn: ~{sum(sent[-100:]) / 100:.0f} tokens (max {max(sent)}) "
+          f"vs {naive_tokens} for the full transcript")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ConversationStore(Path(tmp) / "sessions.sqlite3")
+        start = time.perf_counter()
+        for _ in range(100):
+            store.save("bench", "bench-profile", memory)
+        save = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        for _ in range(100):
+            store.load("bench")
+        load = (time.perf_counter() - start) / 100
+        store.close()
+    print(f"   SQLite session save: {save * 1e3:5.2f}ms   load: {load * 1e3:5.2f}ms")
+
+
+def bench_llm_client():
+    """Benchmark the shared pooled client against one AsyncOpenAI per agent, on a local stub."""
+    print("\n🔌 Benchmarking Shared LLM Client (local stub server)")
+    print("-" * 40)
+
+    import asyncio
+    from openai import AsyncOpenAI
+    from llm_client import LLMClient
+    from stub_llm_server import StubChatServer
+
+    requests = 400
+    messages = [{"role": "user", "content": "What is silence?"}]
+
+    async def run():
+        async with StubChatServer(latency=0.005) as server:
+            start = time.perf_counter()
+            clients = [AsyncOpenAI(api_key="bench", base_url=server.base_url) for _ in range(requests)]
+            await asyncio.gather(*(client.chat.completions.create(model="stub", messages=messages)
+                                   for client in clients))
+            per_agent = time.perf_counter() - start
+            per_agent_connections = server.connections
+            for client in clients:
+                await client.close()
+
+            shared = LLMClient(api_key="bench", base_url=server.base_url, max_connections=20)
+            before = server.connections
+            start = time.perf_counter()
+            await asyncio.gather(*(shared.chat.completions.create(model="stub", messages=messages)
+                                   for _ in range(requests)))
+            pooled = time.perf_counter() - start
+            pooled_connections = server.connections - before
+            await shared.aclose()
+        return per_agent, per_agent_connections, pooled, pooled_connections
+
+    per_agent, per_agent_connections, pooled, pooled_connections = asyncio.run(run())
+    print(f"   client per agent: {requests / per_agent:7.0f} req/s   {per_agent_connections} connections")
+    print(f"   shared pool:      {requests / pooled:7.0f} req/s   {pooled_connections} connections")
+
+
+def bench_batch_runner(requests: int = 400):
+    """Benchmark the batch runner at several concurrency levels against a 50ms stub model."""
+    print("\n📦 Benchmarking Batch Runner (local stub server, 50ms per answer)")
+    print("-" * 40)
+
+    import asyncio
+    from batch_runner import run_batch
+    from llm_client import LLMClient
+    from stub_llm_server import StubChatServer
+
+    manager = ProfileManager()
+    profile_ids = manager.list_profiles()
+
+    async def run(input_path: Path, output_path: Path, concurrency: int):
+        async with StubChatServer(latency=0.05) as server:
+            client = LLMClient(api_key="bench", base_url=server.base_url, max_connections=64)
+            stats = await run_batch(input_path, output_path, manager, client, concurrency=concurrency)
+            await client.aclose()
+        return stats
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lines = [json.dumps({"profile_id": profile_ids[i % len(profile_ids)],
+                             "question": f"How should I meditate on day {i}?"}) + "\n" for i in range(requests)]
+        input_path, sample_path = Path(tmp) / "questions.jsonl", Path(tmp) / "sample.jsonl"
+        input_path.write_text(''.join(lines), encoding="utf-8")
+        # Sequential runs are slow, so they answer a tenth of the input
+        sample_path.write_text(''.join(lines[:requests // 10]), encoding="utf-8")
+        for concurrency in (1, 8, 64):
+            output_path = Path(tmp) / f"answers-{concurrency}.jsonl"
+            stats = asyncio.run(run(sample_path if concurrency == 1 else input_path, output_path, concurrency))
+            summary = stats.summary()
+            print(f"   concurrency {concurrency:3}: {summary['throughput']:6.1f} answers/s   "
+                  f"p50 {summary['p50'] * 1000:4.0f}ms  p95 {summary['p95'] * 1000:4.0f}ms")
+        # Everything is answered already, so a rerun only reads the checkpoint
+        start = time.perf_counter()
+        stats = asyncio.run(run(input_path, output_path, 64))
+        print(f"   resumed rerun: {stats.resumed} skipped in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def bench_mock_chat(turns: int = 2000):
+    """Benchmark our own per-turn overhead with the zero-latency mock backend."""
+    print("\n🎭 Benchmarking Chat Overhead (mock backend, no latency)")
+    print("-" * 40)
+
+    import asyncio
+    from llm_client import LLMClient
+    from mock_llm import MockLLM
+
+    profile_data = ProfileManager().get_profile("ramana-maharshi")
+    questions = [f"How do I practice self-inquiry when {topic}? ({i})"
+                 for i, topic in enumerate(["grieving", "restless", "working", "alone"] * (turns // 4))]
+
+    async def run(client, stream: bool) -> float:
+        agent = profile_agent.ProfileAgent(profile_data, client)
+        start = time.perf_counter()
+        for question in questions:
+            if stream:
+                async for _ in agent.respond_stream(question):
+                    pass
+            else:
+                await agent.complete(question)
+        return (time.perf_counter() - start) / len(questions) * 1e6
+
+    for label, make_client in (("mock", MockLLM), ("mock via LLMClient", lambda: LLMClient(backend=MockLLM()))):
+        complete = asyncio.run(run(make_client(), stream=False))
+        streamed = asyncio.run(run(make_client(), stream=True))
+        print(f"   {label:18}  complete {complete:7.1f} µs/turn   stream {streamed:7.1f} µs/turn")
+
+
+def bench_profile_graph(links: int = 1_000_000, profiles: int = 100_000):
+    """Time loading a large links file and querying the CSR link graph."""
+    print(f"\n🕸️  Link graph over {links:,} links between {profiles:,} profiles")
+    print("-" * 50)
+
+    import numpy as np
+    from profile_graph import OUT, ProfileGraph
+
+    rng = np.random.default_rng(0)
+    ids = [f"profile-{i}" for i in range(profiles)]
+    types = ["teacher_of", "influence", "disciple_of"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "edges.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("[\n")
+            records = zip(rng.integers(0, profiles, links).tolist(), rng.integers(0, profiles, links).tolist(),
+                          rng.integers(0, len(types), links).tolist())
+            f.write(",\n".join(json.dumps({"from": ids[a], "to": ids[b], "type": types[t]}) for a, b, t in records))
+            f.write("\n]\n")
+        start = time.perf_counter()
+        graph = ProfileGraph.load(path)
+        elapsed = time.perf_counter() - start
+    print(f"   load {elapsed:6.2f}s   adjacency {graph.nbytes / 2 ** 20:6.1f} MiB "
+          f"({graph.nbytes / max(1, graph.edge_count):.1f} bytes/link)")
+
+    sample = [ids[i] for i in rng.integers(0, profiles, 2000).tolist()]
+    for label, query in (("neighbors", lambda pid: graph.neighbors(pid)),
+                         ("typed out neighbors", lambda pid: graph.neighbors(pid, "influence", OUT)),
+                         ("lineage (3 generations)", lambda pid: graph.lineage(pid, max_depth=3)),
+                         ("2-hop", lambda pid: graph.k_hop(pid, 2))):
+        start = time.perf_counter()
+        for profile_id in sample:
+            query(profile_id)
+        print(f"   {label:24} {(time.perf_counter() - start) / len(sample) * 1e6:9.1f} µs/query")
+    start = time.perf_counter()
+    for a, b in zip(sample[:50], sample[50:100]):
+        graph.shortest_path(a, b)
+    print(f"   {'shortest path':24} {(time.perf_counter() - start) / 50 * 1e3:9.1f} ms/query")
+
+
+
+def bench_facets(count: int = 100_000):
+    """Compare facet bitmap queries with scanning the catalog."""
+    print(f"\n🗂️  Facet filters over {count:,} synthetic profiles")
+    print("-" * 50)
+    from facet_index import FacetIndex, parse_filters
+    from manifest import catalog_entry
+
+    catalog = [(profile["id"], catalog_entry(profile)) for profile in generate_corpus(count)]
+    start = time.perf_counter()
+    index = FacetIndex(catalog)
+    print(f"   build:  {time.perf_counter() - start:8.2f}s")
+
+    def scan(traditions: set, status: str, low: str, high: str) -> List[str]:
+        return [profile_id for profile_id, entry in catalog
+                if status == entry.get("status") and low <= entry.get("born", "") <= high
+                and traditions & {tradition.lower() for tradition in entry["traditions"]}]
+
+    values, ranges = parse_filters(["tradition=Zen,Sufism", "status=verified", "born=1800..1900"])
+    legacy = _time_per_call(scan, {"zen", "sufism"}, "verified", "1800-01-01", "1900-12-31", number=5)
+    indexed = _time_per_call(index.query, values, ranges, None, 0, (), number=200)
+    counted = _time_per_call(index.query, values, ranges, 20, number=50)
+    print(f"   3-facet filter: scan {legacy / 1000:8.2f}ms   bitmaps {indexed / 1000:8.3f}ms "
+          f"({legacy / indexed:.0f}x, {index.query(values, ranges).total} matches)")
+    print(f"   with facet counts: {counted / 1000:8.3f}ms")
+
+
+def bench_geo(count: int = 100_000):
+    """Compare grid radius and bounding-box queries with a vectorized scan of every place."""
+    print(f"\n🌍 Geo index over {count:,} synthetic profiles")
+    print("-" * 50)
+    import numpy as np
+    from geo_index import GeoIndex, haversine_km
+
+    rng = np.random.default_rng(0)
+    lats, lngs = rng.uniform(-60, 70, count), rng.uniform(-180, 180, count)
+    entries = [(f"profile-{i}", {"geo": [{"place": "here", "lat": lat, "lng": lng}]})
+               for i, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist()))]
+    start = time.perf_counter()
+    index = GeoIndex(entries)
+    stats = index.stats()
+    print(f"   build:  {time.perf_counter() - start:8.2f}s  ({stats['places']} places in {stats['cells']} cells)")
+
+    scan = _time_per_call(lambda: np.flatnonzero(haversine_km(12.2, 79.1, lats, lngs) <= 100), number=20)
+    for radius in (10, 100, 1000):
+        indexed = _time_per_call(index.within_radius, 12.2, 79.1, radius, number=200)
+        print(f"   within {radius:5} km: scan {scan / 1000:7.2f}ms   grid {indexed / 1000:7.3f}ms "
+              f"({scan / indexed:.0f}x, {len(index.within_radius(12.2, 79.1, radius))} profiles)")
+    bbox = _time_per_call(index.within_bbox, 5.0, 68.0, 35.0, 97.0, number=50)
+    print(f"   bounding box 30°x29°: {bbox / 1000:7.3f}ms ({len(index.within_bbox(5.0, 68.0, 35.0, 97.0))} profiles)")
+
+
+# Scenario name -> {"value": ..., "unit": ...}; rates ("/s" units) are better when higher
+SuiteResults = Dict[str, Dict[str, object]]
+
+DEFAULT_SUITE_PROFILES = 2000
+DEFAULT_REGRESSION_THRESHOLD = 0.25
+
+SUITE_QUESTIONS = [
+    "How do I practice self-inquiry when my mind keeps wandering?",
+    "What is the truth about emptiness and awareness?",
+    "I'm struggling with grief, can you help me find presence?",
+    "Which spiritual path should I follow, devotion or meditation?",
+]
+
+
+def _best_seconds(func, repeat: int = 3) -> float:
+    """Best wall time of `repeat` single calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_suite(count: int = DEFAULT_SUITE_PROFILES, turns: int = 400) -> SuiteResults:
+    """Time every suite scenario on a `count`-profile synthetic corpus."""
+    import asyncio
+    from mock_llm import MockLLM
+
+    results: SuiteResults = {}
+
+    def record(name: str, value: float, unit: str):
+        results[name] = {"value": round(value, 3), "unit": unit}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_dir = Path(tmp) / "profiles"
+        write_corpus(profiles_dir, count)
+        profile_agent.console.quiet = True
+        try:
+            write_snapshot(ProfileManager(str(profiles_dir), use_snapshot=False),
+                           default_snapshot_path(Path(tmp) / "manifests" / "index.json"))
+            for label, lazy, use_snapshot in (("eager", False, False), ("lazy", True, False), ("snapshot", True, True)):
+                elapsed = _best_seconds(lambda: ProfileManager(str(profiles_dir), lazy=lazy, use_snapshot=use_snapshot))
+                record(f"load.{label}", elapsed * 1000, "ms")
+            manager = ProfileManager(str(profiles_dir), use_snapshot=False)
+        finally:
+            profile_agent.console.quiet = False
+
+    first_id = manager.list_profiles()[0]
+    manager.search_profiles("warm-up")
+    prefix = manager.get_profile(first_id).canonical_name.split()[0].lower()[:4]
+    for label, query in (("name_prefix", prefix), ("keyword", "nonduality"), ("partial", "self-inq"),
+                         ("miss", "zzz-no-match")):
+        record(f"search.{label}", _time_per_call(manager.search_profiles, query, 20, number=200), "µs")
+
+    agent = profile_agent.ProfileAgent(manager.get_profile(first_id), MockLLM())
+    record("semantics.question", _time_per_call(agent._analyze_question_semantics, SUITE_QUESTIONS[0], number=2000), "µs")
+    record("semantics.long_message", _time_per_call(agent._analyze_question_semantics, ' '.join(SUITE_QUESTIONS) * 25,
+                                                    number=200), "µs")
+
+    fragments = agent.prompt_fragments
+
+    def cold_builds():
+        for question in SUITE_QUESTIONS:
+            # Bypass memoization so every build pays for ranking and assembly
+            fragments._prompts.clear()
+            agent._build_focused_system_prompt(question)
+
+    def warm_builds():
+        for question in SUITE_QUESTIONS:
+            agent._build_focused_system_prompt(question)
+
+    warm_builds()
+    record("prompt.build_cold", _time_per_call(cold_builds, number=200) / len(SUITE_QUESTIONS), "µs")
+    record("prompt.build_warm", _time_per_call(warm_builds, number=200) / len(SUITE_QUESTIONS), "µs")
+
+    questions = [f"{SUITE_QUESTIONS[i % len(SUITE_QUESTIONS)]} ({i})" for i in range(turns)]
+
+    async def sequential():
+        for question in questions:
+            await agent.respond(question)
+
+    async def concurrent(concurrent_agent, concurrency: int = 50):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(question):
+            async with semaphore:
+                await concurrent_agent.respond(question)
+
+        await asyncio.gather(*(one(question) for question in questions))
+
+    elapsed = _best_seconds(lambda: asyncio.run(sequential()))
+    record("respond.sequential", turns / elapsed, "turns/s")
+    # 10ms of model latency per turn, overlapped 50 at a time
+    slow_agent = profile_agent.ProfileAgent(manager.get_profile(first_id), MockLLM(latency=0.01))
+    elapsed = _best_seconds(lambda: asyncio.run(concurrent(slow_agent)))
+    record("respond.concurrent_10ms", turns / elapsed, "turns/s")
+    return results
+
+
+def _higher_is_better(unit: str) -> bool:
+    return unit.endswith("/s")
+
+
+def compare_results(results: SuiteResults, baseline: SuiteResults,
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Tuple[str, Optional[float], bool]]:
+    """(scenario, relative slowdown vs baseline or None if new, regressed) per scenario.
+
+    Slowdown is positive when a scenario got slower, whatever its unit.
+    """
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base["value"] or base["unit"] != result["unit"]:
+            rows.append((name, None, False))
+            continue
+        ratio = result["value"] / base["value"]
+        slowdown = (1 / ratio - 1) if _higher_is_better(result["unit"]) else ratio - 1
+        rows.append((name, slowdown, slowdown > threshold))
+    return rows
+
+
+def suite_report(count: int) -> Dict:
+    """Suite results with the environment they were measured in."""
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "profiles": count,
+            "tokenizer": get_token_counter().name,
+        },
+        "results": run_suite(count),
+    }
+
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command("suite")
+def suite_command(
+    profiles: int = typer.Option(DEFAULT_SUITE_PROFILES, "--profiles", "-n", help="Synthetic profiles to generate"),
+    output: Optional[Path] = typer.Option(None, "--json", help="Write the results as JSON to this file"),
+    baseline: Optional[Path] = typer.Option(None, "--baseline", help="Compare with results saved earlier"),
+    save_baseline: Optional[Path] = typer.Option(None, "--save-baseline", help="Save the results as the new baseline"),
+    threshold: float = typer.Option(DEFAULT_REGRESSION_THRESHOLD, "--threshold",
+                                    help="Slowdown (0.25 = 25%) that counts as a regression"),
+):
+    """Run the timed scenarios, optionally comparing them with a baseline."""
+    report = suite_report(profiles)
+    results = report["results"]
+    base_results = {}
+    if baseline is not None:
+        with open(baseline, "r", encoding="utf-8") as f:
+            base_results = json.load(f)["results"]
+
+    print(f"Benchmark suite over {profiles} synthetic profiles")
+    print("=" * 64)
+    rows = compare_results(results, base_results, threshold)
+    for name, slowdown, regressed in rows:
+        result = results[name]
+        line = f"   {name:26} {result['value']:12.1f} {result['unit']:8}"
+        if baseline is not None:
+            if slowdown is None:
+                line += "   (new)"
+            else:
+                was = base_results[name]["value"]
+                line += f"   was {was:10.1f}   {'slower' if slowdown > 0 else 'faster'} {abs(slowdown):5.1%}"
+                line += "   ❌ REGRESSION" if regressed else ""
+        print(line)
+
+    for path in (output, save_baseline):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"Wrote {path}")
+    regressions = [name for name, _, regressed in rows if regressed]
+    if regressions:
+        print(f"{len(regressions)} scenario(s) regressed by more than {threshold:.0%}: {', '.join(regressions)}")
+        raise typer.Exit(1)
+
+
+@app.callback(invoke_without_command=True)
+def main(ctx: typer.Context):
+    """Run all benchmarks."""
+    if ctx.invoked_subcommand is not None:
+        return
+    print("CLEARLIST Profile Agent Benchmarks")
+    print("=" * 50)
+    bench_semantic_analysis()
+    bench_search()
+    bench_startup()
+    bench_profile_model()
+    bench_validation()
+    bench_qa_lookup()
+    bench_provenance()
+    bench_prompt_ranking()
+    bench_prompt_budget()
+    bench_conversation_memory()
+    bench_llm_client()
+    bench_batch_runner()
+    bench_mock_chat()
+    bench_profile_graph()
+    bench_facets()
+    bench_geo()
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Bounded conversation memory for CLEARLIST chat sessions.
+
+The most recent messages are kept verbatim in a fixed-size ring buffer.
+Messages pushed out of the window, or out of the token budget, are folded
+into a rolling summary that is itself capped, so the history sent with each
+turn stays bounded however long the session runs. The default summarizer is
+extractive (the opening sentence of each message) and needs no model call;
+any callable with the same signature can replace it. Sessions can be saved
+to and resumed from a local SQLite file.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from token_counter import count_tokens
+
+DEFAULT_WINDOW = 12
+DEFAULT_HISTORY_TOKENS = 1000
+DEFAULT_SUMMARY_TOKENS = 250
+SNIPPET_WORDS = 30
+
+DEFAULT_SESSIONS_DB = Path(".cache") / "sessions.sqlite3"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+class Turn(NamedTuple):
+    """One message of a conversation."""
+    role: str
+    content: str
+    tokens: int
+
+
+# (summary so far, evicted turns oldest first, token limit) -> new summary
+Summarizer = Callable[[str, List[Turn], int], str]
+
+
+def default_history_budget() -> int:
+    """Token budget for history sent with each turn, from CHAT_HISTORY_TOKENS."""
+    return int(os.getenv("CHAT_HISTORY_TOKENS", str(DEFAULT_HISTORY_TOKENS)))
+
+
+def _snippet(text: str, max_words: int = SNIPPET_WORDS) -> str:
+    """Opening sentence of a message, clipped to max_words."""
+    sentence = _SENTENCE_END.split(text.strip(), 1)[0]
+    words = sentence.split()
+    return ' '.join(words[:max_words]) + (' ...' if len(words) > max_words else '')
+
+
+def summarize_turns(summary: str, turns: List[Turn], max_tokens: int) -> str:
+    """Append one line per evicted turn, then drop the oldest lines past max_tokens."""
+    lines = summary.splitlines() if summary else []
+    for turn in turns:
+        label = "User asked" if turn.role == 'user' else "You answered"
+        lines.append(f"- {label}: {_snippet(turn.content)}")
+    # Line counts are summed rather than recounting the joined text on every drop
+    line_tokens = [count_tokens(line) + 1 for line in lines]
+    total = sum(line_tokens)
+    start = 0
+    while start < len(lines) and total > max_tokens:
+        total -= line_tokens[start]
+        start += 1
+    return '\n'.join(lines[start:])
+
+
+class ConversationMemory:
+    """Recent turns in a ring buffer, older ones folded into a rolling summary."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, token_budget: Optional[int] = None,
+                 summary_tokens: int = DEFAULT_SUMMARY_TOKENS, summarizer: Summarizer = summarize_turns):
+        self.window = max(1, window)
+        self.token_budget = token_budget if token_budget is not None else default_history_budget()
+        # The summary is capped so it always leaves room for verbatim turns
+        self.summary_limit = min(summary_tokens, self.token_budget // 2)
+        self.summarizer = summarizer
+        self.summary = ''
+        self.summary_tokens = 0
+        self._ring: List[Optional[Turn]] = [None] * self.window
+        self._start = 0
+        self._size = 0
+        self._turn_tokens = 0
+        # Messages folded into the summary over the session's lifetime
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def tokens(self) -> int:
+        """Tokens of the history as sent: verbatim turns plus the summary."""
+        return self._turn_tokens + self.summary_tokens
+
+    def turns(self) -> List[Turn]:
+        """Verbatim turns, oldest first."""
+        return [self._ring[(self._start + i) % self.window] for i in range(self._size)]
+
+    def _push(self, turn: Turn):
+        self._ring[(self._start + self._size) % self.window] = turn
+        self._size += 1
+        self._turn_tokens += turn.tokens
+
+    def _pop_oldest(self) -> Turn:
+        turn = self._ring[self._start]
+        self._ring[self._start] = None
+        self._start = (self._start + 1) % self.window
+        self._size -= 1
+        self._turn_tokens -= turn.tokens
+        return turn
+
+    def add(self, role: str, content: str):
+        """Append a message, summarizing whatever falls out of the window or budget."""
+        evicted = []
+        if self._size == self.window:
+            evicted.append(self._pop_oldest())
+        self._push(Turn(role, content, count_tokens(content)))
+        while self._size and self._turn_tokens > self.token_budget - self.summary_limit:
+            evicted.append(self._pop_oldest())
+        if evicted:
+            self.evicted += len(evicted)
+            self.summary = self.summarizer(self.summary, evicted, self.summary_limit)
+            self.summary_tokens = count_tokens(self.summary)
+
+    def add_exchange(self, user_message: str, response: str):
+        """Record a question and its answer."""
+        self.add('user', user_message)
+        self.add('assistant', response)
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Chat messages to send before the next question."""
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        messages.extend({"role": turn.role, "content": turn.content} for turn in self.turns())
+        return messages
+
+    def clear(self):
+        """Forget the whole conversation, summary included."""
+        self.summary = ''
+        self.summary_tokens = 0
+        self._ring = [None] * self.window
+        self._start = 0
+        self._size = 0
+        self._turn_tokens = 0
+        self.evicted = 0
+
+
+class SessionInfo(NamedTuple):
+    """A stored session, as listed by ConversationStore.sessions()."""
+    session_id: str
+    profile_id: str
+    turns: int
+    updated_at: float
+
+
+class ConversationStore:
+    """Chat sessions persisted to a local SQLite file."""
+
+    def __init__(self, path: Path = DEFAULT_SESSIONS_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, profile_id TEXT NOT NULL, summary TEXT NOT NULL, "
+            "evicted INTEGER NOT NULL, updated_at REAL NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS turns ("
+            "session_id TEXT NOT NULL, position INTEGER NOT NULL, role TEXT NOT NULL, "
+            "content TEXT NOT NULL, tokens INTEGER NOT NULL, PRIMARY KEY (session_id, position))")
+
+    def save(self, session_id: str, profile_id: str, memory: ConversationMemory):
+        """Replace the stored state of a session with the memory's."""
+        rows = [(session_id, position, turn.role, turn.content, turn.tokens)
+                for position, turn in enumerate(memory.turns())]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                                 (session_id, profile_id, memory.summary, memory.evicted, time.time()))
+                self._db.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+                self._db.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?)", rows)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def load(self, session_id: str, **options) -> Optional[Tuple[str, ConversationMemory]]:
+        """Profile id and memory of a stored session, None if it does not exist.
+
+        Options are passed to ConversationMemory; turns are restored as saved.
+        """
+        with self._lock:
+            session = self._db.execute("SELECT profile_id, summary, evicted FROM sessions WHERE session_id = ?",
+                                       (session_id,)).fetchone()
+            if session is None:
+                return None
+            rows = self._db.execute("SELECT role, content, tokens FROM turns WHERE session_id = ? ORDER BY position",
+                                    (session_id,)).fetchall()
+        profile_id, summary, evicted = session
+        memory = ConversationMemory(**options)
+        memory.summary = summary
+        memory.summary_tokens = count_tokens(summary)
+        memory.evicted = evicted
+        # Keep the newest turns if the window has shrunk since the session was saved
+        for row in rows[-memory.window:]:
+            memory._push(Turn(*row))
+        return profile_id, memory
+
+    def sessions(self) -> List[SessionInfo]:
+        """Stored sessions, most recently updated first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT s.session_id, s.profile_id, COUNT(t.position), s.updated_at FROM sessions s "
+                "LEFT JOIN turns t ON t.session_id = s.session_id "
+                "GROUP BY s.session_id ORDER BY s.updated_at DESC").fetchall()
+        return [SessionInfo(*row) for row in rows]
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session, returning whether it existed."""
+        with self._lock:
+            self._db.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            return self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def close(self):
+        self._db.close()
+
+
+def default_sessions_path() -> Path:
+    """Session database location, from CHAT_SESSIONS_DB."""
+    return Path(os.getenv("CHAT_SESSIONS_DB", str(DEFAULT_SESSIONS_DB)))
@@ -5,10 +5,9 @@ This shows how to use the system programmatically.
 """
 
 import asyncio
-import os
 from dotenv import load_dotenv
 from profile_agent import ProfileManager, ProfileAgent
-from openai import AsyncOpenAI
+from llm_client import api_key_missing, get_llm_client
 
 # Load environment variables
 load_dotenv()
@@ -17,13 +16,13 @@ async def demo_conversation():
     """Demonstrate a conversation with a profile agent."""
     
     # Check for API key
-    if not os.getenv("OPENAI_API_KEY"):
+    if api_key_missing():
         print("Error: OPENAI_API_KEY not found. Please set it in your .env file.")
         return
     
     # Initialize components
     profile_manager = ProfileManager()
-    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_llm_client()
     
     # Get a profile (let's use Ramana Maharshi as an example)
     profile_data = profile_manager.get_profile("ramana-maharshi")
@@ -52,9 +51,19 @@ async def demo_conversation():
         response = await agent.respond(question)
         print(f"A: {response}")
         print()
-        
-        # Small delay to avoid rate limiting
-        await asyncio.sleep(1)
+
+async def demo_fan_out():
+    """Ask every persona the same question at once, printing answers as they arrive."""
+    profile_manager = ProfileManager()
+    client = get_llm_client()
+    question = "How should I deal with anxiety about the future?"
+    
+    print(f"Demo: Asking all personas \"{question}\"")
+    print("=" * 50)
+    
+    async for result in profile_manager.ask_many(question, None, client, concurrency=4, timeout=60):
+        print(f"\n{result.name} ({result.elapsed:.1f}s):")
+        print(result.response if result.status == "ok" else f"[{result.status}] {result.error}")
 
 def demo_profile_loading():
     """Demonstrate profile loading and management."""
@@ -82,9 +91,12 @@ if __name__ == "__main__":
     print("\n" + "=" * 40)
     
     # Demo conversation (requires API key)
-    if os.getenv("OPENAI_API_KEY"):
+    if not api_key_missing():
         print("\nStarting conversation demo...")
         asyncio.run(demo_conversation())
+        
+        print("\nStarting fan-out demo...")
+        asyncio.run(demo_fan_out())
     else:
         print("\nSkipping conversation demo - no API key found.")
         print("Set OPENAI_API_KEY in your .env file to test the AI conversation.")
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Spatial index over the places in CLEARLIST profiles' `geo` entries.
+
+Every place with coordinates is bucketed into a latitude/longitude grid of
+CELL_DEGREES cells. Points are kept sorted by cell in flat NumPy arrays with
+an offsets array per cell (the CSR layout of profile_graph), and cells are
+numbered row by row, so the cells a query touches in one grid row are one
+contiguous slice. A radius or bounding-box query therefore gathers at most a
+couple of slices per row of the query's bounding box and measures only those
+candidates, with one vectorized haversine over them.
+
+Queries return one hit per profile: its nearest matching place for radius
+queries, its first matching place for bounding boxes.
+"""
+
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+CELL_DEGREES = 1.0
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km from one point to arrays of points, all in degrees."""
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lats, lngs = np.radians(lats), np.radians(lngs)
+    a = np.sin((lats - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lats) * np.sin((lngs - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _check_point(lat: float, lng: float):
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        raise ValueError(f"({lat}, {lng}) is not a latitude in [-90, 90] and longitude in [-180, 180]")
+
+
+def parse_bbox(spec: str) -> Tuple[float, float, float, float]:
+    """Parse "south,west,north,east" in degrees."""
+    try:
+        south, west, north, east = (float(value) for value in spec.split(','))
+    except ValueError:
+        raise ValueError(f"invalid bounding box '{spec}': expected south,west,north,east in degrees")
+    return south, west, north, east
+
+
+def geo_places(entry: Dict) -> List[Tuple[str, float, float]]:
+    """(place, lat, lng) of the geo entries of a profile or catalog entry that have valid coordinates."""
+    places = []
+    for item in entry.get('geo') or ():
+        lat, lng = item.get('lat'), item.get('lng')
+        if isinstance(lat, (int, float)) and isinstance(lng, (int, float)) \
+                and -90 <= lat <= 90 and -180 <= lng <= 180:
+            places.append((item.get('place') or '', float(lat), float(lng)))
+    return places
+
+
+class GeoHit(NamedTuple):
+    """A profile found by a spatial query and the place that matched."""
+    profile_id: str
+    place: str
+    lat: float
+    lng: float
+    # None for bounding-box queries
+    distance_km: Optional[float]
+
+
+class _Grid(NamedTuple):
+    offsets: np.ndarray
+    lats: np.ndarray
+    lngs: np.ndarray
+    # Index into the owners list, and into the place names
+    owners: np.ndarray
+    places: np.ndarray
+
+
+class GeoIndex:
+    """Grid bucket index over profile places.
+
+    add() and remove() keep it in step with a changing corpus; the grid is
+    rebuilt on the next query after a change.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Dict]] = (), cell_degrees: float = CELL_DEGREES):
+        if not 0 < cell_degrees <= 90:
+            raise ValueError("cell_degrees must be in (0, 90]")
+        self.cell_degrees = cell_degrees
+        self.rows = math.ceil(180 / cell_degrees)
+        self.cols = math.ceil(360 / cell_degrees)
+        # profile id -> (place, lat, lng) with coordinates
+        self.places: Dict[str, List[Tuple[str, float, float]]] = {}
+        self._grid: Optional[_Grid] = None
+        self._owners: List[str] = []
+        self._names: List[str] = []
+        for profile_id, entry in entries:
+            self.add(profile_id, entry)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def __contains__(self, profile_id: str) -> bool:
+        return profile_id in self.places
+
+    def add(self, profile_id: str, entry: Dict):
+        """Index the geo places of a profile or catalog entry, replacing any earlier version."""
+        places = geo_places(entry)
+        if places:
+            self.places[profile_id] = places
+        else:
+            self.places.pop(profile_id, None)
+        self._grid = None
+
+    def remove(self, profile_id: str):
+        if self.places.pop(profile_id, None) is not None:
+            self._grid = None
+
+    def _row(self, lat) -> np.ndarray:
+        return np.minimum(((np.asarray(lat) + 90.0) // self.cell_degrees).astype(np.int64), self.rows - 1)
+
+    def _col(self, lng) -> np.ndarray:
+        return ((np.asarray(lng) + 180.0) // self.cell_degrees).astype(np.int64) % self.cols
+
+    def _build(self) -> _Grid:
+        grid = self._grid
+        if grid is not None:
+            return grid
+        owners, names, lats, lngs = [], [], [], []
+        for profile_id, places in self.places.items():
+            owners.append(profile_id)
+            for place, lat, lng in places:
+                names.append(place)
+                lats.append(lat)
+                lngs.append(lng)
+        lats = np.array(lats, dtype=np.float64)
+        lngs = np.array(lngs, dtype=np.float64)
+        point_owners = np.repeat(np.arange(len(owners), dtype=np.int32),
+                                 [len(places) for places in self.places.values()])
+        cells = self._row(lats) * self.cols + self._col(lngs)
+        order = np.argsort(cells, kind='stable')
+        offsets = np.zeros(self.rows * self.cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.rows * self.cols), out=offsets[1:])
+        self._owners, self._names = owners, names
+        grid = self._grid = _Grid(offsets, lats[order], lngs[order], point_owners[order], order)
+        return grid
+
+    def _candidates(self, grid: _Grid, row_range: Tuple[int, int], col_ranges: List[Tuple[int, int]]) -> np.ndarray:
+        """Positions of the points in the given rows and inclusive column ranges."""
+        slices = []
+        for row in range(row_range[0], row_range[1] + 1):
+            for first, last in col_ranges:
+                start, stop = grid.offsets[row * self.cols + first], grid.offsets[row * self.cols + last + 1]
+                if stop > start:
+                    slices.append(np.arange(start, stop))
+        return np.concatenate(slices) if slices else np.zeros(0, dtype=np.int64)
+
+    def _col_ranges(self, west: float, east: float) -> List[Tuple[int, int]]:
+        """Inclusive column ranges covering longitudes west..east, wrapping at the antimeridian."""
+        width = east - west
+        if width >= 360:
+            return [(0, self.cols - 1)]
+        west = (west + 180) % 360 - 180
+        east = west + width
+        if east < 180:
+            return [(int(self._col(west)), int(self._col(east)))]
+        return [(int(self._col(west)), self.cols - 1), (0, int(self._col(east - 360)))]
+
+    def _hits(self, grid: _Grid, positions: np.ndarray, distances: Optional[np.ndarray],
+              limit: Optional[int]) -> List[GeoHit]:
+        """One hit per profile from matching point positions, already in result order."""
+        _, first = np.unique(grid.owners[positions], return_index=True)
+        first.sort()
+        positions = positions[first]
+        if distances is not None:
+            distances = distances[first]
+        if limit is not None:
+            positions = positions[:limit]
+        hits = []
+        for i, position in enumerate(positions.tolist()):
+            hits.append(GeoHit(self._owners[grid.owners[position]], self._names[grid.places[position]],
+                               float(grid.lats[position]), float(grid.lngs[position]),
+                               None if distances is None else float(distances[i])))
+        return hits
+
+    def within_radius(self, lat: float, lng: float, radius_km: float, limit: Optional[int] = None) -> List[GeoHit]:
+        """Profiles with a place within radius_km of (lat, lng), nearest first."""
+        _check_point(lat, lng)
+        if radius_km < 0:
+            raise ValueError("radius_km must not be negative")
+        grid = self._build()
+        angle = radius_km / EARTH_RADIUS_KM
+        dlat = math.degrees(angle)
+        south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        # Longitude half-width of a spherical cap, unbounded when the cap reaches a pole
+        if angle >= math.pi / 2 or south <= -90 or north >= 90 or math.sin(angle) >= math.cos(math.radians(lat)):
+            col_ranges = [(0, self.cols - 1)]
+        else:
+            dlng = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+            col_ranges = self._col_ranges(lng - dlng, lng + dlng)
+        positions = self._candidates(grid, (int(self._row(south)), int(self._row(north))), col_ranges)
+        distances = haversine_km(lat, lng, grid.lats[positions], grid.lngs[positions])
+        inside = distances <= radius_km
+        positions, distances = positions[inside], distances[inside]
+        order = np.argsort(distances, kind='stable')
+        return self._hits(grid, positions[order], distances[order], limit)
+
+    def within_bbox(self, south: float, west: float, north: float, east: float,
+                    limit: Optional[int] = None) -> List[GeoHit]:
+        """Profiles with a place inside a bounding box; west > east crosses the antimeridian."""
+        _check_point(south, west)
+        _check_point(north, east)
+        if south > north:
+            raise ValueError("south must not be north of north")
+        grid = self._build()
+        col_ranges = self._col_ranges(west, east if west <= east else east + 360)
+        positions = self._candidates(grid, (int(self._row(south)), int(self._row(north))), col_ranges)
+        lats, lngs = grid.lats[positions], grid.lngs[positions]
+        inside = (lats >= south) & (lats <= north)
+        inside &= ((lngs >= west) & (lngs <= east)) if west <= east else ((lngs >= west) | (lngs <= east))
+        positions = positions[inside]
+        return self._hits(grid, positions[np.argsort(grid.owners[positions], kind='stable')], None, limit)
+
+    def stats(self) -> Dict[str, int]:
+        grid = self._build()
+        return {"profiles": len(self.places), "places": len(grid.lats),
+                "cells": int(np.count_nonzero(np.diff(grid.offsets)))}
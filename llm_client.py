@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Shared, rate-limited OpenAI client for CLEARLIST profile agents.
+
+Every agent in the process talks to the API through one LLMClient: a single
+pooled HTTP client with keep-alive connections, token buckets for requests
+and tokens per minute, jittered exponential retries on 429 and 5xx
+responses, and a circuit breaker that fails fast while the API is down.
+It exposes chat.completions.create() like AsyncOpenAI, so agents use either.
+The backend behind it is pluggable: AsyncOpenAI by default, or the local
+MockLLM when LLM_BACKEND=mock, for runs without network or API key.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import httpx
+from openai import (APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI, DefaultAsyncHttpxClient,
+                    RateLimitError)
+
+from mock_llm import MockLLM, default_mock_llm
+from token_counter import count_tokens
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_RETRIES = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 20.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 30.0
+
+# Backends selectable with LLM_BACKEND
+OPENAI_BACKEND = 'openai'
+MOCK_BACKEND = 'mock'
+
+# Breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(RuntimeError):
+    """The API failed repeatedly; requests are refused until the cooldown ends."""
+
+
+class TokenBucket:
+    """Allows `per_minute` units per minute, in bursts of up to `capacity`."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # Seconds spent waiting for the bucket, over its lifetime
+        self.waited = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` units are available and take them (FIFO across waiters)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        # A request larger than the whole bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                delay = (amount - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= amount
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; lets one trial through after `cooldown` seconds."""
+
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD, cooldown: float = DEFAULT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = 0.0
+        # When the half-open trial request started; a lost trial expires after another cooldown
+        self._trial_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.threshold:
+            return CLOSED
+        return HALF_OPEN if time.monotonic() - self.opened_at >= self.cooldown else OPEN
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        state = self.state
+        now = time.monotonic()
+        trial_pending = self._trial_started is not None and now - self._trial_started < self.cooldown
+        if state == OPEN or (state == HALF_OPEN and trial_pending):
+            remaining = max(0.0, self.cooldown - (now - self.opened_at))
+            raise CircuitOpenError(f"API circuit open after {self.failures} consecutive failures; "
+                                   f"retrying in {remaining:.0f}s")
+        if state == HALF_OPEN:
+            self._trial_started = now
+
+    def record_success(self):
+        """The API answered (even with a client error or throttling)."""
+        self.failures = 0
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started = None
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+def _retry_after(error: APIStatusError) -> Optional[float]:
+    """Seconds the server asked us to wait, if it said."""
+    value = error.response.headers.get("retry-after") if error.response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _classify(error: Exception) -> Tuple[bool, bool]:
+    """(retryable, counts against the breaker) for an API error."""
+    if isinstance(error, RateLimitError):
+        # Throttling means the API is up; the limiter and backoff deal with it
+        return True, False
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True, True
+    if isinstance(error, APIStatusError) and error.status_code >= 500:
+        return True, True
+    return False, False
+
+
+def request_tokens(params: Dict) -> int:
+    """Tokens a request counts against a TPM limit: the input plus max_tokens."""
+    prompt = sum(count_tokens(message.get("content") or "") for message in params.get("messages", ()))
+    return prompt + int(params.get("max_tokens") or 0)
+
+
+class _Completions:
+    def __init__(self, owner: "LLMClient"):
+        self._owner = owner
+
+    async def create(self, **params):
+        return await self._owner.create_completion(**params)
+
+
+class _Chat:
+    def __init__(self, owner: "LLMClient"):
+        self.completions = _Completions(owner)
+
+
+class LLMClient:
+    """Pooled AsyncOpenAI with rate limiting, retries and a circuit breaker.
+
+    The HTTP pool is created lazily per event loop, so one instance can serve
+    several asyncio.run() calls; limiter and breaker state carry over, and
+    each pool is closed when its loop shuts down. A
+    `backend` (anything with chat.completions.create, such as MockLLM)
+    replaces AsyncOpenAI.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_retries: int = DEFAULT_MAX_RETRIES,
+                 breaker: Optional[CircuitBreaker] = None, timeout: float = 60.0,
+                 backend: Optional["ChatBackend"] = None):
+        self.api_key = api_key
+        self.backend = backend
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.breaker = breaker or CircuitBreaker()
+        self.chat = _Chat(self)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self._client: Optional[AsyncOpenAI] = None
+        self._loop = None
+        # Task that closes the current pool when its loop shuts down
+        self._closer: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> "ChatBackend":
+        """The backend, or the underlying AsyncOpenAI for the running event loop."""
+        if self.backend is not None:
+            return self.backend
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Connections of a previous, now closed loop cannot be reused
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=self.timeout)
+            # Retries are ours, so the SDK's own are turned off
+            self._client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                       http_client=http_client, max_retries=0)
+            self._loop = loop
+            self._closer = loop.create_task(self._close_at_shutdown(self._client))
+        return self._client
+
+    async def _close_at_shutdown(self, client: AsyncOpenAI):
+        """Wait forever, then close client: asyncio.run() cancels leftover tasks before closing its loop."""
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            if self._client is client:
+                self._client = self._closer = None
+            await client.close()
+
+    async def create_completion(self, **params):
+        """chat.completions.create with limits, retries and the breaker applied.
+
+        Streaming requests are retried only until the stream opens; errors
+        once tokens are flowing propagate to the caller.
+        """
+        tokens = request_tokens(params) if self.token_bucket is not None else 0
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            if self.request_bucket is not None:
+                await self.request_bucket.acquire()
+            if self.token_bucket is not None:
+                await self.token_bucket.acquire(tokens)
+            self.requests += 1
+            try:
+                response = await self.client.chat.completions.create(**params)
+            except Exception as e:
+                retryable, breaker_failure = _classify(e)
+                if breaker_failure:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if not retryable or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                await asyncio.sleep(self.backoff(attempt, e))
+                attempt += 1
+                self.retries += 1
+                continue
+            self.breaker.record_success()
+            return response
+
+    @staticmethod
+    def backoff(attempt: int, error: Optional[Exception] = None) -> float:
+        """Full-jitter exponential delay, at least as long as any Retry-After."""
+        delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        if isinstance(error, APIStatusError):
+            retry_after = _retry_after(error)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, RETRY_MAX_DELAY))
+        return delay
+
+    def stats(self) -> Dict[str, Union[int, float, str]]:
+        """Request, retry and failure counters, limiter waits and breaker state."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rate_limit_wait": sum(bucket.waited for bucket in (self.request_bucket, self.token_bucket) if bucket),
+            "circuit": self.breaker.state,
+        }
+
+    async def aclose(self):
+        """Close the connection pool of the current loop."""
+        closer, client = self._closer, self._client
+        self._closer = self._client = None
+        if closer is not None and not closer.done() and self._loop is asyncio.get_running_loop():
+            closer.cancel()
+            await asyncio.gather(closer, return_exceptions=True)
+        elif client is not None:
+            await client.close()
+
+
+# What LLMClient can send requests through
+ChatBackend = Union[AsyncOpenAI, MockLLM]
+# Anything agents can call chat.completions.create() on
+ChatClient = Union[AsyncOpenAI, LLMClient, MockLLM]
+
+_shared_clients: Dict[Tuple[str, Optional[str], Optional[str]], LLMClient] = {}
+# Fraction of the OPENAI_RPM/OPENAI_TPM budget this process may use
+_rate_share = 1.0
+
+
+def llm_backend() -> str:
+    """Backend named by LLM_BACKEND: 'openai' (the default) or 'mock'."""
+    backend = os.getenv("LLM_BACKEND", OPENAI_BACKEND).strip().lower() or OPENAI_BACKEND
+    if backend not in (OPENAI_BACKEND, MOCK_BACKEND):
+        raise ValueError(f"LLM_BACKEND must be '{OPENAI_BACKEND}' or '{MOCK_BACKEND}', not '{backend}'")
+    return backend
+
+
+def api_key_missing() -> bool:
+    """Whether the configured backend needs an OPENAI_API_KEY that is not set."""
+    return llm_backend() == OPENAI_BACKEND and not os.getenv("OPENAI_API_KEY")
+
+
+def _optional_float(name: str) -> Optional[float]:
+    value = float(os.getenv(name, "0"))
+    return value if value > 0 else None
+
+
+def share_rate_limits(processes: int):
+    """Give this process 1/processes of the OPENAI_RPM and OPENAI_TPM budget.
+
+    For processes that call the same API side by side, such as forked server
+    workers; applies to clients created afterwards.
+    """
+    global _rate_share
+    _rate_share = 1.0 / max(1, processes)
+
+
+def _rate_limit(name: str) -> Optional[float]:
+    value = _optional_float(name)
+    return value * _rate_share if value is not None else None
+
+
+def get_llm_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> LLMClient:
+    """The process-wide client for an API key and base URL, configured from the environment.
+
+    LLM_BACKEND picks the backend; OPENAI_MAX_CONNECTIONS sizes the pool;
+    OPENAI_RPM and OPENAI_TPM cap requests and tokens per minute (0 =
+    unlimited), shared out by share_rate_limits(); OPENAI_MAX_RETRIES, OPENAI_CIRCUIT_THRESHOLD and
+    OPENAI_CIRCUIT_COOLDOWN tune failure handling.
+    """
+    backend = llm_backend()
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+    key = (backend, api_key, base_url)
+    client = _shared_clients.get(key)
+    if client is None:
+        client = LLMClient(
+            backend=default_mock_llm() if backend == MOCK_BACKEND else None,
+            api_key=api_key,
+            base_url=base_url,
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS))),
+            requests_per_minute=_rate_limit("OPENAI_RPM"),
+            tokens_per_minute=_rate_limit("OPENAI_TPM"),
+            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", str(DEFAULT_MAX_RETRIES))),
+            breaker=CircuitBreaker(int(os.getenv("OPENAI_CIRCUIT_THRESHOLD", str(DEFAULT_BREAKER_THRESHOLD))),
+                                   float(os.getenv("OPENAI_CIRCUIT_COOLDOWN", str(DEFAULT_BREAKER_COOLDOWN)))),
+        )
+        _shared_clients[key] = client
+    return client
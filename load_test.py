@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Load test for `profile_agent.py serve` against a local mock LLM.
+
+Starts the profile server as a subprocess (unless --url points at a running
+server), answering either through the stub chat completions server or the
+in-process mock backend, sends chat requests from many concurrent clients,
+and reports throughput and latency percentiles. No API key or network
+access is needed.
+
+    python load_test.py --requests 1000 --concurrency 100 --workers 4 --stream
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+import typer
+
+QUESTIONS = [
+    "How do I practice self-inquiry?",
+    "What is the nature of the Self?",
+    "How can I find peace when I am grieving?",
+    "What is the truth about the unity of all religions?",
+    "How should I meditate when my mind is restless?",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def _wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not become ready within {timeout}s")
+            await asyncio.sleep(0.2)
+
+
+async def _one_request(session: aiohttp.ClientSession, url: str, profile_id: str, question: str,
+                       stream: bool) -> Dict:
+    start = time.perf_counter()
+    first_byte: Optional[float] = None
+    try:
+        async with session.post(f"{url}/profiles/{profile_id}/chat",
+                                json={"message": question, "stream": stream}) as response:
+            if response.status != 200:
+                await response.read()
+                return {"ok": False, "status": response.status}
+            if stream:
+                async for line in response.content:
+                    if first_byte is None and line.startswith(b"data:"):
+                        first_byte = time.perf_counter() - start
+                    if line.startswith(b"event: error"):
+                        return {"ok": False, "status": "stream error"}
+            else:
+                await response.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return {"ok": False, "status": type(e).__name__}
+    return {"ok": True, "latency": time.perf_counter() - start, "ttfb": first_byte}
+
+
+async def run_load(url: str, requests: int, concurrency: int, stream: bool) -> Dict:
+    """Send `requests` chats with at most `concurrency` in flight; returns summary statistics."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{url}/profiles", params={"limit": 1000}) as response:
+            profile_ids = [profile["id"] for profile in (await response.json())["profiles"]]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(i: int) -> Dict:
+            async with semaphore:
+                # Unique questions keep the response cache from answering
+                question = f"{QUESTIONS[i % len(QUESTIONS)]} (#{i})"
+                return await _one_request(session, url, profile_ids[i % len(profile_ids)], question, stream)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = [result["latency"] for result in results if result["ok"]]
+    first_bytes = [result["ttfb"] for result in results if result["ok"] and result["ttfb"] is not None]
+    errors: Dict[str, int] = {}
+    for result in results:
+        if not result["ok"]:
+            errors[str(result["status"])] = errors.get(str(result["status"]), 0) + 1
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "stream": stream,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": _percentile(latencies, 0.50),
+        "p95": _percentile(latencies, 0.95),
+        "p99": _percentile(latencies, 0.99),
+        "ttfb_p50": _percentile(first_bytes, 0.50) if first_bytes else None,
+        "errors": errors,
+    }
+
+
+def main(
+    requests: int = typer.Option(500, "--requests", "-n", help="Chat requests to send"),
+    concurrency: int = typer.Option(50, "--concurrency", "-c", help="Requests in flight"),
+    workers: int = typer.Option(1, "--workers", "-w", help="Server worker processes"),
+    stream: bool = typer.Option(False, "--stream/--no-stream", help="Use the SSE chat endpoint"),
+    latency: float = typer.Option(0.05, "--llm-latency", help="Mock LLM seconds before answering"),
+    backend: str = typer.Option("stub", "--backend", help="'stub' (HTTP stub server) or 'mock' (in-process)"),
+    url: Optional[str] = typer.Option(None, "--url", help="Test a running server instead of starting one"),
+    profiles_dir: str = typer.Option("profiles", "--profiles-dir", help="Profiles the started server loads"),
+    as_json: bool = typer.Option(False, "--json", help="Print the results as JSON"),
+):
+    """Load-test the profile HTTP server against a local mock LLM."""
+    processes = []
+    try:
+        if url is None:
+            server_port = _free_port()
+            env = dict(os.environ, OPENAI_API_KEY="load-test", RESPONSE_CACHE_SIZE="0", OPENAI_RPM="0", OPENAI_TPM="0")
+            if backend == "mock":
+                env.update(LLM_BACKEND="mock", MOCK_LLM_LATENCY=str(latency), MOCK_LLM_CHUNK_DELAY="0")
+            else:
+                llm_port = _free_port()
+                processes.append(subprocess.Popen(
+                    [sys.executable, "stub_llm_server.py", "--port", str(llm_port), "--latency", str(latency),
+                     "--chunk-delay", "0"], stdout=subprocess.DEVNULL))
+                env.update(LLM_BACKEND="openai", OPENAI_BASE_URL=f"http://127.0.0.1:{llm_port}/v1")
+            processes.append(subprocess.Popen(
+                [sys.executable, "profile_agent.py", "serve", "--port", str(server_port), "--workers", str(workers),
+                 "--profiles-dir", profiles_dir], env=env, stdout=subprocess.DEVNULL))
+            url = f"http://127.0.0.1:{server_port}"
+        asyncio.run(_wait_ready(url))
+        results = asyncio.run(run_load(url, requests, concurrency, stream))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait(timeout=30)
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['requests']} {'streamed ' if stream else ''}chats, {concurrency} concurrent, "
+          f"{workers} worker(s): {results['throughput']:.0f} req/s")
+    print(f"latency p50 {results['p50'] * 1000:.0f}ms  p95 {results['p95'] * 1000:.0f}ms  "
+          f"p99 {results['p99'] * 1000:.0f}ms"
+          + (f"  first event p50 {results['ttfb_p50'] * 1000:.0f}ms" if results['ttfb_p50'] is not None else ""))
+    if results["errors"]:
+        print(f"errors: {results['errors']}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Manifest tooling for CLEARLIST profiles.
+Reads and regenerates manifests/index.json, the catalog of profiles and their content hashes.
+
+Usage: python manifest.py [profiles_dir] [manifest_path]
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from geo_index import geo_places
+
+DEFAULT_MANIFEST = Path("manifests") / "index.json"
+
+# Profile fields copied into each manifest entry so the catalog can be listed
+# and searched without parsing profile bodies
+CATALOG_FIELDS = ['canonical_name', 'alt_names', 'keywords']
+
+
+def content_hash(data: bytes) -> str:
+    """Hash in the manifest's `sha256-<hex>` format."""
+    return f"sha256-{hashlib.sha256(data).hexdigest()}"
+
+
+def file_hash(path: Path) -> str:
+    """Content hash of a file on disk."""
+    with open(path, 'rb') as f:
+        return content_hash(f.read())
+
+
+def default_manifest_path(profiles_dir: Path) -> Path:
+    """The manifest that sits next to a profiles directory."""
+    return Path(profiles_dir).parent / DEFAULT_MANIFEST
+
+
+def load_manifest(manifest_path: Path) -> Optional[Dict[str, Dict]]:
+    """Load manifest entries keyed by profile id, or None if there is no manifest."""
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {entry['id']: entry for entry in manifest.get('profiles', [])}
+
+
+def catalog_entry(profile_data: Dict) -> Dict:
+    """The listing, search and facet fields of a profile."""
+    entry = {field: profile_data[field] for field in CATALOG_FIELDS if field in profile_data}
+    affiliations = profile_data.get('affiliations', {})
+    entry["traditions"] = affiliations.get('traditions', [])
+    for field in ('schools', 'orders'):
+        if affiliations.get(field):
+            entry[field] = affiliations[field]
+    if profile_data.get('status'):
+        entry["status"] = profile_data['status']
+    life = profile_data.get('life', {})
+    for field in ('born', 'died'):
+        date = life.get(field, {}).get('date')
+        if date:
+            entry[field] = date
+    last_reviewed = profile_data.get('provenance', {}).get('last_reviewed')
+    if last_reviewed:
+        entry["last_reviewed"] = last_reviewed
+    geo = [{"place": place, "lat": lat, "lng": lng} for place, lat, lng in geo_places(profile_data)]
+    if geo:
+        entry["geo"] = geo
+    return entry
+
+
+def manifest_entry(profile_file: Path, profile_data: Dict, data: bytes) -> Dict:
+    """Build the manifest entry for one profile file."""
+    entry = {
+        "id": profile_data.get('id', profile_file.stem),
+        "hash": content_hash(data),
+        "file": profile_file.name,
+    }
+    entry.update(catalog_entry(profile_data))
+    return entry
+
+
+def build_manifest(profiles_dir: Path) -> List[Dict]:
+    """Build manifest entries for every profile file in a directory."""
+    entries = []
+    for profile_file in sorted(Path(profiles_dir).glob("*.json")):
+        data = profile_file.read_bytes()
+        entries.append(manifest_entry(profile_file, json.loads(data), data))
+    return entries
+
+
+def write_manifest(entries: List[Dict], manifest_path: Path):
+    """Write manifest entries to disk."""
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({"profiles": entries}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main():
+    """Regenerate the manifest from the profiles directory."""
+    profiles_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("profiles")
+    manifest_path = Path(sys.argv[2]) if len(sys.argv) > 2 else default_manifest_path(profiles_dir)
+    entries = build_manifest(profiles_dir)
+    write_manifest(entries, manifest_path)
+    print(f"✅ Wrote {len(entries)} profiles to {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Deterministic in-process chat completions backend for offline runs.
+
+MockLLM answers chat.completions.create() like AsyncOpenAI, without network
+or API key: the same request always gets the same answer, and latency,
+streaming chunk timing and failures (5xx and 429 with Retry-After) are drawn
+from a seeded random generator. Errors are the openai SDK's own exception
+types, so retries, rate limiting and the circuit breaker behave as they
+would against the real API. Select it for the whole process with
+LLM_BACKEND=mock; MOCK_LLM_* variables tune it.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import random
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
+
+import httpx
+from openai import APIStatusError, InternalServerError, RateLimitError
+
+from token_counter import count_tokens
+
+DEFAULT_REPLY_WORDS = 60
+
+# Words mock answers are made of
+LEXICON = (
+    "awareness", "silence", "presence", "the", "Self", "is", "always", "here", "and", "now", "seek", "within",
+    "mind", "stillness", "peace", "grace", "surrender", "truth", "heart", "love", "devotion", "inquiry",
+    "who", "am", "I", "practice", "patience", "attention", "breath", "light", "be", "as", "you", "are",
+    "there", "is", "nothing", "to", "attain", "only", "what", "remains", "when", "thoughts", "subside",
+)
+
+
+class LatencyDistribution:
+    """Seconds to wait, drawn from a named distribution.
+
+    Specs: "0.2" or "fixed:0.2", "uniform:LOW,HIGH", "normal:MEAN,STDDEV",
+    "lognormal:MEDIAN,SIGMA" and "exponential:MEAN". Draws never go below 0.
+    """
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, kind: str = "fixed", *params: float):
+        if kind not in self.KINDS or len(params) != self.KINDS[kind]:
+            raise ValueError(f"latency '{kind}' takes {self.KINDS.get(kind, '?')} parameters, got {len(params)}")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: Union[str, float, "LatencyDistribution"]) -> "LatencyDistribution":
+        if isinstance(spec, LatencyDistribution):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls("fixed", float(spec))
+        kind, _, params = spec.strip().partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        return cls(kind, *(float(param) for param in params.split(",")))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        else:
+            value = rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{param:g}' for param in self.params)}"
+
+
+def mock_reply(params: Dict, words: int = DEFAULT_REPLY_WORDS) -> str:
+    """Answer determined by the request's messages alone."""
+    messages = params.get("messages") or [{}]
+    digest = hashlib.sha256(repr([(m.get("role"), m.get("content")) for m in messages]).encode("utf-8")).digest()
+    rng = random.Random(digest)
+    text = ' '.join(rng.choice(LEXICON) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _status_error(status: int, retry_after: Optional[float]) -> APIStatusError:
+    request = httpx.Request("POST", "http://mock-llm/v1/chat/completions")
+    headers = {"retry-after": f"{retry_after:g}"} if status == 429 and retry_after is not None else {}
+    response = httpx.Response(status, headers=headers, request=request)
+    error_type = RateLimitError if status == 429 else InternalServerError if status >= 500 else APIStatusError
+    return error_type(f"mock failure {status}", response=response, body=None)
+
+
+class MockLLM:
+    """Chat completions answered locally with configurable timing and failures.
+
+    `latency` is the time to the first chunk (the whole answer when not
+    streaming); `chunk_delay` separates streamed chunks of `chunk_words`
+    words. Each request fails with a 429 with probability `rate_limit_rate`
+    and with a 5xx with probability `error_rate`; `failures` scripts status
+    codes for the next requests first.
+    """
+
+    def __init__(self, latency: Union[str, float, LatencyDistribution] = 0.0,
+                 chunk_delay: Union[str, float, LatencyDistribution] = 0.0, chunk_words: int = 1,
+                 reply_words: int = DEFAULT_REPLY_WORDS, reply: Optional[Callable[[Dict], str]] = None,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, failures: Iterable[int] = (),
+                 retry_after: Optional[float] = 1.0, seed: int = 0):
+        self.latency = LatencyDistribution.parse(latency)
+        self.chunk_delay = LatencyDistribution.parse(chunk_delay)
+        self.chunk_words = max(1, chunk_words)
+        self.reply_words = reply_words
+        self.reply = reply
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.failures = deque(failures)
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.requests = 0
+        self.errors = 0
+
+    def _failure(self) -> Optional[int]:
+        if self.failures:
+            return self.failures.popleft()
+        draw = self.rng.random()
+        if draw < self.rate_limit_rate:
+            return 429
+        if draw < self.rate_limit_rate + self.error_rate:
+            return 503 if draw < self.rate_limit_rate + self.error_rate / 2 else 500
+        return None
+
+    async def create(self, stream: bool = False, **params):
+        """chat.completions.create: a completion, or an async iterator of chunks when streaming."""
+        self.requests += 1
+        status = self._failure()
+        if status == 429:
+            # Throttling is answered at once, before any work is done
+            self.errors += 1
+            raise _status_error(status, self.retry_after)
+        await asyncio.sleep(self.latency.sample(self.rng))
+        if status is not None:
+            self.errors += 1
+            raise _status_error(status, self.retry_after)
+
+        content = self.reply(params) if self.reply is not None else mock_reply(params, self.reply_words)
+        model = params.get("model", "mock")
+        completion_id = f"chatcmpl-mock-{self.requests}"
+        if stream:
+            return self._stream(completion_id, model, content)
+        prompt_tokens = sum(count_tokens(message.get("content") or "") for message in params.get("messages", ()))
+        completion_tokens = count_tokens(content)
+        return SimpleNamespace(
+            id=completion_id, object="chat.completion", created=int(time.time()), model=model,
+            choices=[SimpleNamespace(index=0, finish_reason="stop",
+                                     message=SimpleNamespace(role="assistant", content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                  total_tokens=prompt_tokens + completion_tokens))
+
+    def _pieces(self, content: str) -> List[str]:
+        words = content.split(" ")
+        return [(" " if start else "") + " ".join(words[start:start + self.chunk_words])
+                for start in range(0, len(words), self.chunk_words)]
+
+    async def _stream(self, completion_id: str, model: str, content: str) -> AsyncIterator:
+        def chunk(delta: SimpleNamespace, finish_reason: Optional[str] = None) -> SimpleNamespace:
+            return SimpleNamespace(id=completion_id, object="chat.completion.chunk", model=model,
+                                   choices=[SimpleNamespace(index=0, delta=delta, finish_reason=finish_reason)])
+
+        # Like the real API: a role-only chunk first and an empty one with the finish reason last
+        yield chunk(SimpleNamespace(role="assistant", content=None))
+        for i, piece in enumerate(self._pieces(content)):
+            if i:
+                await asyncio.sleep(self.chunk_delay.sample(self.rng))
+            yield chunk(SimpleNamespace(role=None, content=piece))
+        yield chunk(SimpleNamespace(role=None, content=None), finish_reason="stop")
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "errors": self.errors}
+
+
+def default_mock_llm() -> MockLLM:
+    """Mock configured from MOCK_LLM_LATENCY, MOCK_LLM_CHUNK_DELAY, MOCK_LLM_ERROR_RATE,
+    MOCK_LLM_429_RATE, MOCK_LLM_REPLY_WORDS and MOCK_LLM_SEED."""
+    return MockLLM(
+        latency=os.getenv("MOCK_LLM_LATENCY", "0"),
+        chunk_delay=os.getenv("MOCK_LLM_CHUNK_DELAY", "0"),
+        reply_words=int(os.getenv("MOCK_LLM_REPLY_WORDS", str(DEFAULT_REPLY_WORDS))),
+        error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+        rate_limit_rate=float(os.getenv("MOCK_LLM_429_RATE", "0")),
+        seed=int(os.getenv("MOCK_LLM_SEED", "0")),
+    )
@@ -7,132 +7,92 @@ Uses profile data to create AI agents that act as the profile personas.
 import json
 import os
 from pathlib import Path
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, List, MutableMapping, NamedTuple, Optional, Tuple, Union
 import asyncio
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
 from rich.prompt import Prompt, Confirm
 import typer
 
+from conversation_memory import ConversationMemory, ConversationStore, default_sessions_path
+from facet_index import FacetIndex, FacetResult, parse_filters
+from geo_index import GeoHit, GeoIndex, parse_bbox
+from llm_client import ChatClient, api_key_missing, get_llm_client
+from manifest import catalog_entry, content_hash, default_manifest_path, load_manifest
+from profile_fanout import DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT, ERROR, OK, PersonaResult, ask_many
+from profile_graph import BOTH, DIRECTIONS, OUT, ProfileGraph, default_edges_path
+from profile_index import ProfileSearchIndex
+from profile_model import Profile, as_profile
+from profile_snapshot import ProfileSnapshot, SnapshotProfiles, default_snapshot_path, open_fresh_snapshot, write_snapshot
+from profile_store import DEFAULT_CACHE_SIZE, LazyProfiles
+from profile_validation import EDGES_SCHEMA, PROFILE_SCHEMA, ValidationCache, default_workers, validate_bytes, validate_files
+from profile_watcher import ProfileWatcher
+from prompt_fragments import (AssembledPrompt, LINKED_PROFILES_LIMIT, LinkedSection, default_prompt_budget,
+                              get_prompt_fragments, invalidate_prompt_fragments, render_linked_section)
+from provenance_index import ProvenanceIndex, default_bibliography_path
+from qa_lookup import default_threshold as default_qa_threshold, get_qa_matcher, invalidate_qa_matcher
+from response_cache import ResponseCache, cache_key, default_response_cache
+from semantics import SEMANTIC_CLASSIFIER
+
 # Load environment variables
 load_dotenv()
 
 console = Console()
 
+class TurnMetrics(NamedTuple):
+    """Latency of one response."""
+    # Seconds until the first content token (the whole answer when not streamed), None if none arrived
+    time_to_first_token: Optional[float]
+    total_latency: float
+    chunks: int
+    characters: int
+    # Where the answer came from: the model, the response cache or curated qa_pairs
+    source: str = 'model'
+    # Input tokens per system prompt section (plus 'history' for earlier turns), None when no prompt was built
+    prompt_tokens: Optional[Dict[str, int]] = None
+
 class ProfileAgent:
     """AI agent that acts as a specific profile persona with semantic focusing."""
     
-    def __init__(self, profile_data: Dict, client: AsyncOpenAI):
-        self.profile_data = profile_data
+    def __init__(self, profile_data: Union[Profile, Dict], client: ChatClient,
+                 response_cache: Optional[ResponseCache] = None, qa_threshold: Optional[float] = None,
+                 prompt_budget: Optional[int] = None,
+                 linked_sections: Optional[Callable[[str], Optional[LinkedSection]]] = None):
+        self.profile_data = as_profile(profile_data)
         self.client = client
-        self.name = profile_data.get("canonical_name", "Unknown")
-        self.id = profile_data.get("id", "unknown")
+        self.response_cache = response_cache
+        self.name = self.profile_data.canonical_name or "Unknown"
+        self.id = self.profile_data.id or "unknown"
+        # Static prompt sections are rendered once per profile version
+        self.prompt_fragments = get_prompt_fragments(self.profile_data)
+        # Curated qa_pairs answer close matches without calling the model
+        self.qa_matcher = get_qa_matcher(self.profile_data)
+        self.qa_threshold = qa_threshold if qa_threshold is not None else default_qa_threshold()
+        # Input-token budget for the system prompt, and the last prompt built
+        self.prompt_budget = prompt_budget if prompt_budget is not None else default_prompt_budget()
+        self.last_prompt: Optional[AssembledPrompt] = None
+        # Cached synopses of linked profiles by profile id (ProfileManager.linked_section)
+        self.linked_sections = linked_sections
+        # Latency of every answered turn, oldest first
+        self.turn_metrics: List[TurnMetrics] = []
     
     def _analyze_question_semantics(self, user_message: str) -> Dict[str, int]:
         """Analyze what aspects of the profile are most relevant to the question."""
-        
-        semantic_categories = {
-            'practice': ['practice', 'method', 'technique', 'meditation', 'inquiry', 'how to', 'steps', 'worship', 'devotion'],
-            'philosophy': ['philosophy', 'theory', 'understanding', 'concept', 'what is', 'meaning', 'teach', 'view', 'belief'],
-            'personal_guidance': ['help', 'struggle', 'difficulty', 'problem', 'advice', 'support', 'confused', 'lost', 'should'],
-            'tradition': ['tradition', 'lineage', 'school', 'approach', 'method', 'religion', 'faith', 'path'],
-            'compassion': ['compassion', 'kindness', 'gentle', 'care', 'support', 'struggle', 'help', 'confused'],
-            'directness': ['direct', 'immediate', 'now', 'clear', 'straightforward', 'simple', 'give me'],
-            'spiritual_experience': ['experience', 'ecstasy', 'divine', 'god', 'spiritual', 'realization', 'enlightenment'],
-            'religious_unity': ['religion', 'religions', 'unity', 'different', 'faiths', 'paths', 'traditions']
-        }
-        
-        scores = {}
-        user_lower = user_message.lower()
-        
-        for category, keywords in semantic_categories.items():
-            score = sum(1 for keyword in keywords if keyword in user_lower)
-            scores[category] = score
-        
-        return scores
+        return SEMANTIC_CLASSIFIER.score(user_message)
         
     def _build_focused_system_prompt(self, user_message: str) -> str:
         """Build a system prompt focused on the most relevant aspects of the profile."""
-        
-        profile = self.profile_data
         semantic_scores = self._analyze_question_semantics(user_message)
-        
-        # Base prompt
-        prompt = f"""You are {profile['canonical_name']} ({profile.get('pronunciation', '')}).
-
-CORE TEACHING: {profile.get('thesis', '')}
-
-TRADITION: {', '.join(profile.get('affiliations', {}).get('traditions', []))}
-"""
-        
-        # Adaptive content selection based on question relevance
-        
-        # If practice-related question, emphasize practices
-        if semantic_scores.get('practice', 0) > 0:
-            prompt += "\n🎯 FOCUS ON PRACTICAL METHODS:\n"
-            for practice in profile.get('practice', []):
-                prompt += f"\nPRACTICE - {practice['name']}:\n"
-                for step in practice.get('steps', []):
-                    prompt += f"- {step}\n"
-        
-        # If philosophy-related, emphasize claims and principles
-        if semantic_scores.get('philosophy', 0) > 0:
-            prompt += "\n🧠 CORE PHILOSOPHICAL INSIGHTS:\n"
-            for claim in profile.get('claims', []):
-                prompt += f"- {claim['text']}\n"
-        
-        # If personal guidance needed, emphasize care notes and compassion
-        if semantic_scores.get('personal_guidance', 0) > 0:
-            prompt += "\n💝 GUIDANCE APPROACH:\n"
-            care_notes = profile.get('care_notes', [])
-            if care_notes:
-                prompt += f"Remember: {', '.join(care_notes)}\n"
-            prompt += "Respond with extra compassion and practical support.\n"
-        
-        # Spiritual experience guidance
-        if semantic_scores.get('spiritual_experience', 0) > 0:
-            prompt += "\n🌟 SPIRITUAL EXPERIENCE GUIDANCE:\n"
-            prompt += "Emphasize direct experience over intellectual understanding.\n"
-            prompt += "Focus on practical steps toward spiritual realization.\n"
-        
-        # Religious unity perspective
-        if semantic_scores.get('religious_unity', 0) > 0:
-            prompt += "\n🤝 RELIGIOUS UNITY PERSPECTIVE:\n"
-            prompt += "Emphasize your teachings on the unity of all faiths.\n"
-            prompt += "Highlight how different paths lead to the same divine reality.\n"
-        
-        # Adaptive tone setting
-        if semantic_scores.get('compassion', 0) > 0:
-            prompt += "\n🎭 TONE: Gentle, compassionate, supportive"
-        elif semantic_scores.get('directness', 0) > 0:
-            prompt += "\n🎭 TONE: Direct, clear, immediate"
-        else:
-            prompt += "\n🎭 TONE: Balanced, authentic to your teaching style"
-        
-        # Contextual focusing
-        relevant_keywords = []
-        for keyword in profile.get('keywords', []):
-            if keyword.lower() in user_message.lower():
-                relevant_keywords.append(keyword)
-        
-        if relevant_keywords:
-            prompt += f"\n🔍 FOCUS ON: {', '.join(relevant_keywords)}"
-        
-        prompt += f"""
-
-RESPOND AS {profile['canonical_name']}:
-- Use your authentic voice and teaching style
-- Draw from your core insights and methods
-- Stay true to your tradition and approach
-- **FOCUS YOUR RESPONSE** on the aspects most relevant to this question
-- If asked about something outside your expertise, acknowledge it honestly
-
-Remember: You are speaking from your lived experience and understanding."""
-        
-        return prompt
+        linked = None
+        if self.linked_sections is not None and semantic_scores.get('tradition', 0) > 0:
+            linked = self.linked_sections(self.id)
+        self.last_prompt = self.prompt_fragments.assemble(semantic_scores, user_message, self.prompt_budget, linked)
+        return self.last_prompt.text
     
     def _build_system_prompt(self) -> str:
         """Build the basic system prompt (for backward compatibility)."""
@@ -140,32 +100,355 @@ Remember: You are speaking from your lived experience and understanding."""
         # In practice, we'll use the focused version
         return self._build_focused_system_prompt("general question")
     
+    def _completion_params(self, user_message: str, memory: Optional[ConversationMemory] = None) -> Dict:
+        """Model settings and messages for a chat completion request."""
+        # Build focused prompt based on the specific question
+        focused_prompt = self._build_focused_system_prompt(user_message)
+        history = memory.messages() if memory is not None else []
+        return {
+            "model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            "messages": [
+                {"role": "system", "content": focused_prompt},
+                *history,
+                {"role": "user", "content": user_message}
+            ],
+            "max_tokens": int(os.getenv("MAX_TOKENS", "1000")),
+            "temperature": float(os.getenv("TEMPERATURE", "0.7"))
+        }
+    
+    def _cache_key(self, user_message: str, params: Dict) -> Optional[str]:
+        """Response cache key for a request, None when caching is off."""
+        # Answers that depend on earlier turns are not reusable
+        if self.response_cache is None or len(params["messages"]) > 2:
+            return None
+        model_params = {name: params[name] for name in ("model", "max_tokens", "temperature")}
+        return cache_key(self.id, self.profile_data.version or '', user_message,
+                         params["messages"][0]["content"], model_params)
+    
+    def curated_answer(self, user_message: str, memory: Optional[ConversationMemory] = None) -> Optional[str]:
+        """The profile's qa_pairs answer for a closely matching question, if any.
+        
+        Only opening questions qualify: mid-conversation, a question can lean
+        on earlier turns that a canned answer knows nothing about.
+        """
+        if memory is not None and (len(memory) or memory.summary):
+            return None
+        return self.qa_matcher.lookup(user_message, self.qa_threshold)
+    
+    async def complete(self, user_message: str, memory: Optional[ConversationMemory] = None) -> str:
+        """Generate a response, letting API errors propagate to the caller.
+        
+        With a memory, earlier turns are sent along and the exchange is
+        recorded. Answered turns are recorded in turn_metrics.
+        """
+        start = time.perf_counter()
+        curated = self.curated_answer(user_message, memory)
+        if curated is not None:
+            self._record_turn(start, curated, 'qa_pairs')
+            if memory is not None:
+                memory.add_exchange(user_message, curated)
+            return curated
+        params = self._completion_params(user_message, memory)
+        prompt_tokens = self._prompt_tokens(memory)
+        key = self._cache_key(user_message, params)
+        if key is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._record_turn(start, cached, 'cache', prompt_tokens)
+                if memory is not None:
+                    memory.add_exchange(user_message, cached)
+                return cached
+        
+        response = await self.client.chat.completions.create(**params)
+        content = response.choices[0].message.content
+        self._record_turn(start, content or '', 'model', prompt_tokens)
+        if key is not None and content:
+            self.response_cache.put(key, content)
+        if memory is not None and content:
+            memory.add_exchange(user_message, content)
+        return content
+    
+    def _prompt_tokens(self, memory: Optional[ConversationMemory]) -> Dict[str, int]:
+        """Input tokens of the last built prompt per section, plus the history sent with it."""
+        prompt_tokens = dict(self.last_prompt.section_tokens)
+        if memory is not None and len(memory):
+            prompt_tokens['history'] = memory.tokens
+        return prompt_tokens
+    
+    def _record_turn(self, start: float, text: str, source: str, prompt_tokens: Optional[Dict[str, int]] = None):
+        """Metrics of a turn answered in one piece."""
+        elapsed = time.perf_counter() - start
+        self.turn_metrics.append(TurnMetrics(elapsed, elapsed, 1, len(text), source=source,
+                                             prompt_tokens=prompt_tokens))
+    
+    async def respond_stream(self, user_message: str,
+                             memory: Optional[ConversationMemory] = None) -> AsyncIterator[str]:
+        """Yield the response as it is generated, recording latency in turn_metrics.
+        
+        Curated and cached answers are yielded as a single chunk. API errors
+        propagate to the caller; metrics are recorded either way. With a
+        memory, earlier turns are sent along and only complete exchanges are
+        recorded.
+        """
+        start = time.perf_counter()
+        curated = self.curated_answer(user_message, memory)
+        if curated is not None:
+            self._record_turn(start, curated, 'qa_pairs')
+            if memory is not None:
+                memory.add_exchange(user_message, curated)
+            yield curated
+            return
+        
+        params = self._completion_params(user_message, memory)
+        prompt_tokens = self._prompt_tokens(memory)
+        key = self._cache_key(user_message, params)
+        if key is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._record_turn(start, cached, 'cache', prompt_tokens)
+                if memory is not None:
+                    memory.add_exchange(user_message, cached)
+                yield cached
+                return
+        
+        first_token: Optional[float] = None
+        parts: List[str] = []
+        try:
+            stream = await self.client.chat.completions.create(stream=True, **params)
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if not content:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(content)
+                yield content
+            # Only complete answers are cached, never ones cut short by an error or the caller
+            if key is not None and parts:
+                self.response_cache.put(key, ''.join(parts))
+            if memory is not None and parts:
+                memory.add_exchange(user_message, ''.join(parts))
+        finally:
+            self.turn_metrics.append(TurnMetrics(first_token, time.perf_counter() - start,
+                                                 len(parts), sum(len(part) for part in parts),
+                                                 prompt_tokens=prompt_tokens))
+    
     async def respond(self, user_message: str) -> str:
         """Generate a contextually focused response as the profile persona."""
         try:
-            # Build focused prompt based on the specific question
-            focused_prompt = self._build_focused_system_prompt(user_message)
-            
-            response = await self.client.chat.completions.create(
-                model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-                messages=[
-                    {"role": "system", "content": focused_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=int(os.getenv("MAX_TOKENS", "1000")),
-                temperature=float(os.getenv("TEMPERATURE", "0.7"))
-            )
-            return response.choices[0].message.content
+            return await self.complete(user_message)
         except Exception as e:
             return f"I apologize, but I'm experiencing some difficulty responding right now. Error: {str(e)}"
 
 class ProfileManager:
     """Manages loading and accessing profile data."""
     
-    def __init__(self, profiles_dir: str = "profiles"):
+    def __init__(self, profiles_dir: str = "profiles", lazy: bool = False,
+                 manifest_path: Optional[str] = None, cache_size: int = DEFAULT_CACHE_SIZE,
+                 snapshot_path: Optional[str] = None, use_snapshot: bool = True, validate: bool = True,
+                 edges_path: Optional[str] = None):
         self.profiles_dir = Path(profiles_dir)
-        self.profiles: Dict[str, Dict] = {}
-        self._load_profiles()
+        self.manifest_path = Path(manifest_path) if manifest_path else default_manifest_path(self.profiles_dir)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else default_snapshot_path(self.manifest_path)
+        self.snapshot: Optional[ProfileSnapshot] = None
+        self.lazy = lazy
+        self.validate = validate
+        if validate and not PROFILE_SCHEMA.exists():
+            console.print(f"[yellow]Schema {PROFILE_SCHEMA} not found, loading profiles without validation[/yellow]")
+            self.validate = False
+        # Profile file name -> schema errors, for files rejected at load or refresh
+        self.validation_errors: Dict[str, List[str]] = {}
+        self.profiles: MutableMapping[str, Profile] = {}
+        # Listing fields (name, alt names, keywords, traditions) for every profile
+        self.catalog: Dict[str, Dict] = {}
+        self._search_index: Optional[ProfileSearchIndex] = None
+        self.edges_path = Path(edges_path) if edges_path else default_edges_path(self.profiles_dir)
+        self._graph: Optional[ProfileGraph] = None
+        # (mtime_ns, size) of the links file the graph was built from
+        self._edges_state: Optional[Tuple[int, int]] = None
+        self._provenance: Optional[ProvenanceIndex] = None
+        self._facets: Optional[FacetIndex] = None
+        self._geo: Optional[GeoIndex] = None
+        # Profile id -> prompt section quoting its linked profiles' synopses (None: no linked synopses)
+        self._linked_sections: Dict[str, Optional[LinkedSection]] = {}
+        # Profile file name -> profile id, and -> ((mtime_ns, size), content hash)
+        self._file_ids: Dict[str, str] = {}
+        self._file_state: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._manifest_hashes: Dict[str, str] = {}
+        self._manifest_mtime: Optional[int] = None
+        self._refresh_lock = threading.Lock()
+        
+        if use_snapshot and self._load_snapshot(cache_size):
+            self.lazy = True
+        elif lazy:
+            self.lazy = self._load_manifest(cache_size)
+        if not self.lazy:
+            self._load_profiles()
+            self._build_search_index()
+    
+    def _load_snapshot(self, cache_size: int) -> bool:
+        """Open the compiled snapshot if it matches the manifest hashes."""
+        if not self.snapshot_path.exists():
+            return False
+        try:
+            entries = load_manifest(self.manifest_path) or {}
+        except Exception:
+            return False
+        snapshot = open_fresh_snapshot(
+            self.snapshot_path, {profile_id: entry.get('hash', '') for profile_id, entry in entries.items()})
+        if snapshot is None:
+            console.print(f"[yellow]Snapshot {self.snapshot_path} is stale, loading profiles from JSON[/yellow]")
+            return False
+        
+        self.snapshot = snapshot
+        self.profiles = SnapshotProfiles(self.profiles_dir, snapshot, cache_size=cache_size)
+        self.catalog = snapshot.catalog()
+        self._file_ids = {entry['file']: profile_id for profile_id, entry in snapshot.entries.items()}
+        self._manifest_hashes = {profile_id: entry['hash'] for profile_id, entry in snapshot.entries.items()}
+        self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+        console.print(f"[green]Opened snapshot {self.snapshot_path} ({len(self.catalog)} profiles)[/green]")
+        return True
+    
+    def _load_manifest(self, cache_size: int) -> bool:
+        """Index profiles from the manifest without parsing their bodies."""
+        try:
+            entries = load_manifest(self.manifest_path)
+        except Exception as e:
+            console.print(f"[red]Error loading manifest {self.manifest_path}: {e}[/red]")
+            entries = None
+        if entries is None:
+            console.print(f"[yellow]No usable manifest at {self.manifest_path}, loading profiles eagerly[/yellow]")
+            return False
+        
+        self.profiles = LazyProfiles(self.profiles_dir, entries, cache_size=cache_size, validate=self.validate)
+        for profile_id, entry in entries.items():
+            self.catalog[profile_id] = {k: v for k, v in entry.items() if k not in ('id', 'hash', 'file')}
+            self._file_ids[entry.get('file') or f"{profile_id}.json"] = profile_id
+        self._manifest_hashes = {profile_id: entry.get('hash', '') for profile_id, entry in entries.items()}
+        self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+        console.print(f"[green]Indexed {len(entries)} profiles from {self.manifest_path}[/green]")
+        return True
+    
+    @property
+    def search_index(self) -> ProfileSearchIndex:
+        """Search index over the catalog, built on first use."""
+        if self._search_index is None:
+            self._build_search_index()
+        return self._search_index
+    
+    def _build_search_index(self):
+        """Index the catalog fields of every known profile."""
+        if self.snapshot is not None:
+            self._search_index = self.snapshot.search_index()
+            return
+        self._search_index = ProfileSearchIndex()
+        for profile_id, summary in self.catalog.items():
+            self._search_index.add(profile_id, summary)
+    
+    @property
+    def graph(self) -> ProfileGraph:
+        """Link graph from the links file, built on first use."""
+        if self._graph is None:
+            self._load_graph()
+        return self._graph
+    
+    def _edges_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.edges_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _load_graph(self):
+        """Build the link graph; a missing or unreadable links file gives an empty one."""
+        signature = self._edges_signature()
+        graph = ProfileGraph()
+        if signature is not None:
+            skipped: List[int] = []
+            try:
+                graph = ProfileGraph.load(self.edges_path, skipped)
+            except (OSError, ValueError) as e:
+                console.print(f"[red]Error loading links {self.edges_path}: {e}[/red]")
+            if skipped:
+                console.print(f"[yellow]Skipped {len(skipped)} malformed links in {self.edges_path} "
+                              f"(first at index {skipped[0]})[/yellow]")
+        self._graph, self._edges_state = graph, signature
+        self._linked_sections = {}
+    
+    def linked_profiles(self, profile_id: str, edge_type: Optional[str] = None, direction: str = BOTH) -> List[str]:
+        """Profiles linked to profile_id in the links file, optionally by one link type."""
+        return self.graph.neighbors(profile_id, edge_type, direction)
+    
+    @property
+    def provenance(self) -> ProvenanceIndex:
+        """Bibliography and claim index over every profile, built on first use."""
+        if self._provenance is None:
+            index = ProvenanceIndex()
+            for profile_id in self.list_profiles():
+                profile_data = self.get_profile(profile_id)
+                if profile_data is not None:
+                    index.add(profile_id, profile_data)
+            self._provenance = index
+        return self._provenance
+    
+    @property
+    def facets(self) -> FacetIndex:
+        """Facet bitmaps over the catalog, built on first use."""
+        if self._facets is None:
+            self._facets = FacetIndex(self.catalog.items())
+        return self._facets
+    
+    def filter_profiles(self, filters: List[str], limit: Optional[int] = None, offset: int = 0) -> FacetResult:
+        """Profiles matching filter specs such as "tradition=Zen,Sufism" or "born=1800..1900", with facet counts."""
+        values, ranges = parse_filters(filters)
+        return self.facets.query(values, ranges, limit=limit, offset=offset)
+    
+    @property
+    def geo(self) -> GeoIndex:
+        """Spatial index over the catalog's geo places, built on first use."""
+        if self._geo is None:
+            self._geo = GeoIndex(self.catalog.items())
+        return self._geo
+    
+    def profiles_near(self, lat: float, lng: float, radius_km: float, limit: Optional[int] = None) -> List[GeoHit]:
+        """Profiles with a place within radius_km of (lat, lng), nearest first."""
+        return self.geo.within_radius(lat, lng, radius_km, limit=limit)
+    
+    def linked_section(self, profile_id: str) -> Optional[LinkedSection]:
+        """Prompt section with the synopses of profile_id's linked profiles.
+        
+        Rendered on first use and kept until the links file or one of those
+        profiles changes, so later turns only pay a dictionary lookup.
+        """
+        # Loading the graph starts a fresh dict of sections, so it comes first
+        graph = self.graph
+        sections = self._linked_sections
+        if profile_id in sections:
+            return sections[profile_id]
+        linked = []
+        seen = set()
+        for linked_id, edge_type, direction in graph.links(profile_id):
+            if linked_id in seen or linked_id == profile_id or len(linked) >= LINKED_PROFILES_LIMIT:
+                continue
+            seen.add(linked_id)
+            profile_data = self.get_profile(linked_id)
+            synopsis = profile_data.ai.synopsis if profile_data is not None and profile_data.ai else None
+            if synopsis:
+                relation = edge_type.replace('_', ' ')
+                linked.append((profile_data.canonical_name or linked_id,
+                               f"you → {relation}" if direction == OUT else f"{relation} → you", synopsis))
+        # Stored in the dict read above: a graph reloaded meanwhile starts a fresh one
+        section = sections[profile_id] = render_linked_section(linked)
+        return section
+    
+    def _invalidate_linked_sections(self, profile_id: str):
+        """Forget rendered sections that quote profile_id."""
+        if self._graph is None:
+            return
+        for linked_id in self._graph.neighbors(profile_id):
+            self._linked_sections.pop(linked_id, None)
     
     def _load_profiles(self):
         """Load all profile JSON files."""
@@ -175,41 +458,289 @@ class ProfileManager:
             
         for profile_file in self.profiles_dir.glob("*.json"):
             try:
-                with open(profile_file, 'r', encoding='utf-8') as f:
-                    profile_data = json.load(f)
-                    profile_id = profile_data.get('id', profile_file.stem)
-                    self.profiles[profile_id] = profile_data
-                    console.print(f"[green]Loaded profile: {profile_data.get('canonical_name', profile_id)}[/green]")
+                stat = profile_file.stat()
+                data = profile_file.read_bytes()
+                digest = content_hash(data)
+                parsed = json.loads(data)
+                if not self._check_schema(profile_file.name, data, digest, parsed):
+                    # Remember the rejected content so refresh() skips it until it changes
+                    self._file_state[profile_file.name] = ((stat.st_mtime_ns, stat.st_size), digest)
+                    continue
+                profile_data = Profile.from_dict(parsed)
+                profile_id = profile_data.id or profile_file.stem
+                self.add_profile(profile_data, profile_id, source_file=profile_file.name)
+                self._file_state[profile_file.name] = ((stat.st_mtime_ns, stat.st_size), digest)
+                console.print(f"[green]Loaded profile: {profile_data.canonical_name or profile_id}[/green]")
             except Exception as e:
                 console.print(f"[red]Error loading {profile_file}: {e}[/red]")
     
-    def get_profile(self, profile_id: str) -> Optional[Dict]:
+    def _check_schema(self, file_name: str, data: bytes, digest: str, parsed) -> bool:
+        """Validate a profile file against the schema, recording and reporting any errors."""
+        if not self.validate:
+            return True
+        errors = validate_bytes(data, digest, PROFILE_SCHEMA, parsed=parsed)
+        if not errors:
+            self.validation_errors.pop(file_name, None)
+            return True
+        self.validation_errors[file_name] = errors
+        console.print(f"[red]Skipping {self.profiles_dir / file_name}: {len(errors)} schema error(s), "
+                      f"first: {errors[0]}[/red]")
+        return False
+    
+    def add_profile(self, profile_data: Union[Profile, Dict], profile_id: Optional[str] = None,
+                    source_file: Optional[str] = None) -> str:
+        """Add or replace a profile and keep the search index in sync."""
+        profile_data = as_profile(profile_data)
+        profile_id = profile_id or profile_data.id
+        if profile_id in self.profiles:
+            invalidate_prompt_fragments(profile_id)
+            invalidate_qa_matcher(profile_id)
+        # New or replaced, the profile changes what its neighbours quote
+        self._invalidate_linked_sections(profile_id)
+        if source_file is not None:
+            self._file_ids[source_file] = profile_id
+        if source_file is not None and isinstance(self.profiles, LazyProfiles):
+            self.profiles.track(profile_id, source_file, profile_data)
+        else:
+            self.profiles[profile_id] = profile_data
+        self.catalog[profile_id] = catalog_entry(profile_data)
+        # A snapshot index cannot be rebuilt from the catalog, so load it before changing it
+        if self._search_index is not None or self.snapshot is not None:
+            self.search_index.add(profile_id, profile_data)
+        if self._provenance is not None:
+            self._provenance.add(profile_id, profile_data)
+        if self._facets is not None:
+            self._facets.add(profile_id, self.catalog[profile_id])
+        if self._geo is not None:
+            self._geo.add(profile_id, self.catalog[profile_id])
+        return profile_id
+    
+    def remove_profile(self, profile_id: str):
+        """Remove a profile and its search index entries."""
+        if profile_id in self.profiles:
+            del self.profiles[profile_id]
+        self.catalog.pop(profile_id, None)
+        if self._search_index is not None or self.snapshot is not None:
+            self.search_index.remove(profile_id)
+        if self._provenance is not None:
+            self._provenance.remove(profile_id)
+        if self._facets is not None:
+            self._facets.remove(profile_id)
+        if self._geo is not None:
+            self._geo.remove(profile_id)
+        invalidate_prompt_fragments(profile_id)
+        invalidate_qa_matcher(profile_id)
+        self._invalidate_linked_sections(profile_id)
+    
+    def manifest_mismatches(self) -> List[str]:
+        """Loaded profiles whose content hash differs from the manifest on disk, or is missing on one side."""
+        try:
+            entries = load_manifest(self.manifest_path) or {}
+        except (OSError, ValueError):
+            entries = {}
+        hashes = {profile_id: self._file_state[name][1]
+                  for name, profile_id in self._file_ids.items() if name in self._file_state}
+        return sorted(profile_id for profile_id in hashes.keys() | entries.keys()
+                      if hashes.get(profile_id) != entries.get(profile_id, {}).get('hash'))
+    
+    def _refresh_manifest_hashes(self):
+        """Reload manifest hashes if the manifest changed on disk."""
+        try:
+            mtime = self.manifest_path.stat().st_mtime_ns
+        except OSError:
+            self._manifest_hashes, self._manifest_mtime = {}, None
+            return
+        if mtime == self._manifest_mtime:
+            return
+        try:
+            entries = load_manifest(self.manifest_path) or {}
+        except Exception as e:
+            console.print(f"[red]Error loading manifest {self.manifest_path}: {e}[/red]")
+            return
+        self._manifest_hashes = {profile_id: entry.get('hash', '') for profile_id, entry in entries.items()}
+        self._manifest_mtime = mtime
+    
+    def refresh(self) -> Dict[str, List[str]]:
+        """Re-read profile files whose mtime or size changed since they were last seen.
+        
+        Unchanged files are only stat()ed. Changed files are hashed and parsed only
+        if their content differs; the result lists added, updated and removed ids,
+        ids whose content does not match the manifest hash, and the names of files
+        that failed schema validation. A loaded link graph is rebuilt if the
+        links file changed, which is reported under 'links'. Changes are
+        applied entry by entry, so readers are never blocked.
+        """
+        result: Dict[str, List[str]] = {'added': [], 'updated': [], 'removed': [], 'mismatched': [], 'invalid': [],
+                                        'links': []}
+        with self._refresh_lock:
+            self._refresh_manifest_hashes()
+            manifest_hashes = self._manifest_hashes
+            seen = set()
+            
+            for profile_file in self.profiles_dir.glob("*.json"):
+                name = profile_file.name
+                try:
+                    stat = profile_file.stat()
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                    known = self._file_state.get(name)
+                    if known is not None and known[0] == signature:
+                        seen.add(name)
+                        continue
+                    
+                    data = profile_file.read_bytes()
+                    digest = content_hash(data)
+                    known_id = self._file_ids.get(name)
+                    if known is not None and known[1] == digest:
+                        # Touched but not modified
+                        self._file_state[name] = (signature, digest)
+                        seen.add(name)
+                        continue
+                    if known is None and known_id in self.profiles and manifest_hashes.get(known_id) == digest:
+                        # Lazily indexed file that still matches the manifest
+                        self._file_state[name] = (signature, digest)
+                        seen.add(name)
+                        continue
+                    
+                    parsed = json.loads(data)
+                    if not self._check_schema(name, data, digest, parsed):
+                        # Keep serving the last valid version until the file is fixed
+                        self._file_state[name] = (signature, digest)
+                        result['invalid'].append(name)
+                        seen.add(name)
+                        continue
+                    profile_data = Profile.from_dict(parsed)
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    console.print(f"[red]Error loading {profile_file}: {e}[/red]")
+                    seen.add(name)
+                    continue
+                
+                seen.add(name)
+                profile_id = profile_data.id or profile_file.stem
+                if known_id is not None and known_id != profile_id:
+                    self.remove_profile(known_id)
+                    result['removed'].append(known_id)
+                result['updated' if profile_id in self.profiles else 'added'].append(profile_id)
+                self.add_profile(profile_data, profile_id, source_file=name)
+                self._file_state[name] = (signature, digest)
+                if manifest_hashes and manifest_hashes.get(profile_id) != digest:
+                    result['mismatched'].append(profile_id)
+            
+            for name in [name for name in self._file_ids if name not in seen]:
+                profile_id = self._file_ids.pop(name)
+                self._file_state.pop(name, None)
+                if profile_id not in self._file_ids.values():
+                    self.remove_profile(profile_id)
+                    result['removed'].append(profile_id)
+            for name in [name for name in self._file_state if name not in seen]:
+                # Deleted files that were rejected by validation
+                del self._file_state[name]
+                self.validation_errors.pop(name, None)
+            
+            if self._graph is not None and self._edges_signature() != self._edges_state:
+                self._load_graph()
+                result['links'].append(self.edges_path.name)
+        
+        for profile_id in result['mismatched']:
+            console.print(f"[yellow]Profile {profile_id} is missing from or stale in {self.manifest_path}[/yellow]")
+        return result
+    
+    def watch(self, interval: float = 1.0, on_change: Optional[Callable[[Dict[str, List[str]]], None]] = None) -> ProfileWatcher:
+        """Start a background watcher that calls refresh() when profile files change."""
+        watcher = ProfileWatcher(self, interval=interval, on_change=on_change)
+        watcher.start()
+        return watcher
+    
+    def get_profile(self, profile_id: str) -> Optional[Profile]:
         """Get a specific profile by ID."""
-        return self.profiles.get(profile_id)
+        try:
+            return self.profiles.get(profile_id)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Error loading {profile_id}: {e}[/red]")
+            return None
     
     def list_profiles(self) -> List[str]:
         """List all available profile IDs."""
         return list(self.profiles.keys())
     
-    def search_profiles(self, query: str) -> List[str]:
-        """Search profiles by name or keywords."""
-        query = query.lower()
-        matches = []
+    def profile_summary(self, profile_id: str) -> Optional[Dict]:
+        """Get the listing fields of a profile without loading its body."""
+        return self.catalog.get(profile_id)
+    
+    def search_profiles(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[str]:
+        """Search profiles by name or keywords, ranked name > alt name > keyword."""
+        return self.search_index.search(query, limit=limit, offset=offset)
+    
+    async def ask_many(self, question: str, profile_ids: Optional[List[str]], client: ChatClient,
+                       concurrency: int = DEFAULT_CONCURRENCY, timeout: Optional[float] = DEFAULT_TIMEOUT,
+                       response_cache: Optional[ResponseCache] = None) -> AsyncIterator[PersonaResult]:
+        """Ask several personas (all if profile_ids is None) one question concurrently.
         
-        for profile_id, profile_data in self.profiles.items():
-            name = profile_data.get('canonical_name', '').lower()
-            alt_names = [name.lower() for name in profile_data.get('alt_names', [])]
-            keywords = [kw.lower() for kw in profile_data.get('keywords', [])]
-            
-            if (query in name or 
-                any(query in alt_name for alt_name in alt_names) or
-                any(query in keyword for keyword in keywords)):
-                matches.append(profile_id)
+        Yields a PersonaResult per persona as soon as it finishes; unknown or
+        unreadable profile ids are reported as errors rather than raising.
+        """
+        agents = []
+        missing = []
+        for profile_id in profile_ids if profile_ids is not None else self.list_profiles():
+            profile_data = self.get_profile(profile_id)
+            if profile_data is None:
+                missing.append(profile_id)
+            else:
+                agents.append(ProfileAgent(profile_data, client, response_cache, linked_sections=self.linked_section))
+        for profile_id in missing:
+            yield PersonaResult(profile_id, profile_id, ERROR, None, "profile not found", 0.0)
+        async for result in ask_many(question, agents, concurrency=concurrency, timeout=timeout):
+            yield result
+
+def _reply_panel(agent: ProfileAgent, text: str, subtitle: Optional[str] = None, style: str = "white") -> Panel:
+    return Panel(
+        Text(text, style=style),
+        title=f"{agent.name}",
+        subtitle=subtitle,
+        border_style="blue"
+    )
+
+async def stream_reply(profile_agent: ProfileAgent, user_message: str,
+                       memory: Optional[ConversationMemory] = None) -> str:
+    """Render a response progressively as tokens arrive and return the full text."""
+    parts: List[str] = []
+    # A stream failing before it starts records no metrics for this turn
+    turns = len(profile_agent.turn_metrics)
+    with Live(_reply_panel(profile_agent, "thinking...", style="dim"), console=console,
+              refresh_per_second=15, transient=False) as live:
+        try:
+            async for content in profile_agent.respond_stream(user_message, memory):
+                parts.append(content)
+                live.update(_reply_panel(profile_agent, ''.join(parts)))
+        except Exception as e:
+            parts.append(f"I apologize, but I'm experiencing some difficulty responding right now. Error: {str(e)}")
         
-        return matches
+        metrics = profile_agent.turn_metrics[-1] if len(profile_agent.turn_metrics) > turns else None
+        if metrics is None:
+            subtitle = None
+        elif metrics.source == 'cache':
+            subtitle = "cached"
+        elif metrics.source == 'qa_pairs':
+            subtitle = "curated answer"
+        elif metrics.time_to_first_token is not None:
+            subtitle = f"first token {metrics.time_to_first_token:.2f}s · total {metrics.total_latency:.2f}s"
+        else:
+            subtitle = f"total {metrics.total_latency:.2f}s"
+        if metrics is not None and metrics.source == 'model' and metrics.prompt_tokens:
+            subtitle += f" · prompt {sum(metrics.prompt_tokens.values())} tok"
+        live.update(_reply_panel(profile_agent, ''.join(parts), subtitle))
+    return ''.join(parts)
 
-async def interactive_chat(profile_agent: ProfileAgent):
-    """Interactive chat session with a profile agent."""
+async def interactive_chat(profile_agent: ProfileAgent, memory: Optional[ConversationMemory] = None,
+                           store: Optional[ConversationStore] = None, session_id: Optional[str] = None):
+    """Interactive chat session with a profile agent.
+    
+    Earlier turns are sent along within the memory's token budget; with a
+    store and session id, the conversation is saved after every reply.
+    """
+    if memory is None:
+        memory = ConversationMemory()
     console.print(f"\n[bold blue]Chatting with {profile_agent.name}[/bold blue]")
     console.print("[dim]Type 'quit' to end the conversation[/dim]\n")
     
@@ -223,18 +754,11 @@ async def interactive_chat(profile_agent: ProfileAgent):
             
             if not user_input.strip():
                 continue
-                
-            console.print(f"\n[bold blue]{profile_agent.name}:[/bold blue] [dim]thinking...[/dim]")
-            
-            response = await profile_agent.respond(user_input)
             
-            # Display response in a panel
-            panel = Panel(
-                Text(response, style="white"),
-                title=f"{profile_agent.name}",
-                border_style="blue"
-            )
-            console.print(panel)
+            # Tokens are rendered into the panel as they arrive
+            await stream_reply(profile_agent, user_input, memory)
+            if store is not None and session_id:
+                store.save(session_id, profile_agent.id, memory)
             console.print()
             
         except KeyboardInterrupt:
@@ -243,22 +767,35 @@ async def interactive_chat(profile_agent: ProfileAgent):
         except Exception as e:
             console.print(f"[red]Error: {e}[/red]")
 
+app = typer.Typer(add_completion=False)
+
+@app.callback(invoke_without_command=True)
 def main(
+    ctx: typer.Context,
     profile_id: str = typer.Option(None, "--profile", "-p", help="Profile ID to chat with"),
     interactive: bool = typer.Option(True, "--interactive/--no-interactive", help="Start interactive chat"),
-    list_profiles: bool = typer.Option(False, "--list", "-l", help="List available profiles")
+    list_profiles: bool = typer.Option(False, "--list", "-l", help="List available profiles"),
+    filters: Optional[List[str]] = typer.Option(None, "--filter", "-f",
+                                                help="With --list: facet filter such as tradition=Zen,Sufism or born=1800..1900 (repeatable)"),
+    lazy: bool = typer.Option(False, "--lazy/--eager", help="Load profile bodies on demand from the manifest"),
+    session_id: Optional[str] = typer.Option(None, "--session", "-s",
+                                             help="Save the chat under this name and resume it next time")
 ):
     """Main CLI application."""
-    
-    # Check for OpenAI API key
-    if not os.getenv("OPENAI_API_KEY"):
-        console.print("[red]Error: OPENAI_API_KEY not found in environment variables.[/red]")
-        console.print("Please create a .env file with your OpenAI API key or set it in your environment.")
-        console.print("See env.example for reference.")
+    if ctx.invoked_subcommand is not None:
         return
     
-    # Initialize profile manager
-    profile_manager = ProfileManager()
+    # A saved session picks its own profile unless one is given
+    store = ConversationStore(default_sessions_path()) if session_id else None
+    saved = store.load(session_id) if store is not None else None
+    if saved is not None:
+        if profile_id and profile_id != saved[0]:
+            console.print(f"[red]Session '{session_id}' belongs to profile '{saved[0]}', not '{profile_id}'.[/red]")
+            return
+        profile_id = saved[0]
+    
+    # Initialize profile manager; listing only needs the manifest
+    profile_manager = ProfileManager(lazy=lazy or list_profiles)
     
     if not profile_manager.profiles:
         console.print("[red]No profiles found. Please check the profiles directory.[/red]")
@@ -266,13 +803,29 @@ def main(
     
     # List profiles if requested
     if list_profiles:
+        profile_ids = list(profile_manager.catalog)
+        if filters:
+            try:
+                profile_ids = profile_manager.filter_profiles(filters).ids
+            except ValueError as e:
+                console.print(f"[red]{e}[/red]")
+                raise typer.Exit(1)
         console.print("\n[bold]Available Profiles:[/bold]")
-        for profile_id, profile_data in profile_manager.profiles.items():
-            name = profile_data.get('canonical_name', profile_id)
-            tradition = ', '.join(profile_data.get('affiliations', {}).get('traditions', []))
+        for profile_id in profile_ids:
+            summary = profile_manager.catalog[profile_id]
+            name = summary.get('canonical_name', profile_id)
+            tradition = ', '.join(summary.get('traditions', []))
             console.print(f"  [blue]{profile_id}[/blue] - {name} ({tradition})")
         return
     
+    # Check for OpenAI API key
+    if api_key_missing():
+        console.print("[red]Error: OPENAI_API_KEY not found in environment variables.[/red]")
+        console.print("Please create a .env file with your OpenAI API key or set it in your environment.")
+        console.print("See env.example for reference.")
+        console.print("Or set LLM_BACKEND=mock to try it offline with a local mock model.")
+        return
+    
     # Select profile
     if not profile_id:
         available_profiles = profile_manager.list_profiles()
@@ -281,8 +834,7 @@ def main(
         else:
             console.print("\n[bold]Available Profiles:[/bold]")
             for i, pid in enumerate(available_profiles, 1):
-                profile_data = profile_manager.profiles[pid]
-                name = profile_data.get('canonical_name', pid)
+                name = profile_manager.profile_summary(pid).get('canonical_name', pid)
                 console.print(f"  {i}. [blue]{pid}[/blue] - {name}")
             
             while True:
@@ -304,31 +856,324 @@ def main(
         return
     
     # Display profile info
-    console.print(f"\n[bold]Selected Profile:[/bold] {profile_data['canonical_name']}")
-    console.print(f"[dim]Tradition: {', '.join(profile_data.get('affiliations', {}).get('traditions', []))}[/dim]")
-    console.print(f"[dim]Core Teaching: {profile_data.get('thesis', '')}[/dim]")
+    console.print(f"\n[bold]Selected Profile:[/bold] {profile_data.canonical_name}")
+    console.print(f"[dim]Tradition: {', '.join(profile_data.traditions)}[/dim]")
+    console.print(f"[dim]Core Teaching: {profile_data.thesis or ''}[/dim]")
     
-    # Initialize OpenAI client
-    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # Shared pooled, rate-limited client
+    client = get_llm_client()
     
     # Create profile agent
-    agent = ProfileAgent(profile_data, client)
+    agent = ProfileAgent(profile_data, client, default_response_cache(), linked_sections=profile_manager.linked_section)
+    
+    memory = saved[1] if saved is not None else ConversationMemory()
+    if saved is not None:
+        console.print(f"[dim]Resuming session '{session_id}' ({len(memory)} recent messages"
+                      f"{', earlier ones summarized' if memory.summary else ''})[/dim]")
     
     if interactive:
         # Start interactive chat
-        asyncio.run(interactive_chat(agent))
+        asyncio.run(interactive_chat(agent, memory, store, session_id))
     else:
         # Single question mode
         question = Prompt.ask(f"\nWhat would you like to ask {agent.name}")
-        console.print(f"\n[bold blue]{agent.name}:[/bold blue] [dim]thinking...[/dim]")
-        
-        response = asyncio.run(agent.respond(question))
-        panel = Panel(
-            Text(response, style="white"),
-            title=f"{agent.name}",
-            border_style="blue"
-        )
+        asyncio.run(stream_reply(agent, question, memory))
+        if store is not None:
+            store.save(session_id, agent.id, memory)
+
+async def ask_personas(profile_manager: ProfileManager, question: str, profile_ids: Optional[List[str]],
+                       client: ChatClient, concurrency: int, timeout: float,
+                       response_cache: Optional[ResponseCache] = None):
+    """Print each persona's answer to one question as it arrives."""
+    start = time.perf_counter()
+    counts: Dict[str, int] = {}
+    async for result in profile_manager.ask_many(question, profile_ids, client, concurrency=concurrency,
+                                                 timeout=timeout, response_cache=response_cache):
+        counts[result.status] = counts.get(result.status, 0) + 1
+        if result.status == OK:
+            panel = Panel(Text(result.response or "", style="white"), title=result.name,
+                          subtitle=f"{result.elapsed:.1f}s", border_style="blue")
+        else:
+            panel = Panel(Text(result.error or "", style="red"), title=result.name,
+                          subtitle=f"{result.status} after {result.elapsed:.1f}s", border_style="red")
         console.print(panel)
+    
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    if response_cache is not None:
+        summary += f", {response_cache.hits} cached"
+    console.print(f"[dim]{sum(counts.values())} personas in {time.perf_counter() - start:.1f}s ({summary})[/dim]")
+
+@app.command("ask")
+def ask_command(
+    question: str = typer.Argument(..., help="Question to ask every selected persona"),
+    profile_ids: Optional[List[str]] = typer.Option(None, "--profile", "-p", help="Profile ID (repeatable; default: all)"),
+    concurrency: int = typer.Option(DEFAULT_CONCURRENCY, "--concurrency", "-c", help="Maximum requests in flight"),
+    timeout: float = typer.Option(DEFAULT_TIMEOUT, "--timeout", help="Seconds to wait for each persona"),
+    lazy: bool = typer.Option(True, "--lazy/--eager", help="Load profile bodies on demand from the manifest")
+):
+    """Ask one question to many personas concurrently, printing answers as they complete."""
+    if api_key_missing():
+        console.print("[red]Error: OPENAI_API_KEY not found in environment variables.[/red]")
+        return
+    
+    profile_manager = ProfileManager(lazy=lazy)
+    client = get_llm_client()
+    asyncio.run(ask_personas(profile_manager, question, profile_ids or None, client, concurrency, timeout,
+                             default_response_cache()))
+
+@app.command("batch")
+def batch_command(
+    input_path: Path = typer.Argument(..., help="JSONL file of {\"profile_id\", \"question\"} records"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Results JSONL, also the checkpoint (default: <input>.results.jsonl)"),
+    concurrency: int = typer.Option(16, "--concurrency", "-c", help="Maximum requests in flight"),
+    timeout: float = typer.Option(120.0, "--timeout", help="Seconds to wait for each answer"),
+    restart: bool = typer.Option(False, "--restart", help="Discard earlier results instead of resuming"),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached answers"),
+    lazy: bool = typer.Option(True, "--lazy/--eager", help="Load profile bodies on demand from the manifest"),
+    as_json: bool = typer.Option(False, "--json", help="Print the summary as JSON")
+):
+    """Answer a JSONL file of questions, resuming from earlier results and answering duplicates once."""
+    from batch_runner import run_batch
+    
+    if api_key_missing():
+        console.print("[red]Error: OPENAI_API_KEY not found in environment variables.[/red]")
+        raise typer.Exit(1)
+    if not input_path.exists():
+        console.print(f"[red]Input file {input_path} not found.[/red]")
+        raise typer.Exit(1)
+    output = output or input_path.with_suffix(".results.jsonl")
+    if restart and output.exists():
+        output.unlink()
+    
+    profile_manager = ProfileManager(lazy=lazy)
+    response_cache = default_response_cache() if use_cache else None
+    with console.status("Answering...") as status:
+        def progress(result: Dict, stats):
+            status.update(f"{stats.answered} answered, {stats.failed} failed "
+                          f"({stats.resumed} resumed, {stats.duplicates} duplicates copied)")
+        stats = asyncio.run(run_batch(input_path, output, profile_manager, get_llm_client(),
+                                      concurrency=concurrency, timeout=timeout,
+                                      response_cache=response_cache, on_result=progress))
+    
+    summary = stats.summary()
+    if as_json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for line_number, problem in stats.invalid[:10]:
+            console.print(f"[yellow]{input_path}:{line_number}: {problem}[/yellow]")
+        if stats.stale:
+            console.print(f"[yellow]{stats.stale} earlier results in {output} match no record of {input_path}; "
+                          f"was it edited? Use --restart to start over.[/yellow]")
+        sources = ', '.join(f"{count} {source}" for source, count in sorted(summary['sources'].items()))
+        console.print(f"[green]{summary['answered']} answered[/green] ({sources or 'none'}), "
+                      f"{summary['failed']} failed, {summary['resumed']} already done, "
+                      f"{summary['duplicates']} duplicates, {summary['invalid']} invalid lines -> {output}")
+        console.print(f"[dim]{summary['throughput']:.1f} answers/s over {summary['seconds']:.1f}s, "
+                      f"latency p50 {summary['p50']:.2f}s p95 {summary['p95']:.2f}s, "
+                      f"{summary['prompt_tokens']:,} prompt + {summary['completion_tokens']:,} completion tokens[/dim]")
+    if stats.failed:
+        raise typer.Exit(1)
+
+@app.command("serve")
+def serve_command(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: int = typer.Option(8080, "--port", help="Port to listen on"),
+    workers: int = typer.Option(1, "--workers", "-w", help="Worker processes forked from one preloaded corpus"),
+    profiles_dir: str = typer.Option("profiles", "--profiles-dir", help="Directory of profile JSON files"),
+    lazy: bool = typer.Option(False, "--lazy/--eager", help="Load profile bodies on demand (single worker only)")
+):
+    """Serve profile listing, search and chat (JSON or SSE) over HTTP."""
+    try:
+        from profile_server import serve
+    except ImportError as e:
+        console.print(f"[red]Serving needs aiohttp ({e}); install it with `pip install aiohttp`.[/red]")
+        raise typer.Exit(1)
+    serve(host=host, port=port, workers=workers, profiles_dir=profiles_dir, lazy=lazy)
+
+@app.command("links")
+def links_command(
+    profile_id: str = typer.Argument(..., help="Profile ID to start from"),
+    edge_type: Optional[str] = typer.Option(None, "--type", "-t", help="Only follow links of this type"),
+    direction: str = typer.Option(BOTH, "--direction", "-d", help=f"Link direction: {', '.join(DIRECTIONS)}"),
+    hops: int = typer.Option(1, "--hops", "-k", help="Show everything within this many links"),
+    path_to: Optional[str] = typer.Option(None, "--path-to", help="Show the shortest chain of links to this profile"),
+    lineage: bool = typer.Option(False, "--lineage", help="Show teachers, their teachers and so on"),
+    edges: Optional[str] = typer.Option(None, "--edges", help="Links file (default: links/edges.json)")
+):
+    """Explore the profile link graph: neighbours, k-hop reach, shortest paths and lineage."""
+    if direction not in DIRECTIONS:
+        console.print(f"[red]--direction must be one of {', '.join(DIRECTIONS)}.[/red]")
+        raise typer.Exit(1)
+    profile_manager = ProfileManager(lazy=True, edges_path=edges)
+    graph = profile_manager.graph
+
+    def label(linked_id: str) -> str:
+        summary = profile_manager.profile_summary(linked_id)
+        name = summary.get('canonical_name', linked_id) if summary else "[dim]not in corpus[/dim]"
+        return f"[blue]{linked_id}[/blue] - {name}"
+
+    if profile_id not in graph:
+        console.print(f"[yellow]No links for '{profile_id}' in {profile_manager.edges_path}.[/yellow]")
+        raise typer.Exit(1)
+
+    if path_to:
+        path = graph.shortest_path(profile_id, path_to, edge_type, direction)
+        if path is None:
+            console.print(f"[yellow]No chain of links from '{profile_id}' to '{path_to}'.[/yellow]")
+            raise typer.Exit(1)
+        console.print(f"\n[bold]Shortest path ({len(path) - 1} links):[/bold]")
+        for linked_id in path:
+            console.print(f"  {label(linked_id)}")
+    elif lineage:
+        ancestors = graph.lineage(profile_id)
+        console.print(f"\n[bold]Lineage of {profile_id}:[/bold] {len(ancestors)} teachers")
+        for linked_id, generations in ancestors.items():
+            console.print(f"  {generations}. {label(linked_id)}")
+    elif hops > 1:
+        reached = graph.k_hop(profile_id, hops, edge_type, direction)
+        console.print(f"\n[bold]Within {hops} links of {profile_id}:[/bold] {len(reached)} profiles")
+        for linked_id, distance in reached.items():
+            console.print(f"  {distance} {label(linked_id)}")
+    else:
+        linked = graph.neighbors(profile_id, edge_type, direction)
+        console.print(f"\n[bold]Linked to {profile_id}:[/bold] {len(linked)} profiles")
+        for linked_id in linked:
+            console.print(f"  {label(linked_id)}")
+
+@app.command("sources")
+def sources_command(
+    min_reliability: float = typer.Option(0.0, "--min-reliability", "-r", help="Only sources at least this reliable"),
+    limit: int = typer.Option(50, "--limit", "-n", help="Sources to list (0 = all)"),
+    write: bool = typer.Option(False, "--write", help="Write the deduplicated bibliography to sources/bibliography.json"),
+    profiles_dir: str = typer.Option("profiles", "--profiles-dir", help="Directory of profile JSON files")
+):
+    """List the sources cited across the corpus, deduplicated by URL or title."""
+    profile_manager = ProfileManager(profiles_dir, lazy=True)
+    index = profile_manager.provenance
+    stats = index.stats()
+    sources = index.sources(min_reliability)
+    for entry in sources[:limit or None]:
+        cited_by = ', '.join(sorted(entry.cited_by))
+        console.print(f"  [blue]{entry.reliability:.2f}[/blue] {entry.title} [dim]({cited_by})[/dim]")
+    console.print(f"[dim]{len(sources)} of {stats['sources']} sources shown; {stats['citations']} citations "
+                  f"in {stats['profiles']} profiles[/dim]")
+    if write:
+        path = default_bibliography_path(Path(profiles_dir))
+        index.write_bibliography(path)
+        console.print(f"[green]Wrote {stats['sources']} entries to {path}[/green]")
+
+@app.command("facets")
+def facets_command(
+    filters: Optional[List[str]] = typer.Option(None, "--filter", "-f", help="Facet filter such as tradition=Zen,Sufism or born=1800..1900 (repeatable)"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Matching profiles to list (0 = none)"),
+    profiles_dir: str = typer.Option("profiles", "--profiles-dir", help="Directory of profile JSON files")
+):
+    """Count profiles per tradition, school, order, status and date bucket, optionally filtered."""
+    profile_manager = ProfileManager(profiles_dir, lazy=True)
+    try:
+        result = profile_manager.filter_profiles(filters or [], limit=limit)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    for facet, counts in result.counts.items():
+        if counts:
+            values = ', '.join(f"{value} [dim]({count})[/dim]" for value, count in counts.items())
+            console.print(f"  [bold]{facet}[/bold]: {values}")
+    for profile_id in result.ids:
+        console.print(f"  [blue]{profile_id}[/blue] - {profile_manager.catalog[profile_id].get('canonical_name', profile_id)}")
+    console.print(f"[dim]{result.total} of {len(profile_manager.catalog)} profiles match[/dim]")
+
+@app.command("near")
+def near_command(
+    lat: Optional[float] = typer.Option(None, "--lat", help="Latitude of the centre, in degrees"),
+    lng: Optional[float] = typer.Option(None, "--lng", help="Longitude of the centre, in degrees"),
+    radius_km: float = typer.Option(100.0, "--radius", "-r", help="Search radius in km"),
+    bbox: Optional[str] = typer.Option(None, "--bbox", help="Bounding box south,west,north,east instead of a radius"),
+    limit: int = typer.Option(50, "--limit", "-n", help="Profiles to list (0 = all)"),
+    profiles_dir: str = typer.Option("profiles", "--profiles-dir", help="Directory of profile JSON files")
+):
+    """List profiles with a place near a point, or inside a bounding box."""
+    profile_manager = ProfileManager(profiles_dir, lazy=True)
+    try:
+        if bbox:
+            hits = profile_manager.geo.within_bbox(*parse_bbox(bbox), limit=limit or None)
+        elif lat is None or lng is None:
+            raise ValueError("give --lat and --lng, or --bbox")
+        else:
+            hits = profile_manager.profiles_near(lat, lng, radius_km, limit=limit or None)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    for hit in hits:
+        distance = f"{hit.distance_km:8.1f} km " if hit.distance_km is not None else ""
+        name = profile_manager.catalog[hit.profile_id].get('canonical_name', hit.profile_id)
+        console.print(f"  {distance}[blue]{hit.profile_id}[/blue] - {name} [dim]({hit.place}, {hit.lat:g}, {hit.lng:g})[/dim]")
+    console.print(f"[dim]{len(hits)} profiles found[/dim]")
+
+@app.command("claims")
+def claims_command(
+    min_reliability: float = typer.Option(0.8, "--min-reliability", "-r", help="Only claims backed by evidence at least this reliable"),
+    profile_ids: Optional[List[str]] = typer.Option(None, "--profile", "-p", help="Profile ID (repeatable; default: all)"),
+    limit: int = typer.Option(50, "--limit", "-n", help="Claims to list (0 = all)"),
+    profiles_dir: str = typer.Option("profiles", "--profiles-dir", help="Directory of profile JSON files")
+):
+    """List claims backed by sufficiently reliable sources, most reliable first."""
+    profile_manager = ProfileManager(profiles_dir, lazy=True)
+    index = profile_manager.provenance
+    claims = index.claims_backed_by(min_reliability, profile_ids or None)
+    for claim in claims[:limit or None]:
+        sources = '; '.join(index.entries[key].title for key in claim.sources)
+        console.print(f"  [blue]{claim.reliability:.2f}[/blue] [bold]{claim.profile_id}[/bold]: {claim.text}")
+        console.print(f"       [dim]{sources}[/dim]")
+    console.print(f"[dim]{len(claims)} claims with evidence reliability >= {min_reliability:g}[/dim]")
+
+@app.command("compile")
+def compile_corpus(
+    profiles_dir: str = typer.Option("profiles", "--profiles-dir", help="Directory of profile JSON files"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Snapshot path (default: next to the manifest)")
+):
+    """Compile profiles, search index and prompt fragments into a snapshot for fast startup."""
+    profile_manager = ProfileManager(profiles_dir, use_snapshot=False)
+    snapshot_path = Path(output) if output else profile_manager.snapshot_path
+    
+    stale = profile_manager.manifest_mismatches()
+    if stale:
+        console.print(f"[yellow]{len(stale)} profiles differ from {profile_manager.manifest_path}; "
+                      f"run `python manifest.py` or the snapshot will never be considered fresh[/yellow]")
+    
+    stats = write_snapshot(profile_manager, snapshot_path)
+    console.print(f"[green]Wrote {stats['profiles']} profiles ({stats['bytes']:,} bytes) to {snapshot_path}[/green]")
+
+@app.command("validate")
+def validate_corpus(
+    profiles_dir: str = typer.Option("profiles", "--profiles-dir", help="Directory of profile JSON files"),
+    edges: str = typer.Option("links/edges.json", "--edges", help="Links file to validate"),
+    workers: int = typer.Option(0, "--workers", "-j", help="Worker processes (0 = one per CPU for large corpora)"),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="Skip files validated before with the same content")
+):
+    """Validate every profile and the links file against their schemas."""
+    profile_files = sorted(Path(profiles_dir).glob("*.json"))
+    if workers <= 0:
+        workers = default_workers() if len(profile_files) >= 500 else 1
+    cache = ValidationCache(default_manifest_path(Path(profiles_dir)).with_name("validation-cache.json")) if use_cache else None
+    
+    results = validate_files(profile_files, PROFILE_SCHEMA, cache=cache, workers=workers)
+    if Path(edges).exists():
+        results.update(validate_files([Path(edges)], EDGES_SCHEMA, cache=cache))
+    if cache is not None:
+        cache.save()
+    
+    failed = {path: errors for path, errors in results.items() if errors}
+    for path, errors in sorted(failed.items()):
+        console.print(f"\n[bold red]{path}[/bold red] ({len(errors)} errors)")
+        for error in errors:
+            console.print(f"  {error}")
+    
+    cached = f", {cache.hits} unchanged" if cache is not None else ""
+    if failed:
+        console.print(f"\n[red]{len(failed)} of {len(results)} files failed validation{cached}[/red]")
+        raise typer.Exit(code=1)
+    console.print(f"[green]All {len(results)} files are valid{cached}[/green]")
 
 if __name__ == "__main__":
-    typer.run(main)
+    app()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Concurrent fan-out of one question to many CLEARLIST profile agents.
+Results are yielded as each persona finishes, not in request order.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Iterable, NamedTuple, Optional
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 60.0
+
+# Result statuses
+OK = 'ok'
+TIMEOUT = 'timeout'
+ERROR = 'error'
+
+
+class PersonaResult(NamedTuple):
+    """One persona's answer (or failure) to a fanned-out question."""
+    profile_id: str
+    name: str
+    status: str
+    response: Optional[str]
+    error: Optional[str]
+    # Seconds from acquiring a concurrency slot to completion
+    elapsed: float
+
+
+async def _ask_one(agent, question: str, semaphore: asyncio.Semaphore, timeout: Optional[float]) -> PersonaResult:
+    async with semaphore:
+        # The timeout starts once the request is actually sent, not while queued
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(agent.complete(question), timeout)
+        except asyncio.TimeoutError:
+            return PersonaResult(agent.id, agent.name, TIMEOUT, None, f"no response within {timeout}s",
+                                 time.perf_counter() - start)
+        except Exception as e:
+            return PersonaResult(agent.id, agent.name, ERROR, None, str(e), time.perf_counter() - start)
+        return PersonaResult(agent.id, agent.name, OK, response, None, time.perf_counter() - start)
+
+
+async def ask_many(question: str, agents: Iterable, concurrency: int = DEFAULT_CONCURRENCY,
+                   timeout: Optional[float] = DEFAULT_TIMEOUT) -> AsyncIterator[PersonaResult]:
+    """Ask every agent the same question, yielding results in completion order.
+
+    At most `concurrency` requests are in flight at once, and each persona gets
+    its own `timeout`. A slow or failing persona never holds back the others.
+    Closing the iterator early cancels the requests still pending.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tasks = [asyncio.ensure_future(_ask_one(agent, question, semaphore, timeout)) for agent in agents]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Link graph over CLEARLIST profiles, loaded from links/edges.json.
+
+Profile ids and edge types are interned to integers and the edges kept in
+CSR form: per direction, an offsets array over the profiles plus the edges'
+targets and type codes, sorted by (source, type, target). A profile's links
+are one contiguous slice and its links of one type a sub-slice found by
+binary search, so a neighbour query costs the same on a million edges as on
+ten, and each edge takes 5 bytes per direction. Breadth-first queries
+(k-hop, shortest path, lineage) expand a whole frontier per step with array
+operations.
+
+The links file is decoded one record at a time, so loading never holds all
+edges as Python objects.
+"""
+
+import json
+import re
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_EDGES = Path("links") / "edges.json"
+
+OUT, IN, BOTH = "out", "in", "both"
+DIRECTIONS = (OUT, IN, BOTH)
+
+# Lineage edge types: for these `from` is the teacher of `to` ...
+TEACHER_TYPES = ("teacher_of", "guru_of", "lineage")
+# ... and for these `to` is the teacher of `from`
+STUDENT_TYPES = ("student_of", "disciple_of")
+
+_SEPARATORS = re.compile(r"[\s,]*")
+_READ_SIZE = 1 << 20
+
+
+def default_edges_path(profiles_dir: Path) -> Path:
+    """The links file that sits next to a profiles directory."""
+    return Path(profiles_dir).parent / DEFAULT_EDGES
+
+
+def iter_edges(path: Path, read_size: int = _READ_SIZE) -> Iterator[Dict]:
+    """Records of a links file (a JSON array), decoded one at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, pos = f.read(read_size), 0
+
+        def read_more() -> bool:
+            nonlocal buffer, pos
+            data = f.read(read_size)
+            buffer, pos = buffer[pos:] + data, 0
+            return bool(data)
+
+        pos = _SEPARATORS.match(buffer).end()
+        if pos == len(buffer) and not read_more():
+            return
+        if buffer[pos] != '[':
+            raise ValueError(f"{path}: expected a JSON array of links")
+        pos += 1
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos == len(buffer):
+                if not read_more():
+                    raise ValueError(f"{path}: unterminated JSON array")
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # Most likely a record cut by the read boundary
+                if not read_more():
+                    raise ValueError(f"{path}: {e}") from None
+                continue
+            yield record
+
+
+def edge_tuples(records: Iterable[Dict], skipped: Optional[List[int]] = None) -> Iterator[Tuple[str, str, str]]:
+    """(from, to, type) of each well-formed record; positions of the others go to `skipped`."""
+    for position, record in enumerate(records):
+        if isinstance(record, dict):
+            from_id, to_id, edge_type = record.get('from'), record.get('to'), record.get('type')
+            if isinstance(from_id, str) and isinstance(to_id, str) and isinstance(edge_type, str):
+                yield from_id, to_id, edge_type
+                continue
+        if skipped is not None:
+            skipped.append(position)
+
+
+class _Adjacency(NamedTuple):
+    """CSR adjacency of one direction: row i is targets[offsets[i]:offsets[i + 1]]."""
+    offsets: np.ndarray
+    targets: np.ndarray
+    # Edge type code of each target; ascending within a row
+    kinds: np.ndarray
+
+
+def _adjacency(count: int, sources: np.ndarray, kinds: np.ndarray, targets: np.ndarray) -> _Adjacency:
+    order = np.lexsort((targets, kinds, sources))
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=count), out=offsets[1:])
+    return _Adjacency(offsets, targets[order], kinds[order])
+
+
+class ProfileGraph:
+    """Typed, directed links between profile ids, with forward and reverse indexes.
+
+    Immutable once built: ProfileManager swaps in a new graph when the links
+    file changes, so queries never need a lock. Links may name profiles that
+    are not in the corpus; they are kept and returned like any other id.
+    """
+
+    def __init__(self, edges: Iterable[Tuple[str, str, str]] = ()):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.types: List[str] = []
+        self.type_codes: Dict[str, int] = {}
+        sources, targets, kinds = array('i'), array('i'), array('B')
+        for from_id, to_id, edge_type in edges:
+            sources.append(self._intern(from_id))
+            targets.append(self._intern(to_id))
+            kind = self.type_codes.get(edge_type)
+            if kind is None:
+                if len(self.types) > 255:
+                    raise ValueError("more than 256 link types")
+                kind = self.type_codes[edge_type] = len(self.types)
+                self.types.append(edge_type)
+            kinds.append(kind)
+
+        sources = np.frombuffer(sources, dtype=np.intc).astype(np.int32) if sources else np.zeros(0, np.int32)
+        targets = np.frombuffer(targets, dtype=np.intc).astype(np.int32) if targets else np.zeros(0, np.int32)
+        kinds = np.frombuffer(kinds, dtype=np.uint8) if kinds else np.zeros(0, np.uint8)
+        count = len(self.ids)
+        self.forward = _adjacency(count, sources, kinds, targets)
+        # Repeated links collapse to one
+        row_sources = np.repeat(np.arange(count, dtype=np.int32), np.diff(self.forward.offsets))
+        keep = np.ones(len(row_sources), dtype=bool)
+        keep[1:] = ((row_sources[1:] != row_sources[:-1]) | (self.forward.kinds[1:] != self.forward.kinds[:-1])
+                    | (self.forward.targets[1:] != self.forward.targets[:-1]))
+        if not keep.all():
+            row_sources = row_sources[keep]
+            self.forward = _adjacency(count, row_sources, self.forward.kinds[keep], self.forward.targets[keep])
+        self.reverse = _adjacency(count, self.forward.targets, self.forward.kinds, row_sources)
+
+    @classmethod
+    def load(cls, path: Path, skipped: Optional[List[int]] = None) -> "ProfileGraph":
+        """Graph of a links file; malformed records are left out (their positions go to `skipped`)."""
+        return cls(edge_tuples(iter_edges(Path(path)), skipped))
+
+    def _intern(self, profile_id: str) -> int:
+        node = self.index.get(profile_id)
+        if node is None:
+            node = self.index[profile_id] = len(self.ids)
+            self.ids.append(profile_id)
+        return node
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, profile_id: str) -> bool:
+        return profile_id in self.index
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.forward.targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the adjacency arrays (the id table not included)."""
+        return sum(values.nbytes for adjacency in (self.forward, self.reverse) for values in adjacency)
+
+    def stats(self) -> Dict[str, int]:
+        return {"profiles": len(self.ids), "links": self.edge_count, "types": len(self.types), "bytes": self.nbytes}
+
+    def _steps(self, edge_type: Optional[str], direction: str) -> List[Tuple[_Adjacency, Optional[int]]]:
+        """(adjacency, type code or None for all) pairs a query walks."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {', '.join(DIRECTIONS)}, not '{direction}'")
+        if edge_type is not None and edge_type not in self.type_codes:
+            return []
+        kind = None if edge_type is None else self.type_codes[edge_type]
+        adjacencies = {OUT: [self.forward], IN: [self.reverse], BOTH: [self.forward, self.reverse]}[direction]
+        return [(adjacency, kind) for adjacency in adjacencies]
+
+    @staticmethod
+    def _row(adjacency: _Adjacency, node: int, kind: Optional[int]) -> np.ndarray:
+        start, end = adjacency.offsets[node], adjacency.offsets[node + 1]
+        if kind is not None:
+            row_kinds = adjacency.kinds[start:end]
+            start, end = (start + np.searchsorted(row_kinds, kind, 'left'),
+                          start + np.searchsorted(row_kinds, kind, 'right'))
+        return adjacency.targets[start:end]
+
+    @staticmethod
+    def _expand(frontier: np.ndarray, steps: Sequence[Tuple[_Adjacency, Optional[int]]]) -> Tuple[np.ndarray, np.ndarray]:
+        """(source, target) of every link the steps follow out of the frontier."""
+        sources, targets = [], []
+        for adjacency, kind in steps:
+            starts = adjacency.offsets[frontier]
+            counts = adjacency.offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                continue
+            # Position of every edge in the frontier rows, row after row
+            edges = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+            row_sources = np.repeat(frontier, counts)
+            if kind is not None:
+                match = adjacency.kinds[edges] == kind
+                edges, row_sources = edges[match], row_sources[match]
+            sources.append(row_sources)
+            targets.append(adjacency.targets[edges])
+        if not sources:
+            return np.zeros(0, np.int32), np.zeros(0, np.int32)
+        return np.concatenate(sources), np.concatenate(targets)
+
+    def _search(self, start: int, steps: Sequence[Tuple[_Adjacency, Optional[int]]], max_depth: Optional[int] = None,
+                goal: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Breadth-first hop counts (-1 unreached) and BFS-tree parents from `start`."""
+        depth = np.full(len(self.ids), -1, dtype=np.int32)
+        parent = np.full(len(self.ids), -1, dtype=np.int32)
+        depth[start] = 0
+        frontier = np.array([start], dtype=np.int32)
+        level = 0
+        while frontier.size and (max_depth is None or level < max_depth) and (goal is None or depth[goal] < 0):
+            level += 1
+            sources, targets = self._expand(frontier, steps)
+            new = depth[targets] < 0
+            frontier, first = np.unique(targets[new], return_index=True)
+            depth[frontier] = level
+            parent[frontier] = sources[new][first]
+        return depth, parent
+
+    def _ranked(self, depth: np.ndarray) -> Dict[str, int]:
+        reached = np.flatnonzero(depth > 0)
+        reached = reached[np.argsort(depth[reached], kind='stable')]
+        return {self.ids[node]: int(depth[node]) for node in reached.tolist()}
+
+    def neighbors(self, profile_id: str, edge_type: Optional[str] = None, direction: str = BOTH) -> List[str]:
+        """Profiles linked to profile_id, optionally only by links of one type."""
+        node = self.index.get(profile_id)
+        steps = self._steps(edge_type, direction)
+        if node is None or not steps:
+            return []
+        rows = [self._row(adjacency, node, kind) for adjacency, kind in steps]
+        nodes = rows[0] if len(rows) == 1 and edge_type is not None else np.unique(np.concatenate(rows))
+        return [self.ids[target] for target in nodes.tolist()]
+
+    def links(self, profile_id: str) -> List[Tuple[str, str, str]]:
+        """(linked id, link type, OUT or IN) of every link of profile_id, outgoing first."""
+        node = self.index.get(profile_id)
+        if node is None:
+            return []
+        result = []
+        for adjacency, direction in ((self.forward, OUT), (self.reverse, IN)):
+            start, end = adjacency.offsets[node], adjacency.offsets[node + 1]
+            result.extend((self.ids[target], self.types[kind], direction) for target, kind in
+                          zip(adjacency.targets[start:end].tolist(), adjacency.kinds[start:end].tolist()))
+        return result
+
+    def k_hop(self, profile_id: str, hops: int = 2, edge_type: Optional[str] = None,
+              direction: str = BOTH) -> Dict[str, int]:
+        """Profiles within `hops` links of profile_id mapped to their distance, nearest first."""
+        node = self.index.get(profile_id)
+        steps = self._steps(edge_type, direction)
+        if node is None or not steps or hops < 1:
+            return {}
+        return self._ranked(self._search(node, steps, max_depth=hops)[0])
+
+    def shortest_path(self, from_id: str, to_id: str, edge_type: Optional[str] = None,
+                      direction: str = BOTH, max_depth: Optional[int] = None) -> Optional[List[str]]:
+        """Fewest-hop chain of profile ids from from_id to to_id, or None if they are not connected."""
+        start, goal = self.index.get(from_id), self.index.get(to_id)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return [from_id]
+        steps = self._steps(edge_type, direction)
+        if not steps:
+            return None
+        depth, parent = self._search(start, steps, max_depth=max_depth, goal=goal)
+        if depth[goal] < 0:
+            return None
+        path = [goal]
+        while path[-1] != start:
+            path.append(int(parent[path[-1]]))
+        return [self.ids[node] for node in reversed(path)]
+
+    def lineage(self, profile_id: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """Teachers, their teachers and so on, mapped to generations back (1 = direct teacher)."""
+        node = self.index.get(profile_id)
+        if node is None:
+            return {}
+        steps = [(self.reverse, self.type_codes[edge_type]) for edge_type in TEACHER_TYPES
+                 if edge_type in self.type_codes]
+        steps += [(self.forward, self.type_codes[edge_type]) for edge_type in STUDENT_TYPES
+                  if edge_type in self.type_codes]
+        if not steps:
+            return {}
+        return self._ranked(self._search(node, steps, max_depth=max_depth)[0])
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Search index for CLEARLIST profiles.
+Keeps token postings and an n-gram index so searches never scan the whole corpus.
+"""
+
+import heapq
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+# Field ranks, lower is better: name > alt_name > keyword
+FIELD_RANKS = {'name': 0, 'alt_name': 1, 'keyword': 2}
+
+# Match quality within a field, lower is better
+EXACT, TOKEN, PREFIX, SUBSTRING = range(4)
+
+NGRAM_SIZE = 3
+
+_TOKEN_SPLIT = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Case-fold and strip diacritics so 'Vedānta' matches 'vedanta'."""
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into word tokens."""
+    return [token for token in _TOKEN_SPLIT.split(text) if token]
+
+
+def _ngrams(term: str, size: int) -> Set[str]:
+    if len(term) <= size:
+        return {term}
+    return {term[i:i + size] for i in range(len(term) - size + 1)}
+
+
+def _index_grams(term: str) -> Set[str]:
+    """Every 1-, 2- and 3-gram of a term, so short queries are indexed too."""
+    grams: Set[str] = set()
+    for size in range(1, NGRAM_SIZE + 1):
+        if len(term) >= size:
+            grams.update(term[i:i + size] for i in range(len(term) - size + 1))
+    return grams
+
+
+def _profile_fields(profile: Dict) -> List[Tuple[str, int]]:
+    fields = [(profile.get('canonical_name', ''), FIELD_RANKS['name'])]
+    fields.extend((alt_name, FIELD_RANKS['alt_name']) for alt_name in profile.get('alt_names', []))
+    fields.extend((keyword, FIELD_RANKS['keyword']) for keyword in profile.get('keywords', []))
+    return fields
+
+
+class ProfileSearchIndex:
+    """Inverted index over profile names, alternate names and keywords.
+
+    Searches copy posting lists before iterating them, so a profile can be
+    added or removed from another thread while searches are running.
+    """
+
+    def __init__(self):
+        # normalized term -> {profile_id: best field rank}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # token -> {profile_id: best field rank}
+        self._tokens: Dict[str, Dict[str, int]] = {}
+        # n-gram -> terms containing it
+        self._grams: Dict[str, Set[str]] = {}
+        # profile_id -> terms indexed for it, for removal
+        self._profile_terms: Dict[str, Set[str]] = {}
+        # profile_id -> insertion order, for stable ranking
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._profile_terms)
+
+    def __contains__(self, profile_id: str) -> bool:
+        return profile_id in self._profile_terms
+
+    def add(self, profile_id: str, profile: Dict):
+        """Index a profile, replacing any previous entry for the same id."""
+        if profile_id in self._profile_terms:
+            self._unindex(profile_id)
+        else:
+            self._order[profile_id] = self._next_order
+            self._next_order += 1
+
+        terms: Set[str] = set()
+        for text, rank in _profile_fields(profile):
+            term = normalize(text)
+            if not term:
+                continue
+            terms.add(term)
+
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                for gram in _index_grams(term):
+                    self._grams.setdefault(gram, set()).add(term)
+            postings[profile_id] = min(rank, postings.get(profile_id, rank))
+
+            for token in tokenize(term):
+                token_postings = self._tokens.setdefault(token, {})
+                token_postings[profile_id] = min(rank, token_postings.get(profile_id, rank))
+
+        self._profile_terms[profile_id] = terms
+
+    def remove(self, profile_id: str):
+        """Drop a profile from the index."""
+        if profile_id in self._profile_terms:
+            self._unindex(profile_id)
+            del self._profile_terms[profile_id]
+            del self._order[profile_id]
+
+    def _unindex(self, profile_id: str):
+        for term in self._profile_terms[profile_id]:
+            postings = self._postings[term]
+            postings.pop(profile_id, None)
+            if not postings:
+                del self._postings[term]
+                for gram in _index_grams(term):
+                    terms = self._grams[gram]
+                    terms.discard(term)
+                    if not terms:
+                        del self._grams[gram]
+
+            for token in tokenize(term):
+                token_postings = self._tokens.get(token)
+                if token_postings is not None:
+                    token_postings.pop(profile_id, None)
+                    if not token_postings:
+                        del self._tokens[token]
+
+    def _candidate_terms(self, query: str) -> Set[str]:
+        gram_sets = []
+        for gram in _ngrams(query, NGRAM_SIZE):
+            terms = self._grams.get(gram)
+            if not terms:
+                return set()
+            gram_sets.append(terms)
+        gram_sets.sort(key=len)
+        candidates = set(gram_sets[0])
+        for terms in gram_sets[1:]:
+            candidates &= terms
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[str]:
+        """Return profile ids whose name, alt names or keywords contain the query, best first."""
+        query = normalize(query)
+        order = self._order
+
+        if not query:
+            ranked = sorted(order.items(), key=lambda item: item[1])
+            ranked = [profile_id for profile_id, _ in ranked]
+        else:
+            best: Dict[str, Tuple[int, int]] = {}
+            query_tokens = set(tokenize(query))
+            for term in self._candidate_terms(query):
+                if query not in term:
+                    continue
+                if term == query:
+                    quality = EXACT
+                elif term.startswith(query):
+                    quality = PREFIX
+                else:
+                    quality = SUBSTRING
+                for profile_id, rank in list(self._postings.get(term, {}).items()):
+                    score = (rank, quality)
+                    if score < best.get(profile_id, (len(FIELD_RANKS), SUBSTRING + 1)):
+                        best[profile_id] = score
+
+            # Whole-token hits outrank prefix and substring hits in the same field
+            if len(query_tokens) == 1:
+                for profile_id, rank in list(self._tokens.get(next(iter(query_tokens)), {}).items()):
+                    if profile_id in best and best[profile_id] > (rank, TOKEN):
+                        best[profile_id] = (rank, TOKEN)
+
+            def rank_key(profile_id):
+                return best[profile_id], order.get(profile_id, -1)
+
+            if limit is None:
+                ranked = sorted(best, key=rank_key)
+            else:
+                ranked = heapq.nsmallest(offset + limit, best, key=rank_key)
+
+        end = None if limit is None else offset + limit
+        return ranked[offset:end]
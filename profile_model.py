@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Typed, immutable profile model for CLEARLIST.
+
+Mirrors schemas/profile.schema.json with slotted records. Arrays become
+tuples, short repeated strings (ids, names, keywords, places) are interned,
+and nested objects become records, so a loaded corpus takes far less memory
+than nested dicts and fields are plain attribute reads.
+
+Records are also read-only Mappings, so existing dict-style code such as
+`profile.get('affiliations', {}).get('traditions', [])` keeps working.
+Absent optional fields are stored as None and behave as missing keys.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# Profile versions kept by each VersionCache
+VERSION_CACHE_SIZE = 1024
+
+# Field kinds
+TEXT = 'text'          # free text, stored as-is
+NAME = 'name'          # short, frequently repeated string, interned
+VALUE = 'value'        # number, boolean or untyped JSON value
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _freeze(value):
+    """Deep-freeze an untyped JSON value."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Convert model values back to plain JSON types."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, (Mapping, MappingProxyType)):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class Record(Mapping):
+    """Immutable slotted record with read-only mapping access to its fields."""
+
+    __slots__ = ('_extras',)
+    # field name -> kind: TEXT, NAME, VALUE, a Record subclass, or a 1-tuple of one of those for arrays
+    _schema: Dict[str, Any] = {}
+
+    def __init__(self, **fields):
+        for name in self._schema:
+            object.__setattr__(self, name, fields.pop(name, None))
+        object.__setattr__(self, '_extras', MappingProxyType(fields) if fields else None)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Record":
+        """Build a record from parsed JSON."""
+        if isinstance(data, cls):
+            return data
+        fields = {}
+        for name, value in data.items():
+            kind = cls._schema.get(name)
+            fields[name] = _freeze(value) if kind is None else _convert(kind, value)
+        return cls(**fields)
+
+    def to_dict(self) -> Dict:
+        """Plain JSON-compatible dict, omitting absent fields."""
+        return {name: _thaw(value) for name, value in self.items()}
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getitem__(self, key: str):
+        if key in self._schema:
+            value = getattr(self, key)
+        elif self._extras is not None and key in self._extras:
+            value = self._extras[key]
+        else:
+            raise KeyError(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default=None):
+        if key in self._schema:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self._extras is not None:
+            return self._extras.get(key, default)
+        return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._schema:
+            if getattr(self, name) is not None:
+                yield name
+        if self._extras is not None:
+            yield from self._extras
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), dict(self.items())))
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={value!r}" for name, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+
+def _rebuild(cls, fields):
+    return cls(**fields)
+
+
+def _convert(kind, value):
+    if value is None:
+        return None
+    if isinstance(kind, tuple):
+        if not isinstance(value, (list, tuple)):
+            return _freeze(value)
+        return tuple(_convert(kind[0], item) for item in value)
+    if kind is NAME:
+        return _intern(value)
+    if kind is TEXT:
+        return value
+    if kind is VALUE:
+        return _freeze(value)
+    if isinstance(value, dict):
+        return kind.from_dict(value)
+    return _freeze(value)
+
+
+class LifeEvent(Record):
+    __slots__ = ('date', 'place')
+    _schema = {'date': NAME, 'place': NAME}
+
+
+class Life(Record):
+    __slots__ = ('born', 'died')
+    _schema = {'born': LifeEvent, 'died': LifeEvent}
+
+
+class Affiliations(Record):
+    __slots__ = ('traditions', 'schools', 'orders')
+    _schema = {'traditions': (NAME,), 'schools': (NAME,), 'orders': (NAME,)}
+
+
+class Claim(Record):
+    __slots__ = ('text', 'evidence', 'notes')
+    _schema = {'text': TEXT, 'evidence': (NAME,), 'notes': TEXT}
+
+
+class Practice(Record):
+    __slots__ = ('name', 'steps')
+    _schema = {'name': NAME, 'steps': (TEXT,)}
+
+
+class Saying(Record):
+    __slots__ = ('text', 'source', 'verified', 'license')
+    _schema = {'text': TEXT, 'source': TEXT, 'verified': VALUE, 'license': NAME}
+
+
+class GeoPlace(Record):
+    __slots__ = ('place', 'lat', 'lng')
+    _schema = {'place': NAME, 'lat': VALUE, 'lng': VALUE}
+
+
+class Media(Record):
+    __slots__ = ('images', 'audio', 'video')
+    _schema = {'images': (VALUE,), 'audio': (VALUE,), 'video': (VALUE,)}
+
+
+class Source(Record):
+    __slots__ = ('id', 'title', 'url', 'reliability', 'notes')
+    _schema = {'id': NAME, 'title': TEXT, 'url': TEXT, 'reliability': VALUE, 'notes': TEXT}
+
+
+class Provenance(Record):
+    __slots__ = ('sources', 'external_ids', 'last_reviewed', 'reviewer')
+    _schema = {'sources': (Source,), 'external_ids': VALUE, 'last_reviewed': NAME, 'reviewer': NAME}
+
+
+class License(Record):
+    __slots__ = ('text', 'media_notes')
+    _schema = {'text': NAME, 'media_notes': TEXT}
+
+
+class QAPair(Record):
+    __slots__ = ('q', 'a')
+    _schema = {'q': TEXT, 'a': TEXT}
+
+
+class AIHints(Record):
+    __slots__ = ('synopsis', 'qa_pairs')
+    _schema = {'synopsis': TEXT, 'qa_pairs': (QAPair,)}
+
+
+class SEO(Record):
+    __slots__ = ('slug', 'summary')
+    _schema = {'slug': NAME, 'summary': TEXT}
+
+
+class Profile(Record):
+    """A profile capsule (schemas/profile.schema.json)."""
+
+    __slots__ = ('id', 'version', 'status', 'canonical_name', 'alt_names', 'pronunciation', 'external_titles',
+                 'life', 'affiliations', 'thesis', 'keywords', 'claims', 'practice', 'sayings', 'care_notes',
+                 'geo', 'media', 'provenance', 'license', 'ai', 'seo')
+    _schema = {
+        'id': NAME,
+        'version': NAME,
+        'status': NAME,
+        'canonical_name': NAME,
+        'alt_names': (NAME,),
+        'pronunciation': TEXT,
+        'external_titles': (NAME,),
+        'life': Life,
+        'affiliations': Affiliations,
+        'thesis': TEXT,
+        'keywords': (NAME,),
+        'claims': (Claim,),
+        'practice': (Practice,),
+        'sayings': (Saying,),
+        'care_notes': (TEXT,),
+        'geo': (GeoPlace,),
+        'media': Media,
+        'provenance': Provenance,
+        'license': License,
+        'ai': AIHints,
+        'seo': SEO,
+    }
+
+    @property
+    def traditions(self) -> Tuple[str, ...]:
+        """Affiliated traditions, empty if none are recorded."""
+        return self.affiliations.traditions or () if self.affiliations is not None else ()
+
+
+def as_profile(profile_data) -> Optional[Profile]:
+    """Accept a Profile or a parsed profile dict."""
+    if profile_data is None or isinstance(profile_data, Profile):
+        return profile_data
+    return Profile.from_dict(profile_data)
+
+
+class VersionCache:
+    """Objects built from a profile, shared per (id, version), least recently used dropped first."""
+
+    def __init__(self, build: Callable[[Profile], Any], max_entries: int = VERSION_CACHE_SIZE):
+        self.build = build
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> Tuple[Tuple[str, str], ...]:
+        """Cached (id, version) keys, least recently used first."""
+        with self._lock:
+            return tuple(self._entries)
+
+    def get(self, profile_data) -> Any:
+        """The object for a profile version, built on first use."""
+        profile = as_profile(profile_data)
+        key = (profile.id or 'unknown', profile.version or '')
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+        # Built outside the lock; a concurrent build of the same version is harmless
+        value = self.build(profile)
+        self.seed(key, value)
+        return value
+
+    def seed(self, key: Tuple[str, str], value: Any):
+        """Register an object built elsewhere, unless one is cached already."""
+        with self._lock:
+            self._entries.setdefault(key, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, profile_id: str):
+        """Drop every version of a profile."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == profile_id]:
+                del self._entries[key]
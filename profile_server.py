@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+HTTP serving mode for CLEARLIST profile agents (aiohttp).
+
+    GET  /health
+    GET  /profiles?limit=&offset=         catalog listing
+    GET  /profiles?filter=tradition=Zen   faceted listing with facet counts (filter repeatable)
+    GET  /profiles/search?q=&limit=       ranked name/keyword search
+    GET  /profiles/near?lat=&lng=&radius_km=
+                                          profiles with a place within radius_km, nearest first
+    GET  /profiles/near?bbox=s,w,n,e      profiles with a place inside a bounding box
+    GET  /profiles/{id}                   full profile
+    POST /profiles/{id}/chat              {"message": ..., "session_id": ..., "stream": false}
+
+Chat answers are JSON, or Server-Sent Events when "stream" is true or the
+client accepts text/event-stream. Each process shares one ProfileManager,
+one pooled LLM client and one response cache across all requests; chat
+sessions live in the SQLite session store, so any worker can continue them.
+With several workers, the corpus is loaded once and the workers are forked
+from it, sharing its memory copy-on-write and one listening socket.
+"""
+
+import asyncio
+import gc
+import json
+import os
+import signal
+import socket
+import traceback
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from conversation_memory import ConversationMemory, ConversationStore, default_sessions_path
+from geo_index import parse_bbox
+from llm_client import ChatClient, CircuitOpenError, get_llm_client, share_rate_limits
+from profile_agent import ProfileAgent, ProfileManager, console
+from prompt_fragments import get_prompt_fragments
+from qa_lookup import get_qa_matcher
+from response_cache import ResponseCache, default_response_cache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_PAGE_SIZE = 50
+# Seconds in-flight requests get to finish on shutdown
+SHUTDOWN_TIMEOUT = 30.0
+
+MANAGER = web.AppKey("manager", ProfileManager)
+CLIENT = web.AppKey("client", object)
+RESPONSE_CACHE = web.AppKey("response_cache", object)
+SESSIONS = web.AppKey("sessions", object)
+
+
+def _error(status: int, message: str) -> web.Response:
+    return web.json_response({"error": message}, status=status)
+
+
+def _sse(data: Dict, event: Optional[str] = None) -> bytes:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def _int_param(request: web.Request, name: str, default: int) -> int:
+    try:
+        return max(0, int(request.query.get(name, default)))
+    except ValueError:
+        raise web.HTTPBadRequest(text=json.dumps({"error": f"'{name}' must be an integer"}),
+                                 content_type="application/json")
+
+
+def _summary(manager: ProfileManager, profile_id: str) -> Dict:
+    entry = manager.profile_summary(profile_id) or {}
+    return {"id": profile_id, "canonical_name": entry.get("canonical_name", profile_id),
+            "traditions": entry.get("traditions", [])}
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok", "profiles": len(request.app[MANAGER].profiles), "pid": os.getpid()})
+
+
+async def list_profiles(request: web.Request) -> web.Response:
+    manager = request.app[MANAGER]
+    limit = _int_param(request, "limit", DEFAULT_PAGE_SIZE)
+    offset = _int_param(request, "offset", 0)
+    filters = request.query.getall("filter", [])
+    if filters:
+        try:
+            result = manager.filter_profiles(filters, limit=limit, offset=offset)
+        except ValueError as e:
+            return _error(400, str(e))
+        return web.json_response({"total": result.total, "profiles": [_summary(manager, pid) for pid in result.ids],
+                                  "facets": result.counts})
+    profile_ids = manager.list_profiles()
+    page = profile_ids[offset:offset + limit]
+    return web.json_response({"total": len(profile_ids), "profiles": [_summary(manager, pid) for pid in page]})
+
+
+async def search_profiles(request: web.Request) -> web.Response:
+    query = request.query.get("q", "").strip()
+    if not query:
+        return _error(400, "missing query parameter 'q'")
+    manager = request.app[MANAGER]
+    limit = _int_param(request, "limit", DEFAULT_PAGE_SIZE)
+    offset = _int_param(request, "offset", 0)
+    results = manager.search_profiles(query, limit=limit, offset=offset)
+    return web.json_response({"query": query, "profiles": [_summary(manager, pid) for pid in results]})
+
+
+async def near_profiles(request: web.Request) -> web.Response:
+    manager = request.app[MANAGER]
+    limit = _int_param(request, "limit", DEFAULT_PAGE_SIZE)
+    try:
+        if "bbox" in request.query:
+            hits = manager.geo.within_bbox(*parse_bbox(request.query["bbox"]), limit=limit)
+        elif "lat" in request.query and "lng" in request.query:
+            hits = manager.profiles_near(float(request.query["lat"]), float(request.query["lng"]),
+                                         float(request.query.get("radius_km", 100)), limit=limit)
+        else:
+            return _error(400, "give 'lat' and 'lng' (and optionally 'radius_km'), or 'bbox'")
+    except ValueError as e:
+        return _error(400, str(e))
+    return web.json_response({"profiles": [dict(_summary(manager, hit.profile_id), place=hit.place, lat=hit.lat,
+                                                 lng=hit.lng, distance_km=hit.distance_km) for hit in hits]})
+
+
+async def get_profile(request: web.Request) -> web.Response:
+    profile = request.app[MANAGER].get_profile(request.match_info["profile_id"])
+    if profile is None:
+        return _error(404, f"profile '{request.match_info['profile_id']}' not found")
+    return web.json_response(profile.to_dict())
+
+
+async def chat(request: web.Request) -> web.StreamResponse:
+    profile_id = request.match_info["profile_id"]
+    profile = request.app[MANAGER].get_profile(profile_id)
+    if profile is None:
+        return _error(404, f"profile '{profile_id}' not found")
+    try:
+        body = await request.json()
+    except ValueError:
+        return _error(400, "request body must be JSON")
+    message = body.get("message") if isinstance(body, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        return _error(400, "'message' must be a non-empty string")
+
+    session_id = body.get("session_id")
+    store: Optional[ConversationStore] = request.app[SESSIONS]
+    memory: Optional[ConversationMemory] = None
+    if session_id and store is not None:
+        # SQLite reads and commits block, so they run off the event loop
+        saved = await asyncio.to_thread(store.load, str(session_id))
+        if saved is not None and saved[0] != profile_id:
+            return _error(409, f"session '{session_id}' belongs to profile '{saved[0]}'")
+        memory = saved[1] if saved is not None else ConversationMemory()
+
+    agent = ProfileAgent(profile, request.app[CLIENT], request.app[RESPONSE_CACHE],
+                         linked_sections=request.app[MANAGER].linked_section)
+    if body.get("stream") or "text/event-stream" in request.headers.get("Accept", ""):
+        return await _stream_chat(request, agent, message, memory, session_id)
+
+    try:
+        parts = [chunk async for chunk in agent.respond_stream(message, memory)]
+    except CircuitOpenError as e:
+        return _error(503, str(e))
+    except Exception as e:
+        return _error(502, f"model request failed: {e}")
+    if memory is not None:
+        await asyncio.to_thread(store.save, str(session_id), profile_id, memory)
+    return web.json_response({"profile_id": profile_id, "response": ''.join(parts),
+                              "metrics": agent.turn_metrics[-1]._asdict()})
+
+
+async def _stream_chat(request: web.Request, agent: ProfileAgent, message: str,
+                       memory: Optional[ConversationMemory], session_id) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+    stream = agent.respond_stream(message, memory)
+    try:
+        async for chunk in stream:
+            await response.write(_sse({"delta": chunk}))
+    except ConnectionResetError:
+        # The client went away; nothing more to send
+        return response
+    except Exception as e:
+        await response.write(_sse({"error": str(e)}, event="error"))
+    else:
+        if memory is not None:
+            await asyncio.to_thread(request.app[SESSIONS].save, str(session_id), agent.id, memory)
+        await response.write(_sse(agent.turn_metrics[-1]._asdict(), event="done"))
+    finally:
+        await stream.aclose()
+    await response.write_eof()
+    return response
+
+
+async def _close_resources(app: web.Application):
+    client = app[CLIENT]
+    if hasattr(client, "aclose"):
+        await client.aclose()
+    if app[SESSIONS] is not None:
+        app[SESSIONS].close()
+
+
+def create_app(manager: ProfileManager, client: Optional[ChatClient] = None,
+               response_cache: Optional[ResponseCache] = None,
+               sessions: Optional[ConversationStore] = None) -> web.Application:
+    """The HTTP application; client, cache and session store default to the shared ones."""
+    app = web.Application()
+    app[MANAGER] = manager
+    app[CLIENT] = client if client is not None else get_llm_client()
+    app[RESPONSE_CACHE] = response_cache if response_cache is not None else default_response_cache()
+    app[SESSIONS] = sessions if sessions is not None else ConversationStore(default_sessions_path())
+    app.add_routes([
+        web.get("/health", health),
+        web.get("/profiles", list_profiles),
+        web.get("/profiles/search", search_profiles),
+        web.get("/profiles/near", near_profiles),
+        web.get("/profiles/{profile_id}", get_profile),
+        web.post("/profiles/{profile_id}/chat", chat),
+    ])
+    app.on_cleanup.append(_close_resources)
+    return app
+
+
+def preload(manager: ProfileManager):
+    """Build everything requests would otherwise build lazily, before workers fork."""
+    manager.search_index
+    manager.facets
+    manager.geo.stats()
+    for profile_id in manager.list_profiles():
+        profile = manager.get_profile(profile_id)
+        if profile is not None:
+            get_prompt_fragments(profile)
+            get_qa_matcher(profile)
+            manager.linked_section(profile_id)
+
+
+def _run_worker(manager: ProfileManager, sock: Optional[socket.socket] = None,
+                host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    # Session store and client pool are opened per process, never inherited across fork
+    app = create_app(manager)
+    if sock is not None:
+        web.run_app(app, sock=sock, shutdown_timeout=SHUTDOWN_TIMEOUT, print=None)
+    else:
+        web.run_app(app, host=host, port=port, shutdown_timeout=SHUTDOWN_TIMEOUT, print=None)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = 1,
+          profiles_dir: str = "profiles", lazy: bool = False):
+    """Serve until SIGINT/SIGTERM; in-flight requests get SHUTDOWN_TIMEOUT seconds to finish."""
+    if workers > 1 and not hasattr(os, "fork"):
+        console.print("[yellow]Multiple workers need os.fork(); serving with one worker.[/yellow]")
+        workers = 1
+    # Forked workers share the parent's corpus, so it is loaded in full up front
+    manager = ProfileManager(profiles_dir, lazy=lazy and workers == 1)
+    console.print(f"[green]Serving {len(manager.profiles)} profiles on http://{host}:{port} "
+                  f"with {workers} worker(s)[/green]")
+    if workers == 1:
+        _run_worker(manager, host=host, port=port)
+        return
+
+    preload(manager)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    # Keep the preloaded objects out of the collector so it does not dirty shared pages
+    gc.freeze()
+
+    children: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                # OPENAI_RPM/OPENAI_TPM are for the whole server, not for each worker
+                share_rate_limits(workers)
+                _run_worker(manager, sock)
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+            finally:
+                # Never fall back into the parent's code path
+                os._exit(status)
+        children.append(pid)
+    sock.close()
+
+    def stop(signum, frame):
+        for child in children:
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for child in children:
+        os.waitpid(child, 0)
+    console.print("[dim]All workers stopped.[/dim]")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Compiled snapshot of a CLEARLIST profile corpus.
+
+A snapshot is a single file holding every parsed profile, the catalog, the
+search index and the rendered prompt fragments, stamped with the manifest
+hashes it was built from. It is opened with mmap, so worker processes share
+the profile pages read-only and only decode the profiles they touch.
+
+Layout: MAGIC | u32 format | u64 header length | JSON header | data blobs
+"""
+
+import hashlib
+import json
+import mmap
+import pickle
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from profile_model import Profile
+from profile_store import DEFAULT_CACHE_SIZE, LazyProfiles
+from prompt_fragments import PromptFragments, get_prompt_fragments, seed_prompt_fragments
+
+SNAPSHOT_MAGIC = b"CLSNAPSH"
+# Bump whenever the layout or any pickled class changes shape
+SNAPSHOT_FORMAT = 6
+_PREAMBLE = struct.Struct("<8sIQ")
+
+DEFAULT_SNAPSHOT_NAME = "profiles.snapshot"
+
+
+def default_snapshot_path(manifest_path: Path) -> Path:
+    """The snapshot that sits next to a manifest."""
+    return Path(manifest_path).with_name(DEFAULT_SNAPSHOT_NAME)
+
+
+def manifest_digest(hashes: Dict[str, str]) -> str:
+    """Digest of a {profile_id: content hash} mapping, independent of order."""
+    digest = hashlib.sha256()
+    for profile_id in sorted(hashes):
+        digest.update(f"{profile_id}\0{hashes[profile_id]}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def write_snapshot(manager, snapshot_path: Path) -> Dict[str, int]:
+    """Compile an eagerly loaded ProfileManager into a snapshot file."""
+    snapshot_path = Path(snapshot_path)
+    hashes = {profile_id: manager._file_state[name][1]
+              for name, profile_id in manager._file_ids.items() if name in manager._file_state}
+    files = {profile_id: name for name, profile_id in manager._file_ids.items() if profile_id in hashes}
+
+    blobs = []
+    offset = 0
+
+    def add_blob(data: bytes) -> Tuple[int, int]:
+        nonlocal offset
+        blobs.append(data)
+        span = (offset, len(data))
+        offset += len(data)
+        return span
+
+    profiles = {}
+    for profile_id in hashes:
+        profile_data = manager.profiles[profile_id]
+        body = add_blob(json.dumps(profile_data.to_dict(), ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        fragments = get_prompt_fragments(profile_data)
+        profiles[profile_id] = {
+            "file": files[profile_id],
+            "hash": hashes[profile_id],
+            "body": body,
+            "fragments": add_blob(pickle.dumps(fragments, protocol=pickle.HIGHEST_PROTOCOL)),
+        }
+
+    catalog = {profile_id: manager.catalog[profile_id] for profile_id in hashes}
+    sections = {
+        "catalog": add_blob(json.dumps(catalog, ensure_ascii=False).encode('utf-8')),
+        "search_index": add_blob(pickle.dumps(manager.search_index, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+    header = json.dumps({
+        "manifest_digest": manifest_digest(hashes),
+        "profiles": profiles,
+        "sections": sections,
+    }, ensure_ascii=False).encode('utf-8')
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    # Atomic swap so running workers never see a half-written snapshot
+    tmp_path.replace(snapshot_path)
+    return {"profiles": len(profiles), "bytes": _PREAMBLE.size + len(header) + offset}
+
+
+class ProfileSnapshot:
+    """Read-only, memory-mapped view of a compiled snapshot."""
+
+    def __init__(self, snapshot_path: Path):
+        self.path = Path(snapshot_path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{self.path} is not a profile snapshot")
+        if version != SNAPSHOT_FORMAT:
+            raise ValueError(f"{self.path} has snapshot format {version}, expected {SNAPSHOT_FORMAT}")
+        header_end = _PREAMBLE.size + header_length
+        header = json.loads(self._mmap[_PREAMBLE.size:header_end])
+        self._data_start = header_end
+        self.manifest_digest: str = header["manifest_digest"]
+        self.entries: Dict[str, Dict] = header["profiles"]
+        self._sections: Dict[str, list] = header["sections"]
+
+    def _blob(self, span) -> bytes:
+        offset, length = span
+        start = self._data_start + offset
+        return self._mmap[start:start + length]
+
+    def profile(self, profile_id: str) -> Profile:
+        """Decode one profile body."""
+        return Profile.from_dict(json.loads(self._blob(self.entries[profile_id]["body"])))
+
+    def fragments(self, profile_id: str) -> PromptFragments:
+        """Unpickle the prompt fragments rendered at compile time."""
+        return pickle.loads(self._blob(self.entries[profile_id]["fragments"]))
+
+    def catalog(self) -> Dict[str, Dict]:
+        """Listing fields for every profile."""
+        return json.loads(self._blob(self._sections["catalog"]))
+
+    def search_index(self):
+        """The compiled ProfileSearchIndex."""
+        return pickle.loads(self._blob(self._sections["search_index"]))
+
+    def is_fresh(self, manifest_hashes: Dict[str, str]) -> bool:
+        """True if the snapshot was built from exactly the manifest's content."""
+        return bool(manifest_hashes) and manifest_digest(manifest_hashes) == self.manifest_digest
+
+    def close(self):
+        self._mmap.close()
+
+
+def open_fresh_snapshot(snapshot_path: Path, manifest_hashes: Dict[str, str]) -> Optional[ProfileSnapshot]:
+    """Open a snapshot if it exists, is readable and matches the manifest."""
+    snapshot_path = Path(snapshot_path)
+    if not snapshot_path.exists():
+        return None
+    try:
+        snapshot = ProfileSnapshot(snapshot_path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if not snapshot.is_fresh(manifest_hashes):
+        snapshot.close()
+        return None
+    return snapshot
+
+
+class SnapshotProfiles(LazyProfiles):
+    """LazyProfiles that decodes bodies from a snapshot until a file is re-tracked."""
+
+    def __init__(self, profiles_dir: Path, snapshot: ProfileSnapshot, cache_size: int = DEFAULT_CACHE_SIZE):
+        super().__init__(profiles_dir, snapshot.entries, cache_size=cache_size)
+        self.snapshot = snapshot
+        self._from_snapshot = set(snapshot.entries)
+
+    def _load(self, profile_id: str) -> Profile:
+        if profile_id in self._from_snapshot:
+            # Fragments travel with the body so agents never re-render them
+            seed_prompt_fragments(self.snapshot.fragments(profile_id))
+            return self.snapshot.profile(profile_id)
+        return super()._load(profile_id)
+
+    def track(self, profile_id: str, file_name: str, profile_data: Optional[Profile] = None):
+        self._from_snapshot.discard(profile_id)
+        super().track(profile_id, file_name, profile_data)
+
+    def __delitem__(self, profile_id: str):
+        self._from_snapshot.discard(profile_id)
+        super().__delitem__(profile_id)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Lazy profile storage for CLEARLIST.
+Profile bodies are parsed on first access and kept in a bounded LRU.
+"""
+
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, MutableMapping, Optional
+
+from manifest import content_hash
+from profile_model import Profile
+from profile_validation import PROFILE_SCHEMA, ProfileValidationError, validate_bytes
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class LazyProfiles(MutableMapping):
+    """Mapping of profile id to Profile that parses files on demand.
+
+    Keys come from the manifest, so listing ids never touches profile files.
+    Profiles stored directly (e.g. via ProfileManager.add_profile) are pinned
+    in memory and never evicted.
+    """
+
+    def __init__(self, profiles_dir: Path, entries: Dict[str, Dict], cache_size: int = DEFAULT_CACHE_SIZE,
+                 validate: bool = False):
+        self.profiles_dir = Path(profiles_dir)
+        self.cache_size = cache_size
+        self.validate = validate
+        # File names are joined with the directory on access to keep startup cheap
+        self._paths: Dict[str, str] = {
+            profile_id: entry.get('file') or f"{profile_id}.json"
+            for profile_id, entry in entries.items()
+        }
+        self._cache: "OrderedDict[str, Profile]" = OrderedDict()
+        self._pinned: Dict[str, Profile] = {}
+        self.loads = 0
+
+    def __getitem__(self, profile_id: str) -> Profile:
+        if profile_id in self._pinned:
+            return self._pinned[profile_id]
+
+        profile_data = self._cache.get(profile_id)
+        if profile_data is not None:
+            self._cache.move_to_end(profile_id)
+            return profile_data
+
+        profile_data = self._load(profile_id)
+        self.loads += 1
+
+        self._cache[profile_id] = profile_data
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return profile_data
+
+    def _load(self, profile_id: str) -> Profile:
+        """Parse one profile body from disk, validating it first if enabled."""
+        path = self.profiles_dir / self._paths[profile_id]
+        with open(path, 'rb') as f:
+            data = f.read()
+        parsed = json.loads(data)
+        if self.validate:
+            errors = validate_bytes(data, content_hash(data), PROFILE_SCHEMA, parsed=parsed)
+            if errors:
+                raise ProfileValidationError(str(path), errors)
+        return Profile.from_dict(parsed)
+
+    def __setitem__(self, profile_id: str, profile_data: Profile):
+        self._cache.pop(profile_id, None)
+        self._pinned[profile_id] = profile_data
+
+    def __delitem__(self, profile_id: str):
+        if profile_id not in self:
+            raise KeyError(profile_id)
+        self._paths.pop(profile_id, None)
+        self._pinned.pop(profile_id, None)
+        self._cache.pop(profile_id, None)
+
+    def track(self, profile_id: str, file_name: str, profile_data: Optional[Profile] = None):
+        """Register (or re-point) a file-backed profile, optionally with its parsed body."""
+        self._paths[profile_id] = file_name
+        self._pinned.pop(profile_id, None)
+        self._cache.pop(profile_id, None)
+        if profile_data is not None:
+            self._cache[profile_id] = profile_data
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def __contains__(self, profile_id) -> bool:
+        return profile_id in self._paths or profile_id in self._pinned
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._paths
+        yield from (profile_id for profile_id in self._pinned if profile_id not in self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths) + sum(1 for profile_id in self._pinned if profile_id not in self._paths)
+
+    def cached_count(self) -> int:
+        """Number of parsed profile bodies held in memory."""
+        return len(self._cache) + len(self._pinned)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Schema validation for CLEARLIST profiles and links.
+
+The JSON Schemas in schemas/ are compiled once into nested Python closures,
+so validating a capsule is a handful of direct type and key checks rather
+than a generic schema walk. Only the keywords our schemas use are supported:
+type, enum, pattern, format (date), minimum, maximum, required, properties,
+additionalProperties and items. Results are cached by content hash, and a
+corpus can be validated in parallel across a process pool.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Next to this module, so validation works whatever the working directory
+SCHEMAS_DIR = Path(__file__).resolve().parent / "schemas"
+PROFILE_SCHEMA = SCHEMAS_DIR / "profile.schema.json"
+EDGES_SCHEMA = SCHEMAS_DIR / "edges.schema.json"
+
+# (value, path, errors) -> None; appends "path: message" strings to errors.
+# Paths are (parent, key) chains, only formatted when an error is reported.
+Validator = Callable[[Any, Any, List[str]], None]
+ROOT = None
+
+# Parsed JSON only produces these exact types, so a set lookup on type(value)
+# replaces isinstance chains (and keeps booleans out of number/integer)
+_JSON_TYPES: Dict[str, tuple] = {
+    'object': (dict,),
+    'array': (list,),
+    'string': (str,),
+    'number': (int, float),
+    'integer': (int,),
+    'boolean': (bool,),
+    'null': (type(None),),
+}
+_NUMBER_TYPES = frozenset(_JSON_TYPES['number'])
+
+
+def _is_date(value: str) -> bool:
+    try:
+        datetime.date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+_FORMAT_CHECKS: Dict[str, Callable[[str], bool]] = {'date': _is_date}
+
+
+def format_path(path) -> str:
+    """Render a (parent, key) path chain as $.field[index].field."""
+    parts = []
+    while path is not ROOT:
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return '$' + ''.join(reversed(parts))
+
+
+class ProfileValidationError(ValueError):
+    """A profile or links file does not match its schema."""
+
+    def __init__(self, source: str, errors: List[str]):
+        self.source = source
+        self.errors = errors
+        super().__init__(f"{source}: {len(errors)} schema error(s): {'; '.join(errors[:3])}")
+
+
+def compile_schema(schema: Dict) -> Validator:
+    """Compile a JSON Schema node into a validator function."""
+    checks: List[Validator] = []
+
+    schema_type = schema.get('type')
+    if schema_type is not None:
+        types = [schema_type] if isinstance(schema_type, str) else list(schema_type)
+        allowed_types = frozenset(py_type for name in types for py_type in _JSON_TYPES[name])
+        expected = ' or '.join(types)
+    else:
+        allowed_types = None
+
+    if 'enum' in schema:
+        allowed = list(schema['enum'])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{format_path(path)}: {value!r} is not one of {allowed}")
+        checks.append(check_enum)
+
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+
+        def check_pattern(value, path, errors):
+            if isinstance(value, str) and not pattern.search(value):
+                errors.append(f"{format_path(path)}: {value!r} does not match {pattern.pattern}")
+        checks.append(check_pattern)
+
+    if schema.get('format') in _FORMAT_CHECKS:
+        format_name = schema['format']
+        format_check = _FORMAT_CHECKS[format_name]
+
+        def check_format(value, path, errors):
+            if isinstance(value, str) and not format_check(value):
+                errors.append(f"{format_path(path)}: {value!r} is not a valid {format_name}")
+        checks.append(check_format)
+
+    if 'minimum' in schema or 'maximum' in schema:
+        minimum, maximum = schema.get('minimum'), schema.get('maximum')
+
+        def check_range(value, path, errors):
+            if type(value) not in _NUMBER_TYPES:
+                return
+            if minimum is not None and value < minimum:
+                errors.append(f"{format_path(path)}: {value} is below the minimum {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{format_path(path)}: {value} is above the maximum {maximum}")
+        checks.append(check_range)
+
+    required = list(schema.get('required', []))
+    properties = {name: compile_schema(subschema) for name, subschema in schema.get('properties', {}).items()}
+    additional = schema.get('additionalProperties', True)
+    additional_validator = compile_schema(additional) if isinstance(additional, dict) else None
+    if required or properties or additional is not True:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{format_path(path)}: missing required property '{name}'")
+            for name, item in value.items():
+                validator = properties.get(name)
+                if validator is not None:
+                    validator(item, (path, name), errors)
+                elif additional_validator is not None:
+                    additional_validator(item, (path, name), errors)
+                elif additional is False:
+                    errors.append(f"{format_path(path)}: unexpected property '{name}'")
+        checks.append(check_object)
+
+    if isinstance(schema.get('items'), dict):
+        item_validator = compile_schema(schema['items'])
+
+        def check_items(value, path, errors):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    item_validator(item, (path, index), errors)
+        checks.append(check_items)
+
+    if allowed_types is None:
+        def validate(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+    elif not checks:
+        # Leaf node: a bare type check
+        def validate(value, path, errors):
+            if type(value) not in allowed_types:
+                errors.append(f"{format_path(path)}: expected {expected}, got {type(value).__name__}")
+    else:
+        def validate(value, path, errors):
+            if type(value) not in allowed_types:
+                errors.append(f"{format_path(path)}: expected {expected}, got {type(value).__name__}")
+                return
+            for check in checks:
+                check(value, path, errors)
+
+    return validate
+
+
+@lru_cache(maxsize=None)
+def load_validator(schema_path: str) -> Validator:
+    """Compile a schema file once per process."""
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        return compile_schema(json.load(f))
+
+
+@lru_cache(maxsize=None)
+def schema_digest(schema_path: str) -> str:
+    """Short digest of a schema file, part of every cache key."""
+    with open(schema_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def validate_data(data: Any, schema_path: Path = PROFILE_SCHEMA) -> List[str]:
+    """Validate parsed JSON, returning a list of error messages."""
+    errors: List[str] = []
+    load_validator(str(schema_path))(data, ROOT, errors)
+    return errors
+
+
+class ValidationCache:
+    """Validation results keyed by schema digest and content hash.
+
+    Unchanged files are never revalidated. The cache lives in memory and can
+    be persisted to a JSON file between runs.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._results: Dict[str, List[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._results = json.load(f)
+            except (OSError, ValueError):
+                self._results = {}
+
+    @staticmethod
+    def key(schema_path: Path, digest: str) -> str:
+        return f"{schema_digest(str(schema_path))}:{digest}"
+
+    def get(self, key: str) -> Optional[List[str]]:
+        errors = self._results.get(key)
+        if errors is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return errors
+
+    def put(self, key: str, errors: List[str]):
+        self._results[key] = errors
+
+    def save(self):
+        """Persist results, if the cache has a path."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._results, f)
+        tmp_path.replace(self.path)
+
+
+# Shared by every ProfileManager in the process
+DEFAULT_CACHE = ValidationCache()
+
+
+def validate_bytes(data: bytes, digest: str, schema_path: Path = PROFILE_SCHEMA,
+                   cache: Optional[ValidationCache] = DEFAULT_CACHE, parsed: Any = None) -> List[str]:
+    """Validate raw file content, consulting the cache by content hash."""
+    key = ValidationCache.key(schema_path, digest)
+    if cache is not None:
+        errors = cache.get(key)
+        if errors is not None:
+            return errors
+    if parsed is None:
+        try:
+            errors = validate_data(json.loads(data), schema_path)
+        except ValueError as e:
+            errors = [f"$: invalid JSON: {e}"]
+    else:
+        errors = validate_data(parsed, schema_path)
+    if cache is not None:
+        cache.put(key, errors)
+    return errors
+
+
+def _validate_file(args) -> List[str]:
+    """Process pool worker: validate one file from disk."""
+    path, schema_path = args
+    with open(path, 'rb') as f:
+        data = f.read()
+    return validate_bytes(data, '', Path(schema_path), cache=None)
+
+
+def validate_files(paths: Iterable[Path], schema_path: Path = PROFILE_SCHEMA,
+                   cache: Optional[ValidationCache] = DEFAULT_CACHE, workers: int = 1) -> Dict[str, List[str]]:
+    """Validate many files, in parallel when workers > 1; returns errors per path."""
+    from manifest import content_hash
+
+    results: Dict[str, List[str]] = {}
+    pending = []
+    for path in paths:
+        try:
+            data = Path(path).read_bytes()
+        except OSError as e:
+            results[str(path)] = [f"$: cannot read file: {e}"]
+            continue
+        digest = content_hash(data)
+        key = ValidationCache.key(schema_path, digest)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[str(path)] = cached
+        else:
+            pending.append((str(path), key, data))
+
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(pending) // (workers * 4))
+            outcomes = pool.map(_validate_file, [(path, str(schema_path)) for path, _, _ in pending],
+                                chunksize=chunksize)
+            for (path, key, _), errors in zip(pending, outcomes):
+                results[path] = errors
+                if cache is not None:
+                    cache.put(key, errors)
+    else:
+        for path, key, data in pending:
+            errors = validate_bytes(data, '', schema_path, cache=None)
+            results[path] = errors
+            if cache is not None:
+                cache.put(key, errors)
+    return results
+
+
+def default_workers() -> int:
+    """A sensible process pool size for bulk validation."""
+    return max(1, (os.cpu_count() or 2) - 1)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Profile directory watcher for long-running CLEARLIST processes.
+Calls ProfileManager.refresh() when profile files or the links file change.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+try:
+    # Optional: inotify/FSEvents-backed notifications
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+# Quiet period after a change before refreshing, so editors' multi-step
+# saves are picked up as one change
+DEBOUNCE_SECONDS = 0.05
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, changed: threading.Event):
+        self.changed = changed
+
+    def on_any_event(self, event):
+        paths = [getattr(event, 'src_path', ''), getattr(event, 'dest_path', '')]
+        if any(str(path).endswith('.json') for path in paths):
+            self.changed.set()
+
+
+class ProfileWatcher:
+    """Background thread that keeps a ProfileManager in sync with its directory.
+
+    Uses the `watchdog` package when it is installed, so edits are picked up
+    within milliseconds. Without it the directory is polled every `interval`
+    seconds, which is still cheap because refresh() only stats unchanged files.
+    """
+
+    def __init__(self, manager, interval: float = 1.0,
+                 on_change: Optional[Callable[[Dict[str, List[str]]], None]] = None):
+        self.manager = manager
+        self.interval = interval
+        self.on_change = on_change
+        self.uses_notifications = Observer is not None
+        self._changed = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def start(self):
+        """Start watching."""
+        if self._thread is not None:
+            return
+        if self.uses_notifications:
+            self._observer = Observer()
+            handler = _ChangeHandler(self._changed)
+            self._observer.schedule(handler, str(self.manager.profiles_dir))
+            links_dir = self.manager.edges_path.parent
+            if links_dir.is_dir() and links_dir.resolve() != self.manager.profiles_dir.resolve():
+                self._observer.schedule(handler, str(links_dir))
+            self._observer.start()
+        self._thread = threading.Thread(target=self._run, name="profile-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching and wait for the background thread."""
+        self._stopped.set()
+        self._changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if self.uses_notifications:
+                self._changed.wait()
+                if self._stopped.is_set():
+                    break
+                self._stopped.wait(DEBOUNCE_SECONDS)
+                self._changed.clear()
+            elif self._stopped.wait(self.interval):
+                break
+
+            result = self.manager.refresh()
+            if self.on_change is not None and any(result[key] for key in ('added', 'updated', 'removed', 'links')):
+                self.on_change(result)
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Cached system prompt fragments for CLEARLIST profile agents.
+Static prompt sections are rendered once per profile version and reused every turn.
+
+Claims, practice steps, sayings and care notes are also kept as rankable items.
+When the sections a question selects would exceed the item budget, the items
+are scored against the question with one matrix-vector product over hashed
+word and trigram features, and only the most relevant ones are included.
+Claims are weighted by the reliability of their best evidence, so of two
+equally relevant claims the better sourced one is kept.
+
+Every fragment's token count is measured once with the local tokenizer. An
+optional input-token budget fills sections in priority order (highest
+semantic score first): head, tone and tail are always kept, whole sections
+that no longer fit are left out, and the ranked items share what remains.
+Each assembled prompt reports how many tokens every section used.
+
+Questions about tradition and lineage can also carry a LinkedSection: short
+synopses of the profiles linked to this one in links/edges.json, rendered
+and counted once by whoever owns the link graph (ProfileManager).
+"""
+
+import os
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from profile_model import Profile, VersionCache
+from provenance_index import claim_reliabilities
+from qa_lookup import content_words
+from semantics import SEMANTIC_CATEGORIES
+from token_counter import count_tokens
+
+# One bit per semantic category, in declaration order
+CATEGORY_BITS: Dict[str, int] = {category: 1 << i for i, category in enumerate(SEMANTIC_CATEGORIES)}
+
+# Sections included when their category scores above zero, in prompt order
+SECTION_ORDER = ['practice', 'philosophy', 'personal_guidance', 'spiritual_experience', 'religious_unity', 'tradition']
+
+PROMPT_CACHE_SIZE = 256
+DEFAULT_PROMPT_TOKEN_BUDGET = 1500
+
+TONE_GENTLE = "\n🎭 TONE: Gentle, compassionate, supportive"
+TONE_DIRECT = "\n🎭 TONE: Direct, clear, immediate"
+TONE_BALANCED = "\n🎭 TONE: Balanced, authentic to your teaching style"
+
+
+def default_prompt_budget() -> Optional[int]:
+    """Input-token budget for system prompts, from PROMPT_TOKEN_BUDGET (0 = unlimited)."""
+    budget = int(os.getenv("PROMPT_TOKEN_BUDGET", str(DEFAULT_PROMPT_TOKEN_BUDGET)))
+    return budget if budget > 0 else None
+
+
+# Linked profiles quoted in the tradition section, and the synopsis length kept for each
+LINKED_PROFILES_LIMIT = 5
+LINKED_SYNOPSIS_CHARS = 240
+
+
+class LinkedSection(NamedTuple):
+    """Rendered synopses of a profile's linked profiles and their token count."""
+    text: str
+    tokens: int
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = ' '.join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(' ', 1)[0].rstrip(',;:') + '…'
+
+
+def render_linked_section(linked: Sequence[Tuple[str, str, str]]) -> Optional[LinkedSection]:
+    """Tradition section from (name, relation, synopsis) per linked profile; None if there are none."""
+    if not linked:
+        return None
+    lines = ["\n🕸️ RELATED FIGURES (teachers, students and influences; draw on them when relevant):\n"]
+    lines.extend(f"- {name} ({relation}): {_shorten(synopsis, LINKED_SYNOPSIS_CHARS)}\n"
+                 for name, relation, synopsis in linked[:LINKED_PROFILES_LIMIT])
+    text = ''.join(lines)
+    return LinkedSection(text, count_tokens(text))
+
+
+def category_mask(semantic_scores: Dict[str, int]) -> int:
+    """Collapse semantic scores into a bitmask of the categories that hit."""
+    mask = 0
+    for category, score in semantic_scores.items():
+        if score > 0:
+            mask |= CATEGORY_BITS.get(category, 0)
+    return mask
+
+
+# Sections built from rankable profile items, and the item limits per prompt
+RANKED_SECTIONS = ('practice', 'philosophy', 'personal_guidance')
+ITEM_TOKEN_BUDGET = 400
+ITEM_TOP_K = 12
+FEATURE_DIM = 256
+# Ranking weight of a claim whose evidence does not resolve; fully reliable claims weigh 1
+RELIABILITY_FLOOR = 0.5
+
+# Fixed lines of the ranked sections: (header, footer)
+_RANKED_FRAME = {
+    'practice': ("\n🎯 FOCUS ON PRACTICAL METHODS:\n", ""),
+    'philosophy': ("\n🧠 CORE PHILOSOPHICAL INSIGHTS:\n", ""),
+    'personal_guidance': ("\n💝 GUIDANCE APPROACH:\n", "Respond with extra compassion and practical support.\n"),
+}
+
+
+@lru_cache(maxsize=1 << 16)
+def _word_buckets(word: str) -> Tuple[int, ...]:
+    """Hashed buckets of a word (counted twice) and its character trigrams."""
+    # crc32 rather than hash() so vectors agree across processes and snapshots
+    word_bucket = zlib.crc32(f"w:{word}".encode('utf-8')) % FEATURE_DIM
+    padded = f" {word} "
+    trigrams = (zlib.crc32(padded[i:i + 3].encode('utf-8')) % FEATURE_DIM for i in range(len(padded) - 2))
+    return (word_bucket, word_bucket, *trigrams)
+
+
+def hashed_matrix(texts: List[str]) -> np.ndarray:
+    """Row-normalized (len(texts), FEATURE_DIM) matrix of hashed features."""
+    indices: List[int] = []
+    for row, text in enumerate(texts):
+        offset = row * FEATURE_DIM
+        for word in content_words(text):
+            indices.extend(offset + bucket for bucket in _word_buckets(word))
+    matrix = np.bincount(indices, minlength=len(texts) * FEATURE_DIM)
+    matrix = matrix.astype(np.float32).reshape(len(texts), FEATURE_DIM)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _hashed_counts(text: str) -> np.ndarray:
+    indices = [bucket for word in content_words(text) for bucket in _word_buckets(word)]
+    return np.bincount(indices, minlength=FEATURE_DIM).astype(np.float32)
+
+
+def hashed_features(text: str) -> np.ndarray:
+    """Unit vector of hashed features for one text."""
+    vector = _hashed_counts(text)
+    norm = float(np.sqrt(vector @ vector))
+    return vector / norm if norm else vector
+
+
+class AssembledPrompt(NamedTuple):
+    """A system prompt and the tokens each of its sections used."""
+    text: str
+    # head, the included sections in prompt order, tone, focus, tail
+    section_tokens: Dict[str, int]
+    total_tokens: int
+    # Sections the question selected but the budget left out
+    omitted: Tuple[str, ...] = ()
+
+
+class PromptFragments:
+    """Pre-rendered prompt sections for a single profile."""
+
+    def __init__(self, profile: Profile, cache_size: int = PROMPT_CACHE_SIZE,
+                 token_budget: int = ITEM_TOKEN_BUDGET, top_k: int = ITEM_TOP_K):
+        self.profile_id = profile.id or 'unknown'
+        self.version = profile.version or ''
+        self.head = self._render_head(profile)
+        self.practices: List[str] = [practice['name'] for practice in profile.practice or ()]
+        # Rankable items as (section, group, text); group is the practice index for steps
+        # and 0 for claims / 1 for sayings in the philosophy section
+        self.items: List[Tuple[str, int, str]] = self._collect_items(profile)
+        self.item_sections = np.array([RANKED_SECTIONS.index(section) for section, _, _ in self.items], dtype=np.int8)
+        self.item_tokens = [count_tokens(self._render_item(section, group, text)) for section, group, text in self.items]
+        self.item_weights = self._item_weights(profile, self.items)
+        self.section_tokens = {section: 0 for section in RANKED_SECTIONS}
+        self.section_counts = {section: 0 for section in RANKED_SECTIONS}
+        for (section, _, _), tokens in zip(self.items, self.item_tokens):
+            self.section_tokens[section] += tokens
+            self.section_counts[section] += 1
+        self.sections = self._render_sections(profile)
+        self.tail = self._render_tail(profile)
+        # Token counts of the fixed fragments, measured once
+        self.head_tokens = count_tokens(self.head)
+        self.tail_tokens = count_tokens(self.tail)
+        self.full_tokens = {name: count_tokens(text) for name, text in self.sections.items()}
+        self.frame_tokens = {section: count_tokens(header + footer) for section, (header, footer) in _RANKED_FRAME.items()}
+        self.title_tokens = [count_tokens(f"\nPRACTICE - {name}:\n") for name in self.practices]
+        # Reserved per ranked section before items are chosen (every practice title, to stay in budget)
+        self.overhead_tokens = dict(self.frame_tokens, practice=self.frame_tokens['practice'] + sum(self.title_tokens))
+        self.keywords: List[Tuple[str, str]] = [(kw, kw.lower()) for kw in profile.keywords or ()]
+        self.cache_size = cache_size
+        self.token_budget = token_budget
+        self.top_k = top_k
+        self._item_vectors: Optional[np.ndarray] = None
+        # (category mask, focus keywords, item selection, linked section) -> prompt
+        self._prompts: "OrderedDict[Tuple, AssembledPrompt]" = OrderedDict()
+
+    def __getstate__(self) -> Dict:
+        # Memoized prompts are per-process and item vectors are rebuilt on demand;
+        # only the rendered sections are persisted
+        state = self.__dict__.copy()
+        state['_prompts'] = OrderedDict()
+        state['_item_vectors'] = None
+        return state
+
+    @staticmethod
+    def _render_head(profile: Profile) -> str:
+        return f"""You are {profile['canonical_name']} ({profile.pronunciation or ''}).
+
+CORE TEACHING: {profile.thesis or ''}
+
+TRADITION: {', '.join(profile.traditions)}
+"""
+
+    @staticmethod
+    def _collect_items(profile: Profile) -> List[Tuple[str, int, str]]:
+        items = []
+        for group, practice in enumerate(profile.practice or ()):
+            items.extend(('practice', group, step) for step in practice.steps or ())
+        items.extend(('philosophy', 0, claim['text']) for claim in profile.claims or ())
+        items.extend(('philosophy', 1, saying['text']) for saying in profile.sayings or ())
+        items.extend(('personal_guidance', 0, note) for note in profile.care_notes or ())
+        return items
+
+    @staticmethod
+    def _item_weights(profile: Profile, items: List[Tuple[str, int, str]]) -> np.ndarray:
+        """Ranking weight per item: claims by evidence reliability, everything else 1."""
+        weights = np.ones(len(items), dtype=np.float32)
+        # Claims are the philosophy items of group 0, in profile order
+        claims = [i for i, (section, group, _) in enumerate(items) if section == 'philosophy' and group == 0]
+        reliabilities = [min(1.0, max(0.0, reliability)) for reliability in claim_reliabilities(profile)]
+        weights[claims] = [RELIABILITY_FLOOR + (1 - RELIABILITY_FLOOR) * reliability for reliability in reliabilities]
+        return weights
+
+    @staticmethod
+    def _render_item(section: str, group: int, text: str) -> str:
+        # Sayings are quoted; care notes are joined into one line, costing about the same
+        return f'- "{text}"\n' if section == 'philosophy' and group == 1 else f"- {text}\n"
+
+    def _render_sections(self, profile: Profile) -> Dict[str, str]:
+        sections = {}
+        lines = [_RANKED_FRAME['practice'][0]]
+        for practice in profile.practice or ():
+            lines.append(f"\nPRACTICE - {practice['name']}:\n")
+            lines.extend(f"- {step}\n" for step in practice.steps or ())
+        sections['practice'] = ''.join(lines)
+        sections['philosophy'] = self._render_ranked('philosophy', range(len(self.items)))
+        sections['personal_guidance'] = self._render_ranked('personal_guidance', range(len(self.items)))
+
+        sections['spiritual_experience'] = (
+            "\n🌟 SPIRITUAL EXPERIENCE GUIDANCE:\n"
+            "Emphasize direct experience over intellectual understanding.\n"
+            "Focus on practical steps toward spiritual realization.\n"
+        )
+        sections['religious_unity'] = (
+            "\n🤝 RELIGIOUS UNITY PERSPECTIVE:\n"
+            "Emphasize your teachings on the unity of all faiths.\n"
+            "Highlight how different paths lead to the same divine reality.\n"
+        )
+        return sections
+
+    def _render_ranked(self, section: str, selected) -> str:
+        """Render a ranked section with only the selected items, in profile order."""
+        chosen = [self.items[i] for i in sorted(selected) if self.items[i][0] == section]
+        header, footer = _RANKED_FRAME[section]
+        lines = [header]
+        if section == 'practice':
+            for group, name in enumerate(self.practices):
+                steps = [text for _, item_group, text in chosen if item_group == group]
+                if steps:
+                    lines.append(f"\nPRACTICE - {name}:\n")
+                    lines.extend(f"- {step}\n" for step in steps)
+        elif section == 'philosophy':
+            lines.extend(self._render_item(*item) for item in chosen)
+        elif chosen:
+            lines.append(f"Remember: {', '.join(text for _, _, text in chosen)}\n")
+        lines.append(footer)
+        return ''.join(lines)
+
+    def _ranked_tokens(self, section: str, selection: Tuple[int, ...]) -> int:
+        """Tokens of a ranked section rendered with a selection, from the per-fragment counts."""
+        chosen = [i for i in selection if self.items[i][0] == section]
+        tokens = self.frame_tokens[section] + sum(self.item_tokens[i] for i in chosen)
+        if section == 'practice':
+            tokens += sum(self.title_tokens[group] for group in {self.items[i][1] for i in chosen})
+        return tokens
+
+    @property
+    def item_vectors(self) -> np.ndarray:
+        """Hashed feature matrix of all items, built on first ranking."""
+        if self._item_vectors is None:
+            self._item_vectors = hashed_matrix([text for _, _, text in self.items])
+        return self._item_vectors
+
+    def select_items(self, mask: int, user_message: str, token_budget: Optional[int] = None) -> Optional[Tuple[int, ...]]:
+        """Indices of the items to include, or None if every selected section fits whole.
+
+        Items are ranked by similarity to the question. The best item of each
+        selected section is kept if it fits, then the rest are added by score
+        while they fit within top_k and the token budget (the item budget,
+        lowered to token_budget when given).
+        """
+        budget = self.token_budget if token_budget is None else min(self.token_budget, token_budget)
+        sections = [i for i, section in enumerate(RANKED_SECTIONS) if mask & CATEGORY_BITS[section]]
+        tokens = sum(self.section_tokens[RANKED_SECTIONS[i]] for i in sections)
+        count = sum(self.section_counts[RANKED_SECTIONS[i]] for i in sections)
+        if not sections or (tokens <= budget and count <= self.top_k):
+            return None
+
+        section_bits = sum(1 << i for i in sections)
+        candidates = np.flatnonzero((1 << self.item_sections.astype(np.int64)) & section_bits)
+        # Ranking is scale-invariant, so the question vector is left unnormalized
+        scores = (self.item_vectors[candidates] @ _hashed_counts(user_message)) * self.item_weights[candidates]
+        ranked = candidates[np.argsort(-scores, kind='stable')].tolist()
+
+        item_sections = self.item_sections.tolist()
+        selected = []
+        used = 0
+        covered = set()
+        for index in ranked:
+            if item_sections[index] not in covered and used + self.item_tokens[index] <= budget:
+                covered.add(item_sections[index])
+                selected.append(index)
+                used += self.item_tokens[index]
+        chosen = set(selected)
+        for index in ranked:
+            if len(selected) >= self.top_k:
+                break
+            if index not in chosen and used + self.item_tokens[index] <= budget:
+                selected.append(index)
+                used += self.item_tokens[index]
+        return tuple(sorted(selected))
+
+    @staticmethod
+    def _render_tail(profile: Profile) -> str:
+        return f"""
+
+RESPOND AS {profile['canonical_name']}:
+- Use your authentic voice and teaching style
+- Draw from your core insights and methods
+- Stay true to your tradition and approach
+- **FOCUS YOUR RESPONSE** on the aspects most relevant to this question
+- If asked about something outside your expertise, acknowledge it honestly
+
+Remember: You are speaking from your lived experience and understanding."""
+
+    def relevant_keywords(self, user_message: str) -> Tuple[str, ...]:
+        """Profile keywords mentioned in the message."""
+        user_lower = user_message.lower()
+        return tuple(keyword for keyword, keyword_lower in self.keywords if keyword_lower in user_lower)
+
+    def build(self, semantic_scores: Dict[str, int], user_message: str,
+              token_budget: Optional[int] = None, linked: Optional[LinkedSection] = None) -> str:
+        """Join the cached sections selected by the question's semantic scores."""
+        return self.assemble(semantic_scores, user_message, token_budget, linked).text
+
+    def assemble(self, semantic_scores: Dict[str, int], user_message: str,
+                 token_budget: Optional[int] = None, linked: Optional[LinkedSection] = None) -> AssembledPrompt:
+        """Build the prompt within token_budget input tokens (None = no limit).
+
+        Sections are filled by priority, highest semantic score first: whole
+        sections that do not fit are omitted, and ranked items share what the
+        head, tone, focus line, tail and included sections leave over. Token
+        counts are summed per fragment, so the total is a close estimate.
+        The tradition section is the `linked` one, and is left out without it.
+        """
+        mask = category_mask(semantic_scores)
+        if linked is None:
+            mask &= ~CATEGORY_BITS['tradition']
+        keywords = self.relevant_keywords(user_message)
+        item_budget = None
+        omitted: List[str] = []
+        if token_budget is not None:
+            available = (token_budget - self.head_tokens - self.tail_tokens
+                         - count_tokens(self._tone(mask)) - count_tokens(self._focus(keywords)))
+            selected = [category for category in SECTION_ORDER if mask & CATEGORY_BITS[category]]
+            # Stable sort keeps SECTION_ORDER among equal scores
+            for category in sorted(selected, key=lambda category: -semantic_scores.get(category, 0)):
+                if category == 'tradition':
+                    cost = linked.tokens
+                elif category in RANKED_SECTIONS:
+                    cost = self.overhead_tokens[category]
+                else:
+                    cost = self.full_tokens[category]
+                if cost > available:
+                    mask &= ~CATEGORY_BITS[category]
+                    omitted.append(category)
+                else:
+                    available -= cost
+            item_budget = max(0, available)
+
+        key = (mask, keywords, self.select_items(mask, user_message, item_budget),
+               linked if mask & CATEGORY_BITS['tradition'] else None)
+        prompt = self._prompts.get(key)
+        if prompt is not None:
+            self._prompts.move_to_end(key)
+        else:
+            prompt = self._assemble(*key)
+            self._prompts[key] = prompt
+            if len(self._prompts) > self.cache_size:
+                self._prompts.popitem(last=False)
+        if omitted:
+            prompt = prompt._replace(omitted=tuple(category for category in SECTION_ORDER if category in omitted))
+        return prompt
+
+    @staticmethod
+    def _tone(mask: int) -> str:
+        # Adaptive tone setting
+        if mask & CATEGORY_BITS['compassion']:
+            return TONE_GENTLE
+        if mask & CATEGORY_BITS['directness']:
+            return TONE_DIRECT
+        return TONE_BALANCED
+
+    @staticmethod
+    def _focus(relevant_keywords: Tuple[str, ...]) -> str:
+        return f"\n🔍 FOCUS ON: {', '.join(relevant_keywords)}" if relevant_keywords else ""
+
+    def _assemble(self, mask: int, relevant_keywords: Tuple[str, ...],
+                  selection: Optional[Tuple[int, ...]] = None, linked: Optional[LinkedSection] = None) -> AssembledPrompt:
+        parts = [self.head]
+        usage = {'head': self.head_tokens}
+        for category in SECTION_ORDER:
+            if not mask & CATEGORY_BITS[category]:
+                continue
+            if category == 'tradition':
+                text = linked.text
+                usage[category] = linked.tokens
+            elif selection is not None and category in RANKED_SECTIONS:
+                if category != 'personal_guidance' and not any(self.items[i][0] == category for i in selection):
+                    # No item fit the budget: a bare header would only cost tokens
+                    continue
+                text = self._render_ranked(category, selection)
+                usage[category] = self._ranked_tokens(category, selection)
+            else:
+                text = self.sections[category]
+                usage[category] = self.full_tokens[category]
+            parts.append(text)
+
+        tone = self._tone(mask)
+        parts.append(tone)
+        usage['tone'] = count_tokens(tone)
+
+        focus = self._focus(relevant_keywords)
+        if focus:
+            parts.append(focus)
+            usage['focus'] = count_tokens(focus)
+
+        parts.append(self.tail)
+        usage['tail'] = self.tail_tokens
+        return AssembledPrompt(''.join(parts), usage, sum(usage.values()))
+
+
+_fragment_cache = VersionCache(PromptFragments)
+
+
+def get_prompt_fragments(profile: Union[Profile, Dict]) -> PromptFragments:
+    """Return the shared fragments for a profile, rendering them on first use."""
+    return _fragment_cache.get(profile)
+
+
+def seed_prompt_fragments(fragments: PromptFragments) -> None:
+    """Register fragments rendered elsewhere (e.g. a compiled snapshot)."""
+    _fragment_cache.seed((fragments.profile_id, fragments.version), fragments)
+
+
+def invalidate_prompt_fragments(profile_id: str) -> None:
+    """Drop cached fragments for every version of a profile."""
+    _fragment_cache.invalidate(profile_id)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Provenance index for CLEARLIST profiles.
+
+Every profile lists its own provenance.sources under local ids (src:1, ...)
+that its claims cite as evidence. The index interns those sources into one
+deduplicated bibliography keyed by a hash of the normalized URL (or, when
+there is no URL, of the citing profile and the title, since titles such as
+"Primary discourse" say nothing about which work is meant), resolves a claim's evidence to bibliography
+entries with two dictionary lookups, and keeps every claim in a table sorted
+by the reliability of its best evidence, so corpus-wide questions such as
+"claims backed by sources with reliability >= 0.8" are a binary search
+rather than a pass over the profiles.
+
+A claim's reliability is the highest reliability its own profile declares
+for any of its evidence, 0 when none of it resolves.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from urllib.parse import urlsplit
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from profile_index import normalize
+from profile_model import Profile, as_profile
+
+DEFAULT_BIBLIOGRAPHY = Path("sources") / "bibliography.json"
+
+
+def default_bibliography_path(profiles_dir: Path) -> Path:
+    """The bibliography file that sits next to a profiles directory."""
+    return Path(profiles_dir).parent / DEFAULT_BIBLIOGRAPHY
+
+
+def normalize_url(url: str) -> str:
+    """URL without scheme, "www.", fragment or trailing slash; only the host is case-folded."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.casefold()
+    if host.startswith('www.'):
+        host = host[4:]
+    if not host:
+        # No scheme, so urlsplit saw everything as a path
+        host, _, path = parts.path.partition('/')
+        host, path = host.casefold().removeprefix('www.'), '/' + path
+    else:
+        path = parts.path
+    query = f"?{parts.query}" if parts.query else ''
+    return f"{host}{path.rstrip('/')}{query}"
+
+
+def source_key(title: Optional[str], url: Optional[str], profile_id: str = '') -> str:
+    """Bibliography key of a source: equal for the same URL, or the same title from the same profile."""
+    if url and url.strip():
+        material = f"url:{normalize_url(url)}"
+    else:
+        material = f"title:{profile_id}:{' '.join(normalize(title or '').split())}"
+    return "bib:" + hashlib.sha256(material.encode('utf-8')).hexdigest()[:16]
+
+
+def claim_reliabilities(profile: Union[Profile, Dict]) -> List[float]:
+    """Reliability of each of a profile's claims, from its own sources (0 for unresolved evidence)."""
+    profile = as_profile(profile)
+    sources = profile.provenance.sources or () if profile.provenance is not None else ()
+    declared = {source.id: float(source.reliability or 0.0) for source in sources}
+    return [max((declared.get(evidence, 0.0) for evidence in claim.evidence or ()), default=0.0)
+            for claim in profile.claims or ()]
+
+
+class Citation(NamedTuple):
+    """A claim's evidence resolved to the bibliography."""
+    key: str
+    title: str
+    url: Optional[str]
+    # As declared by the citing profile
+    reliability: float
+
+
+class ClaimRef(NamedTuple):
+    """One claim of one profile with its resolved evidence."""
+    profile_id: str
+    # Position in the profile's claims
+    index: int
+    text: str
+    reliability: float
+    # Bibliography keys of the evidence that resolved
+    sources: Tuple[str, ...]
+
+
+class BibliographyEntry:
+    """A deduplicated source and the profiles citing it."""
+
+    __slots__ = ('key', 'title', 'url', 'cited_by')
+
+    def __init__(self, key: str, title: str, url: Optional[str]):
+        self.key = key
+        self.title = title
+        self.url = url
+        # profile id -> reliability that profile declares
+        self.cited_by: Dict[str, float] = {}
+
+    @property
+    def reliability(self) -> float:
+        """Highest reliability any citing profile declares."""
+        return max(self.cited_by.values(), default=0.0)
+
+    def to_dict(self) -> Dict:
+        entry = {"id": self.key, "title": self.title, "url": self.url or None, "reliability": self.reliability,
+                 "cited_by": sorted(self.cited_by)}
+        return {name: value for name, value in entry.items() if value is not None}
+
+
+class ProvenanceIndex:
+    """Deduplicated bibliography, evidence resolution and a reliability-sorted claim table.
+
+    add() and remove() keep it in step with a changing corpus; the claim
+    table is re-sorted on the next bulk query after a change.
+    """
+
+    def __init__(self, profiles: Iterable[Tuple[str, Union[Profile, Dict]]] = ()):
+        self.entries: Dict[str, BibliographyEntry] = {}
+        # profile id -> {local source id: (bibliography key, declared reliability)}
+        self._evidence: Dict[str, Dict[str, Tuple[str, float]]] = {}
+        self._claims: Dict[str, List[ClaimRef]] = {}
+        # Every claim, most reliable first, and their negated reliabilities (ascending) for searchsorted
+        self._table: Optional[Tuple[List[ClaimRef], np.ndarray]] = None
+        for profile_id, profile in profiles:
+            self.add(profile_id, profile)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, profile_id: str, profile: Union[Profile, Dict]):
+        """Index a profile's sources and claims, replacing any earlier version."""
+        profile = as_profile(profile)
+        self.remove(profile_id)
+        evidence: Dict[str, Tuple[str, float]] = {}
+        for source in (profile.provenance.sources or () if profile.provenance is not None else ()):
+            key = source_key(source.title, source.url, profile_id)
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = BibliographyEntry(key, source.title or '', source.url)
+            reliability = float(source.reliability or 0.0)
+            entry.cited_by[profile_id] = max(reliability, entry.cited_by.get(profile_id, 0.0))
+            evidence[source.id] = (key, reliability)
+        self._evidence[profile_id] = evidence
+
+        claims = []
+        for index, claim in enumerate(profile.claims or ()):
+            resolved = [evidence[local_id] for local_id in claim.evidence or () if local_id in evidence]
+            claims.append(ClaimRef(profile_id, index, claim.text or '',
+                                   max((reliability for _, reliability in resolved), default=0.0),
+                                   tuple(dict.fromkeys(key for key, _ in resolved))))
+        self._claims[profile_id] = claims
+        self._table = None
+
+    def remove(self, profile_id: str):
+        """Drop a profile's citations and claims; sources nobody cites any more leave the bibliography."""
+        evidence = self._evidence.pop(profile_id, None)
+        if evidence is None:
+            return
+        for key, _ in evidence.values():
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.cited_by.pop(profile_id, None)
+                if not entry.cited_by:
+                    del self.entries[key]
+        del self._claims[profile_id]
+        self._table = None
+
+    def resolve(self, profile_id: str, evidence_id: str) -> Optional[Citation]:
+        """Bibliography entry a profile's evidence id refers to, or None."""
+        resolved = self._evidence.get(profile_id, {}).get(evidence_id)
+        if resolved is None:
+            return None
+        key, reliability = resolved
+        entry = self.entries[key]
+        return Citation(key, entry.title, entry.url, reliability)
+
+    def claims(self, profile_id: str) -> List[ClaimRef]:
+        """A profile's claims, most reliable first (profile order among equals)."""
+        return sorted(self._claims.get(profile_id, ()), key=lambda claim: -claim.reliability)
+
+    def _sorted_claims(self) -> Tuple[List[ClaimRef], np.ndarray]:
+        table = self._table
+        if table is None:
+            claims = sorted((claim for claims in self._claims.values() for claim in claims),
+                            key=lambda claim: -claim.reliability)
+            table = self._table = (claims, np.array([-claim.reliability for claim in claims], dtype=np.float64))
+        return table
+
+    def claims_backed_by(self, min_reliability: float, profile_ids: Optional[Iterable[str]] = None,
+                         limit: Optional[int] = None) -> List[ClaimRef]:
+        """Claims whose best evidence has at least min_reliability, most reliable first."""
+        claims, keys = self._sorted_claims()
+        matched = claims[:int(np.searchsorted(keys, -min_reliability, side='right'))]
+        if profile_ids is not None:
+            wanted = set(profile_ids)
+            matched = [claim for claim in matched if claim.profile_id in wanted]
+        return matched if limit is None else matched[:limit]
+
+    def sources(self, min_reliability: float = 0.0) -> List[BibliographyEntry]:
+        """Bibliography entries, most cited first."""
+        entries = [entry for entry in self.entries.values() if entry.reliability >= min_reliability]
+        return sorted(entries, key=lambda entry: (-len(entry.cited_by), entry.title))
+
+    def stats(self) -> Dict[str, int]:
+        citations = sum(len(evidence) for evidence in self._evidence.values())
+        return {"profiles": len(self._evidence), "sources": len(self.entries), "citations": citations,
+                "claims": sum(len(claims) for claims in self._claims.values())}
+
+    def bibliography(self) -> Dict[str, List[Dict]]:
+        """The bibliography in the shape of sources/bibliography.json."""
+        return {"entries": [self.entries[key].to_dict() for key in sorted(self.entries)]}
+
+    def write_bibliography(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.bibliography(), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        tmp_path.replace(path)
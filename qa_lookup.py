@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Instant answers from a profile's curated ai.qa_pairs.
+
+Each profile gets a small matcher: its qa questions are reduced to content
+words (no question words, pronouns or the persona's own names), stemmed and
+stored as L2-normalized rows of a NumPy matrix over the stem vocabulary.
+A user question is matched with one matrix-vector product; if the best cosine
+similarity passes the threshold, the curated answer is returned without
+calling the model.
+
+Looking alike is not enough: a qa question only matches when it contains
+every content word of the user's question, so "What did the Buddha teach
+about religions?" never gets the answer curated for "What did he teach about
+religions?".
+
+Topic words alone cannot tell "How do I surrender?" from "What is
+surrender?", or a question from its negation, so each question also has an
+intent: the interrogatives that change what is asked (why, how, when, where,
+who) and whether it is negated. Only qa questions with the same intent as the
+user's can match.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from profile_index import normalize, tokenize
+from profile_model import Profile, VersionCache
+
+DEFAULT_THRESHOLD = 0.8
+
+# Words that carry no topic: questions are compared on what is left
+_STOPWORDS = frozenset("""
+a an the and or but of to in on at for with about from by as into this that these those here there
+what whats which who whom whose why how when where is are was were be been being am do does did
+can could would should will shall may might must have has had please tell me explain
+i my mine you your yours yourself he him his she her hers they them their theirs it its we us our
+""".split())
+
+# Interrogatives that ask for something other than a description; "what" and "which" do not
+_INTERROGATIVES = frozenset("why how when where who whom whose".split())
+# "t" is what tokenizing "don't" or "can't" leaves behind
+_NEGATIONS = frozenset("""
+not no never nor neither nothing nobody nowhere cannot without t
+dont doesnt didnt isnt arent wasnt werent cant couldnt wont wouldnt shouldnt
+""".split())
+
+
+def default_threshold() -> float:
+    """Minimum similarity for a curated answer, from QA_MATCH_THRESHOLD."""
+    return float(os.getenv("QA_MATCH_THRESHOLD", str(DEFAULT_THRESHOLD)))
+
+
+def content_words(question: str, names: frozenset = frozenset()) -> List[str]:
+    """Normalized words of a question, minus stopwords and the persona's names.
+
+    Questions made only of stopwords ("Who am I?") keep all their words.
+    """
+    words = [word for word in tokenize(normalize(question)) if word not in names]
+    return [word for word in words if word not in _STOPWORDS] or words
+
+
+def question_intent(question: str) -> Tuple[frozenset, bool]:
+    """Interrogatives of a question and whether it is negated; matches must agree on both."""
+    words = tokenize(normalize(question))
+    return frozenset(word for word in words if word in _INTERROGATIVES), any(word in _NEGATIONS for word in words)
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping, so "religions"/"religion" or "practiced"/"practice" meet."""
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif word.endswith(('ches', 'shes', 'xes', 'sses')):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    for suffix in ('ing', 'ed', 'e'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def content_stems(question: str, names: frozenset = frozenset()) -> frozenset:
+    return frozenset(stem(word) for word in content_words(question, names))
+
+
+class QAMatcher:
+    """Word-stem cosine matcher over one profile's qa_pairs."""
+
+    def __init__(self, profile: Profile):
+        names = [profile.canonical_name or '', *(profile.alt_names or ())]
+        self.names = frozenset(word for name in names for word in tokenize(normalize(name)))
+        pairs = [(pair.q, pair.a) for pair in (profile.ai.qa_pairs or ()) if pair.q and pair.a] if profile.ai else []
+        self.questions: Tuple[str, ...] = tuple(question for question, _ in pairs)
+        self.answers: Tuple[str, ...] = tuple(answer for _, answer in pairs)
+        self.intents = tuple(question_intent(question) for question in self.questions)
+
+        rows = [content_stems(question, self.names) for question in self.questions]
+        self.vocabulary: Dict[str, int] = {}
+        for row in rows:
+            for word in sorted(row):
+                self.vocabulary.setdefault(word, len(self.vocabulary))
+        self.matrix = np.zeros((len(rows), len(self.vocabulary)), dtype=np.float32)
+        for i, row in enumerate(rows):
+            for word in row:
+                self.matrix[i, self.vocabulary[word]] = 1.0
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix /= norms
+
+    def match(self, question: str) -> Tuple[int, float]:
+        """Index and cosine similarity of the closest qa question, (-1, 0.0) if none."""
+        if not self.questions:
+            return -1, 0.0
+        words = content_stems(question, self.names)
+        # A word no qa question has (a name, another tradition) means a different question
+        if not words or any(word not in self.vocabulary for word in words):
+            return -1, 0.0
+        columns = [self.vocabulary[word] for word in words]
+        intent = question_intent(question)
+        agrees = np.array([candidate == intent for candidate in self.intents])
+        # Only qa questions containing every word of the query can match
+        agrees &= (self.matrix[:, columns] > 0).all(axis=1)
+        if not agrees.any():
+            return -1, 0.0
+        scores = np.where(agrees, self.matrix[:, columns].sum(axis=1), -1.0)
+        best = int(scores.argmax())
+        return best, float(scores[best]) / float(np.sqrt(len(columns)))
+
+    def lookup(self, question: str, threshold: float = DEFAULT_THRESHOLD) -> Optional[str]:
+        """The curated answer if a qa question is similar enough, else None."""
+        index, similarity = self.match(question)
+        return self.answers[index] if index >= 0 and similarity >= threshold else None
+
+
+_matcher_cache = VersionCache(QAMatcher)
+
+
+def get_qa_matcher(profile: Union[Profile, Dict]) -> QAMatcher:
+    """Return the shared matcher for a profile version, building it on first use."""
+    return _matcher_cache.get(profile)
+
+
+def invalidate_qa_matcher(profile_id: str) -> None:
+    """Drop cached matchers for every version of a profile."""
+    _matcher_cache.invalidate(profile_id)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Response cache for CLEARLIST profile agents.
+
+Answers are keyed by profile id and version, the normalized question, a hash
+of the rendered system prompt and the model parameters, so any change to the
+persona, prompt or model settings misses the cache. Entries expire after a
+TTL and the least recently used ones are evicted past a size limit. An
+in-memory LRU can be backed by an on-disk SQLite tier shared across runs.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from profile_index import normalize, tokenize
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def normalize_question(question: str) -> str:
+    """Case, accents, punctuation and spacing do not change a question's key."""
+    return ' '.join(tokenize(normalize(question)))
+
+
+def cache_key(profile_id: str, profile_version: str, question: str, system_prompt: str, params: Dict) -> str:
+    """Digest identifying one answer."""
+    prompt_hash = hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()
+    material = json.dumps([profile_id, profile_version, normalize_question(question), prompt_hash, params],
+                          sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Interface for response caches; subclasses implement _get and _put."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        response = self._get(key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def put(self, key: str, response: str):
+        self._put(key, response)
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def _put(self, key: str, response: str):
+        ...
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and the hit rate."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: Optional[float] = DEFAULT_TTL):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def _put(self, key: str, response: str, expires_at: Optional[float] = None):
+        if expires_at is None:
+            expires_at = time.time() + self.ttl if self.ttl is not None else float('inf')
+        with self._lock:
+            self._entries[key] = (expires_at, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """On-disk cache shared between processes and runs.
+
+    Rows are not counted on every insert: pruning cuts the table to a low-water
+    mark below max_entries, and the table is only counted again once this
+    process has inserted enough rows to reach max_entries.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 100_000, ttl: Optional[float] = DEFAULT_TTL):
+        super().__init__()
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        # Rows pruned below max_entries, so a count is needed only every `_slack` inserts
+        self._slack = max(1, max_entries // 100)
+        # Upper bound on the rows, ignoring other processes' inserts and replaced keys
+        self._estimate = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, str]]:
+        """Expiry time and response for a live entry, without touching counters."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT expires_at, response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] < now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return row
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    def _put(self, key: str, response: str):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else float('inf')
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, expires_at, now))
+            self._estimate += 1
+            if self._estimate > self.max_entries:
+                self._prune()
+
+    def _prune(self):
+        """Cut the table to the low-water mark; call with the lock held."""
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        keep = max(0, self.max_entries - self._slack)
+        if count > keep:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)", (count - keep,))
+            count = keep
+        self._estimate = count
+
+    def purge_expired(self) -> int:
+        """Delete expired entries, returning how many were removed."""
+        with self._lock:
+            return self._db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),)).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+class TieredResponseCache(ResponseCache):
+    """Memory LRU in front of a SQLite tier; disk hits are promoted to memory."""
+
+    def __init__(self, memory: MemoryResponseCache, disk: SQLiteResponseCache):
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+
+    def _get(self, key: str) -> Optional[str]:
+        response = self.memory.get(key)
+        if response is not None:
+            return response
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        # Keep the disk expiry so a promoted entry does not outlive it
+        self.memory._put(key, response, expires_at=expires_at)
+        return response
+
+    def _put(self, key: str, response: str):
+        self.memory.put(key, response)
+        self.disk.put(key, response)
+
+    def stats(self) -> Dict[str, float]:
+        stats = super().stats()
+        stats["memory_hits"] = self.memory.hits
+        stats["disk_hits"] = self.hits - self.memory.hits
+        return stats
+
+
+def default_response_cache() -> Optional[ResponseCache]:
+    """Cache configured from RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL and RESPONSE_CACHE_DB.
+
+    A size of 0 disables caching; RESPONSE_CACHE_DB adds the SQLite tier.
+    """
+    max_entries = int(os.getenv("RESPONSE_CACHE_SIZE", str(DEFAULT_MAX_ENTRIES)))
+    if max_entries <= 0:
+        return None
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL", str(DEFAULT_TTL)))
+    memory = MemoryResponseCache(max_entries, ttl)
+    db_path = os.getenv("RESPONSE_CACHE_DB")
+    if not db_path:
+        return memory
+    return TieredResponseCache(memory, SQLiteResponseCache(Path(db_path), ttl=ttl))
@@ -10,7 +10,8 @@ def analyze_question_semantics(user_message: str) -> dict:
         'practice': ['practice', 'method', 'technique', 'meditation', 'inquiry', 'how to', 'steps', 'worship', 'devotion'],
         'philosophy': ['philosophy', 'theory', 'understanding', 'concept', 'what is', 'meaning', 'teach', 'view', 'belief'],
         'personal_guidance': ['help', 'struggle', 'difficulty', 'problem', 'advice', 'support', 'confused', 'lost', 'should'],
-        'tradition': ['tradition', 'lineage', 'school', 'approach', 'method', 'religion', 'faith', 'path'],
+        'tradition': ['tradition', 'lineage', 'school', 'approach', 'method', 'religion', 'faith', 'path',
+                      'teacher', 'guru', 'disciple', 'influence'],
         'compassion': ['compassion', 'kindness', 'gentle', 'care', 'support', 'struggle', 'help', 'confused'],
         'directness': ['direct', 'immediate', 'now', 'clear', 'straightforward', 'simple', 'give me'],
         'spiritual_experience': ['experience', 'ecstasy', 'divine', 'god', 'spiritual', 'realization', 'enlightenment'],
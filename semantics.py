@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Semantic question analysis for CLEARLIST profile agents.
+Scores a question against keyword categories in a single pass over the text.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# Keyword categories used to focus the persona prompt. Keywords are matched
+# as lowercase substrings; a category's score is the number of its distinct
+# keywords present in the question.
+SEMANTIC_CATEGORIES: Dict[str, List[str]] = {
+    'practice': ['practice', 'method', 'technique', 'meditation', 'inquiry', 'how to', 'steps', 'worship', 'devotion'],
+    'philosophy': ['philosophy', 'theory', 'understanding', 'concept', 'what is', 'meaning', 'teach', 'view', 'belief'],
+    'personal_guidance': ['help', 'struggle', 'difficulty', 'problem', 'advice', 'support', 'confused', 'lost', 'should'],
+    'tradition': ['tradition', 'lineage', 'school', 'approach', 'method', 'religion', 'faith', 'path',
+                  'teacher', 'guru', 'disciple', 'influence'],
+    'compassion': ['compassion', 'kindness', 'gentle', 'care', 'support', 'struggle', 'help', 'confused'],
+    'directness': ['direct', 'immediate', 'now', 'clear', 'straightforward', 'simple', 'give me'],
+    'spiritual_experience': ['experience', 'ecstasy', 'divine', 'god', 'spiritual', 'realization', 'enlightenment'],
+    'religious_unity': ['religion', 'religions', 'unity', 'different', 'faiths', 'paths', 'traditions']
+}
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count('1')
+
+
+class SemanticClassifier:
+    """Keyword category scorer compiled once into a single trie-shaped regex.
+
+    The regex is anchored in a lookahead at every position and always takes the
+    longest keyword starting there. Shorter keywords hidden inside a match
+    (``religion`` in ``religions``, ``now`` in ``know``) are recovered from a
+    precomputed containment mask, so scores are identical to testing every
+    keyword with ``in`` while the message is only scanned once.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = list(categories)
+        keywords: List[str] = []
+        for category_keywords in categories.values():
+            for keyword in category_keywords:
+                keyword = keyword.lower()
+                if keyword and keyword not in keywords:
+                    keywords.append(keyword)
+        self.keywords = keywords
+
+        self._keyword_bit = {keyword: 1 << i for i, keyword in enumerate(keywords)}
+        # Every keyword that occurs inside another one is implied by its match
+        self._implied_mask = {
+            keyword: sum(bit for other, bit in self._keyword_bit.items() if other in keyword)
+            for keyword in keywords
+        }
+        self._category_masks: List[Tuple[str, int]] = [
+            (category, sum(self._keyword_bit[kw.lower()] for kw in set(category_keywords) if kw))
+            for category, category_keywords in categories.items()
+        ]
+        self._pattern = re.compile(f"(?=({self._trie_pattern(keywords)}))") if keywords else None
+
+    @staticmethod
+    def _trie_pattern(keywords: List[str]) -> str:
+        """Render keywords as a regex trie that prefers the longest match."""
+        trie: Dict = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        def render(node: Dict) -> str:
+            terminal = '' in node
+            branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            if terminal:
+                return f"(?:{'|'.join(branches)})?"
+            return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+        return render(trie)
+
+    def keyword_mask(self, text: str) -> int:
+        """Return a bitmask of every keyword present in the text."""
+        if self._pattern is None:
+            return 0
+        implied = self._implied_mask
+        mask = 0
+        for match in set(self._pattern.findall(text.lower())):
+            mask |= implied[match]
+        return mask
+
+    def score(self, text: str) -> Dict[str, int]:
+        """Score every category against the text."""
+        mask = self.keyword_mask(text)
+        return {category: _popcount(mask & category_mask) for category, category_mask in self._category_masks}
+
+
+# Compiled once at import; shared by every ProfileAgent
+SEMANTIC_CLASSIFIER = SemanticClassifier(SEMANTIC_CATEGORIES)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Minimal OpenAI-compatible chat completions server for tests and load tests.
+
+Serves POST /v1/chat/completions with plain or streamed (SSE) answers over
+HTTP/1.1 keep-alive, using only the standard library. Failures can be
+scripted as a queue of status codes, returned one per request before normal
+answers resume, and the server counts requests and connections so tests can
+check retries and connection reuse.
+
+    python stub_llm_server.py --port 8765
+    OPENAI_API_KEY=x OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python profile_agent.py
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional, Set, Union
+
+import typer
+
+_REASONS = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error",
+            502: "Bad Gateway", 503: "Service Unavailable"}
+
+
+def echo_reply(payload: Dict) -> str:
+    """Default answer: echo the last user message."""
+    messages = payload.get("messages") or [{}]
+    return f"Stub answer to: {messages[-1].get('content', '')}"
+
+
+class StubChatServer:
+    """In-process chat completions endpoint on 127.0.0.1 (a free port by default)."""
+
+    def __init__(self, reply: Union[str, Callable[[Dict], str]] = echo_reply, latency: float = 0.0,
+                 chunk_delay: float = 0.0, failures: Iterable[int] = (), retry_after: Optional[float] = 0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.reply = reply
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        # Status codes answered, one per request, before normal replies resume
+        self.failures = deque(failures)
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self) -> "StubChatServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed() open
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "StubChatServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+                if not await self._respond(request_line.decode("latin-1").split(), body, writer):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled on shutdown: end quietly, the connection is closed below
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, request_line, body: bytes, writer: asyncio.StreamWriter) -> bool:
+        """Answer one request; returns whether the connection stays open."""
+        if len(request_line) < 2 or request_line[0] != "POST" or not request_line[1].endswith("/chat/completions"):
+            await self._send_json(writer, 404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return True
+        payload = json.loads(body or b"{}")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failures:
+            status = self.failures.popleft()
+            extra = {"retry-after": str(self.retry_after)} if status == 429 and self.retry_after is not None else {}
+            await self._send_json(writer, status, {"error": {"message": f"stub failure {status}", "type": "server_error"}},
+                                  extra)
+            return True
+
+        content = self.reply(payload) if callable(self.reply) else self.reply
+        model = payload.get("model", "stub")
+        created = int(time.time())
+        if not payload.get("stream"):
+            await self._send_json(writer, 200, {
+                "id": f"chatcmpl-stub-{self.requests}", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+            return True
+
+        # Streams end by closing the connection, so no chunked encoding is needed
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            chunk = {"id": f"chatcmpl-stub-{self.requests}", "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": [{"index": 0, "delta": {"content": word if i == 0 else f" {word}"},
+                                                  "finish_reason": None}]}
+            writer.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            await writer.drain()
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
+        return False
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: int, data: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(data).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}", "Content-Type: application/json",
+                 f"Content-Length: {len(body)}"]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+def main(
+    port: int = typer.Option(8765, "--port", help="Port to listen on"),
+    latency: float = typer.Option(0.2, "--latency", help="Seconds before each answer starts"),
+    chunk_delay: float = typer.Option(0.02, "--chunk-delay", help="Seconds between streamed words"),
+):
+    """Serve stub chat completions until interrupted."""
+    async def serve():
+        server = await StubChatServer(latency=latency, chunk_delay=chunk_delay, port=port).start()
+        print(f"Stub chat completions at {server.base_url}")
+        await server._server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Synthetic CLEARLIST profile corpus for benchmarks.
+Generates deterministic profile capsules shaped like the ones in profiles/.
+
+    python synthetic_corpus.py /tmp/corpus/profiles --count 10000 --richness 3
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import typer
+
+from manifest import build_manifest, default_manifest_path, write_manifest
+
+_SYLLABLES = ['ra', 'ma', 'na', 'sha', 'ka', 'vi', 'de', 'an', 'da', 'ti', 'su', 'ri', 'ya', 'lo', 'go', 'pa']
+_TRADITIONS = ['Advaita Vedānta', 'Vedānta', 'Bhakti', 'Zen', 'Dzogchen', 'Sufism', 'Christian mysticism', 'Taoism']
+_SCHOOLS = ['Advaita-leaning', 'Navayana', 'Rinzai', 'Soto', 'Chishti', 'Quietism']
+_KEYWORDS = ['nonduality', 'self-inquiry', 'devotion', 'surrender', 'silence', 'awareness', 'direct experience',
+             'religious unity', 'meditation', 'compassion', 'presence', 'emptiness', 'grace', 'witnessing']
+_PLACES = ['Tiruvannamalai', 'Mumbai', 'Kamarpukur', 'Varanasi', 'Kyoto', 'Lhasa', 'Konya', 'Avila']
+_STATUSES = ['draft', 'reviewed', 'verified']
+_CLAIM_TEMPLATES = ['{} is the doorway to freedom.', '{} dissolves the sense of a separate doer.',
+                    'Without {}, effort only strengthens the ego.', '{} is not an achievement but a recognition.',
+                    'Daily life is the proper field of {}.', '{} ripens through patience rather than force.']
+_STEP_TEMPLATES = ['Sit quietly and turn attention toward {}.', 'Notice resistance and return to {}.',
+                   'Repeat the name of the divine while resting in {}.', 'Ask "to whom does this arise?" and rest in {}.',
+                   'Walk slowly, letting {} pervade each step.', 'Close the day by offering its fruits to {}.']
+_CARE_NOTES = ['Practice gently', 'Seek qualified support for distress', 'Avoid forcing states',
+               'Honour your own tradition', 'Rest when fatigued', 'Keep practice brief at first']
+
+
+def _name(rng: random.Random) -> str:
+    return ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def _enrich(profile: Dict, richness: int, rng: random.Random):
+    """Add claims, practices, sayings and care notes, as found in detailed capsules."""
+    sources = [source["id"] for source in profile["provenance"]["sources"]]
+    for _ in range(richness * 4):
+        keyword = rng.choice(_KEYWORDS)
+        profile["claims"].append({"text": rng.choice(_CLAIM_TEMPLATES).format(keyword).capitalize(),
+                                  "evidence": [rng.choice(sources)]})
+    for _ in range(richness):
+        keyword = rng.choice(_KEYWORDS)
+        profile["practice"].append({
+            "name": f"{keyword.capitalize()} practice",
+            "steps": [rng.choice(_STEP_TEMPLATES).format(rng.choice(_KEYWORDS)) for _ in range(rng.randint(3, 6))],
+        })
+    profile["sayings"].extend({"text": f"Be still and know {rng.choice(_KEYWORDS)}.", "verified": False}
+                              for _ in range(richness * 2))
+    profile["care_notes"] = rng.sample(_CARE_NOTES, min(len(_CARE_NOTES), 2 + richness))
+
+
+def synthetic_profile(index: int, rng: random.Random, richness: int = 1) -> Dict:
+    """Build one profile capsule conforming to schemas/profile.schema.json.
+
+    richness > 1 adds proportionally more claims, practices, sayings and care notes.
+    """
+    first, last = _name(rng), _name(rng)
+    profile_id = f"{first}-{last}-{index}".lower()
+    born_year = rng.randint(1500, 1950)
+    sources = [
+        {
+            "id": f"src:{i}",
+            "title": f"{_name(rng)} {_name(rng)}, Collected Talks vol. {i} ({born_year + 60 + i})",
+            "url": f"https://archive.org/details/{profile_id}-{i}",
+            "reliability": round(rng.uniform(0.4, 1.0), 2),
+        }
+        for i in range(1, rng.randint(2, 4))
+    ]
+    keywords = rng.sample(_KEYWORDS, rng.randint(2, 5))
+    profile = {
+        "id": profile_id,
+        "version": "1.0.0",
+        "status": rng.choice(_STATUSES),
+        "canonical_name": f"{first} {last}",
+        "alt_names": [f"Sri {first}", f"{first} {_name(rng)}"],
+        "pronunciation": f"{first.lower()}-{last.lower()}",
+        "life": {
+            "born": {"date": f"{born_year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                     "place": rng.choice(_PLACES)},
+            "died": {"date": f"{born_year + rng.randint(30, 90)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                     "place": rng.choice(_PLACES)},
+        },
+        "affiliations": {
+            "traditions": rng.sample(_TRADITIONS, rng.randint(1, 2)),
+            "schools": rng.sample(_SCHOOLS, rng.randint(0, 1)),
+            "orders": [],
+        },
+        "thesis": f"Abiding as {keywords[0]} through {keywords[1]} reveals what is already present.",
+        "keywords": keywords,
+        "claims": [
+            {"text": f"{keyword.capitalize()} is the doorway to freedom.", "evidence": [rng.choice(sources)["id"]]}
+            for keyword in keywords[:rng.randint(1, 3)]
+        ],
+        "practice": [
+            {"name": f"{keywords[0].capitalize()} practice",
+             "steps": [f"Step {i}: rest in {rng.choice(_KEYWORDS)}" for i in range(1, rng.randint(2, 5))]}
+        ],
+        "sayings": [{"text": f"Be still and know {rng.choice(_KEYWORDS)}.", "verified": False}],
+        "care_notes": ["Practice gently", "Seek qualified support for distress"],
+        "geo": [{"place": rng.choice(_PLACES), "lat": round(rng.uniform(-60, 70), 4),
+                 "lng": round(rng.uniform(-180, 180), 4)}],
+        "media": {"images": [], "audio": [], "video": []},
+        "provenance": {
+            "sources": sources,
+            "last_reviewed": f"20{rng.randint(20, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "reviewer": "editor@clearlist",
+        },
+        "license": {"text": "CC BY-SA 4.0"},
+        "ai": {
+            "synopsis": f"{first} {last} taught {keywords[0]} within the {rng.choice(_TRADITIONS)} tradition.",
+            "qa_pairs": [{"q": f"What did {first} teach about {keywords[0]}?",
+                          "a": f"That {keywords[0]} is the doorway to freedom."}],
+        },
+        "seo": {"slug": profile_id, "summary": f"{first} {last} ({born_year}–)."},
+    }
+    if richness > 1:
+        _enrich(profile, richness, rng)
+    return profile
+
+
+def iter_corpus(count: int, seed: int = 0, richness: int = 1) -> Iterator[Dict]:
+    """Yield `count` deterministic synthetic profiles."""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield synthetic_profile(index, rng, richness)
+
+
+def generate_corpus(count: int, seed: int = 0, richness: int = 1) -> List[Dict]:
+    """Return `count` deterministic synthetic profiles."""
+    return list(iter_corpus(count, seed, richness))
+
+
+def write_corpus(profiles_dir: Path, count: int, seed: int = 0, richness: int = 1) -> Path:
+    """Write a synthetic corpus and its manifest; returns the manifest path."""
+    profiles_dir = Path(profiles_dir)
+    profiles_dir.mkdir(parents=True, exist_ok=True)
+    for profile in iter_corpus(count, seed, richness):
+        with open(profiles_dir / f"{profile['id']}.json", 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False)
+    manifest_path = default_manifest_path(profiles_dir)
+    write_manifest(build_manifest(profiles_dir), manifest_path)
+    return manifest_path
+
+
+def main(
+    profiles_dir: Path = typer.Argument(..., help="Directory to write profile JSON files into"),
+    count: int = typer.Option(1000, "--count", "-n", help="Profiles to generate"),
+    seed: int = typer.Option(0, "--seed", help="Random seed; the same seed gives the same corpus"),
+    richness: int = typer.Option(1, "--richness", help="Claims, practices and sayings multiplier"),
+):
+    """Write a schema-conforming synthetic corpus and its manifest."""
+    manifest_path = write_corpus(profiles_dir, count, seed, richness)
+    print(f"Wrote {count} profiles to {profiles_dir} and the manifest to {manifest_path}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
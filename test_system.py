@@ -149,6 +149,1539 @@ def test_system_prompt_generation():
         print(f"❌ Error testing semantic prompt generation: {e}")
         return False
 
+def test_semantic_classifier():
+    """Test that the compiled classifier matches the per-keyword scan."""
+    print("\nTesting Semantic Classifier...")
+    
+    from semantics import SEMANTIC_CLASSIFIER
+    from semantic_prompt_test import analyze_question_semantics
+    
+    test_questions = [
+        "How do I practice self-inquiry?",
+        "What did you teach about different religions?",
+        "Do you know the path? Give me something simple, now.",
+        "HELP, I'm lost and confused about God and devotion",
+        "",
+    ]
+    
+    for question in test_questions:
+        expected = analyze_question_semantics(question)
+        scores = SEMANTIC_CLASSIFIER.score(question)
+        if scores != expected:
+            print(f"❌ Scores differ for: {question!r}: {scores} != {expected}")
+            return False
+    
+    print(f"✅ Compiled classifier matches legacy scores for {len(test_questions)} questions")
+    return True
+
+def test_prompt_fragment_cache():
+    """Test that prompt fragments are shared and full prompts are memoized."""
+    print("\nTesting Prompt Fragment Cache...")
+    
+    from profile_agent import ProfileAgent
+    
+    profile_manager = ProfileManager()
+    profile_data = profile_manager.get_profile("ramakrishna")
+    agent = ProfileAgent(profile_data, None)
+    other_agent = ProfileAgent(profile_data, None)
+    
+    if agent.prompt_fragments is not other_agent.prompt_fragments:
+        print("❌ Agents for the same profile version do not share fragments")
+        return False
+    
+    first = agent._build_focused_system_prompt("How do I practice devotion?")
+    second = agent._build_focused_system_prompt("how do i PRACTICE devotion")
+    if first is not second:
+        print("❌ Questions with the same category mask and keywords were not memoized")
+        return False
+    
+    if "Devotional practice" not in first or "TONE: Balanced" not in first:
+        print("❌ Cached prompt is missing expected sections")
+        return False
+    
+    # The module caches keep only the most recently used profile versions
+    import prompt_fragments
+    import qa_lookup
+    caches = prompt_fragments._fragment_cache, qa_lookup._matcher_cache
+    sizes = [cache.max_entries for cache in caches]
+    for cache in caches:
+        cache.max_entries = 2
+    try:
+        base = profile_data.to_dict()
+        versions = [dict(base, version=f"lru-{i}") for i in range(3)]
+        prompt_fragments.get_prompt_fragments(versions[0])
+        qa_lookup.get_qa_matcher(versions[0])
+        for version in versions[1:]:
+            prompt_fragments.get_prompt_fragments(version)
+            qa_lookup.get_qa_matcher(version)
+        kept = tuple([key[1] for key in cache.keys()] for cache in caches)
+    finally:
+        for cache, size in zip(caches, sizes):
+            cache.max_entries = size
+        prompt_fragments.invalidate_prompt_fragments("ramakrishna")
+        qa_lookup.invalidate_qa_matcher("ramakrishna")
+    if kept != (["lru-1", "lru-2"], ["lru-1", "lru-2"]):
+        print(f"❌ Fragment/matcher caches not bounded LRU: {kept}")
+        return False
+    
+    print("✅ Prompt fragments are cached per profile version")
+    return True
+
+def test_search_index():
+    """Test search ranking, paging and index updates."""
+    print("\nTesting Search Index...")
+    
+    profile_manager = ProfileManager()
+    
+    # Name hits rank ahead of keyword hits
+    results = profile_manager.search_profiles("ramakrishna")
+    if not results or results[0] != "ramakrishna":
+        print(f"❌ Name match not ranked first: {results}")
+        return False
+    
+    # Diacritics are normalized
+    if not profile_manager.search_profiles("vedanta") and not profile_manager.search_profiles("sri"):
+        print("❌ Normalized search returned nothing")
+        return False
+    
+    all_results = profile_manager.search_profiles("a")
+    paged = profile_manager.search_profiles("a", limit=2, offset=1)
+    if paged != all_results[1:3]:
+        print(f"❌ limit/offset paging mismatch: {paged} vs {all_results[1:3]}")
+        return False
+    
+    profile_data = profile_manager.get_profile("ramana-maharshi").to_dict()
+    profile_data["keywords"] = profile_data["keywords"] + ["zzunique"]
+    profile_manager.add_profile(profile_data)
+    if profile_manager.search_profiles("zzuniq") != ["ramana-maharshi"]:
+        print("❌ Reloaded profile not reflected in the index")
+        return False
+    
+    profile_manager.remove_profile("ramana-maharshi")
+    if profile_manager.search_profiles("zzuniq") or profile_manager.search_profiles("ramana"):
+        print("❌ Removed profile still searchable")
+        return False
+    
+    print("✅ Search index ranks, pages and updates correctly")
+    return True
+
+def test_lazy_loading():
+    """Test manifest-driven lazy profile loading."""
+    print("\nTesting Lazy Loading...")
+    
+    profile_manager = ProfileManager(lazy=True)
+    if not profile_manager.lazy:
+        print("❌ Lazy mode fell back to eager loading (missing manifest?)")
+        return False
+    
+    if profile_manager.profiles.cached_count() != 0:
+        print("❌ Profile bodies were parsed at startup")
+        return False
+    
+    eager_manager = ProfileManager()
+    if sorted(profile_manager.list_profiles()) != sorted(eager_manager.list_profiles()):
+        print("❌ Manifest ids differ from the profiles directory")
+        return False
+    
+    if profile_manager.profile_summary("ramana-maharshi").get("canonical_name") != "Ramana Maharshi":
+        print("❌ Names are not available before loading bodies")
+        return False
+    
+    if "ramana-maharshi" not in profile_manager.search_profiles("ramana"):
+        print("❌ Lazy search failed")
+        return False
+    
+    profile_data = profile_manager.get_profile("ramana-maharshi")
+    if profile_data != eager_manager.get_profile("ramana-maharshi"):
+        print("❌ Lazily loaded profile differs from eager load")
+        return False
+    
+    print(f"✅ Lazy mode parsed {profile_manager.profiles.cached_count()} of {len(profile_manager.profiles)} profiles")
+    return True
+
+def test_incremental_refresh():
+    """Test that refresh() picks up added, changed and removed profile files."""
+    print("\nTesting Incremental Refresh...")
+    
+    import os
+    import shutil
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_dir = Path(tmp) / "profiles"
+        shutil.copytree("profiles", profiles_dir)
+        shutil.copytree("manifests", Path(tmp) / "manifests")
+        
+        for lazy in (False, True):
+            profile_manager = ProfileManager(str(profiles_dir), lazy=lazy)
+            result = profile_manager.refresh()
+            if any(result[key] for key in ('added', 'updated', 'removed')):
+                print(f"❌ Unchanged corpus reported changes (lazy={lazy}): {result}")
+                return False
+            
+            ramana_file = profiles_dir / "ramana-maharshi.json"
+            original = ramana_file.read_text(encoding="utf-8")
+            profile_data = json.loads(original)
+            profile_data["keywords"].append("zzrefresh")
+            ramana_file.write_text(json.dumps(profile_data), encoding="utf-8")
+            os.utime(ramana_file, ns=(1, 1))
+            
+            new_profile = dict(profile_data, id="refresh-test", canonical_name="Refresh Test", keywords=[])
+            (profiles_dir / "refresh-test.json").write_text(json.dumps(new_profile), encoding="utf-8")
+            (profiles_dir / "anandamayi-ma.json").rename(Path(tmp) / "anandamayi-ma.json")
+            
+            result = profile_manager.refresh()
+            expected = {'added': ['refresh-test'], 'updated': ['ramana-maharshi'], 'removed': ['anandamayi-ma']}
+            if any(result[key] != value for key, value in expected.items()):
+                print(f"❌ Unexpected refresh result (lazy={lazy}): {result}")
+                return False
+            if set(result['mismatched']) != {'ramana-maharshi', 'refresh-test'}:
+                print(f"❌ Manifest verification missed changes (lazy={lazy}): {result['mismatched']}")
+                return False
+            if profile_manager.search_profiles("zzrefresh") != ["ramana-maharshi"]:
+                print(f"❌ Search index not updated by refresh (lazy={lazy})")
+                return False
+            if profile_manager.get_profile("anandamayi-ma") is not None:
+                print(f"❌ Removed profile still available (lazy={lazy})")
+                return False
+            
+            # Restore the copy for the next mode
+            ramana_file.write_text(original, encoding="utf-8")
+            (profiles_dir / "refresh-test.json").unlink()
+            (Path(tmp) / "anandamayi-ma.json").rename(profiles_dir / "anandamayi-ma.json")
+    
+    print("✅ refresh() applies only changed files in eager and lazy modes")
+    return True
+
+def test_snapshot():
+    """Test compiling and opening a corpus snapshot."""
+    print("\nTesting Corpus Snapshot...")
+    
+    import shutil
+    import tempfile
+    from manifest import build_manifest, write_manifest
+    from profile_snapshot import write_snapshot
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_dir = Path(tmp) / "profiles"
+        shutil.copytree("profiles", profiles_dir)
+        manifest_path = Path(tmp) / "manifests" / "index.json"
+        write_manifest(build_manifest(profiles_dir), manifest_path)
+        
+        eager_manager = ProfileManager(str(profiles_dir), use_snapshot=False)
+        write_snapshot(eager_manager, eager_manager.snapshot_path)
+        
+        snapshot_manager = ProfileManager(str(profiles_dir))
+        if snapshot_manager.snapshot is None:
+            print("❌ Fresh snapshot was not used")
+            return False
+        
+        for profile_id in eager_manager.list_profiles():
+            if snapshot_manager.get_profile(profile_id) != eager_manager.get_profile(profile_id):
+                print(f"❌ Snapshot profile differs: {profile_id}")
+                return False
+        
+        if snapshot_manager.search_profiles("ramana") != eager_manager.search_profiles("ramana"):
+            print("❌ Snapshot search index differs")
+            return False
+        
+        # Editing a profile and the manifest makes the snapshot stale
+        ramana_file = profiles_dir / "ramana-maharshi.json"
+        profile_data = json.loads(ramana_file.read_text(encoding="utf-8"))
+        profile_data["thesis"] = "Changed."
+        ramana_file.write_text(json.dumps(profile_data), encoding="utf-8")
+        write_manifest(build_manifest(profiles_dir), manifest_path)
+        
+        stale_manager = ProfileManager(str(profiles_dir))
+        if stale_manager.snapshot is not None or stale_manager.get_profile("ramana-maharshi")["thesis"] != "Changed.":
+            print("❌ Stale snapshot was used instead of JSON")
+            return False
+        
+        # An edit without regenerating the manifest is reported before compiling
+        profile_data["thesis"] = "Changed again."
+        ramana_file.write_text(json.dumps(profile_data), encoding="utf-8")
+        mismatched = ProfileManager(str(profiles_dir), use_snapshot=False).manifest_mismatches()
+        if mismatched != ["ramana-maharshi"]:
+            print(f"❌ Stale manifest not detected: {mismatched}")
+            return False
+    
+    print("✅ Snapshot opens when fresh and falls back to JSON when stale")
+    return True
+
+def test_profile_model():
+    """Test the immutable profile model against the schema and profile files."""
+    print("\nTesting Profile Model...")
+    
+    from profile_model import Profile, Record
+    
+    with open("schemas/profile.schema.json", "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    if set(Profile._schema) != set(schema["properties"]):
+        print(f"❌ Profile fields differ from the schema: {set(Profile._schema) ^ set(schema['properties'])}")
+        return False
+    
+    for profile_file in Path("profiles").glob("*.json"):
+        with open(profile_file, "r", encoding="utf-8") as f:
+            profile_data = json.load(f)
+        profile = Profile.from_dict(profile_data)
+        if profile.to_dict() != profile_data:
+            print(f"❌ Round trip changed {profile_file.name}")
+            return False
+        if not isinstance(profile.claims, tuple) or not all(isinstance(c, Record) for c in profile.claims):
+            print(f"❌ Claims are not immutable records in {profile_file.name}")
+            return False
+        if profile.get("affiliations", {}).get("traditions", []) != profile.traditions:
+            print(f"❌ Dict-style access differs from attribute access in {profile_file.name}")
+            return False
+    
+    try:
+        profile.thesis = "changed"
+        print("❌ Profile is mutable")
+        return False
+    except AttributeError:
+        pass
+    
+    print("✅ Profile model round-trips every profile and is immutable")
+    return True
+
+def test_schema_validation():
+    """Test compiled schema validation, its cache and rejection of invalid profiles."""
+    print("\nTesting Schema Validation...")
+    
+    import os
+    import shutil
+    import tempfile
+    import profile_agent
+    from manifest import content_hash
+    from profile_validation import PROFILE_SCHEMA, ValidationCache, validate_bytes, validate_data, validate_files
+    
+    with open("profiles/ramana-maharshi.json", "r", encoding="utf-8") as f:
+        profile_data = json.load(f)
+    broken = dict(profile_data, id="Not Valid", status="published", extra=1)
+    del broken["thesis"]
+    broken["geo"] = [{"place": "Tiruvannamalai", "lat": "north"}]
+    errors = validate_data(broken)
+    expected = ["$: missing required property 'thesis'", "$.id: 'Not Valid' does not match ^[a-z0-9-]+$",
+                "$: unexpected property 'extra'", "$.geo[0].lat: expected number, got str"]
+    if validate_data(profile_data) or any(error not in errors for error in expected):
+        print(f"❌ Unexpected validation errors: {errors}")
+        return False
+    
+    cache = ValidationCache()
+    data = json.dumps(broken).encode("utf-8")
+    first = validate_bytes(data, content_hash(data), PROFILE_SCHEMA, cache=cache)
+    if validate_bytes(data, content_hash(data), PROFILE_SCHEMA, cache=cache) != first or cache.hits != 1:
+        print("❌ Validation result was not cached by content hash")
+        return False
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_dir = Path(tmp) / "profiles"
+        shutil.copytree("profiles", profiles_dir)
+        shutil.copytree("manifests", Path(tmp) / "manifests")
+        (profiles_dir / "broken.json").write_text(json.dumps(broken), encoding="utf-8")
+        
+        results = validate_files(sorted(profiles_dir.glob("*.json")), workers=2, cache=None)
+        if [Path(path).name for path, errors in results.items() if errors] != ["broken.json"]:
+            print(f"❌ Parallel validation flagged the wrong files: {results}")
+            return False
+        
+        profile_manager = ProfileManager(str(profiles_dir), use_snapshot=False)
+        if "Not Valid" in profile_manager.profiles or "broken.json" not in profile_manager.validation_errors:
+            print("❌ Invalid profile was loaded")
+            return False
+        
+        ramana_file = profiles_dir / "ramana-maharshi.json"
+        ramana_file.write_text(json.dumps(dict(profile_data, status="published")), encoding="utf-8")
+        os.utime(ramana_file, ns=(1, 1))
+        result = profile_manager.refresh()
+        if result["invalid"] != ["ramana-maharshi.json"] or result["updated"]:
+            print(f"❌ Invalid edit was applied by refresh: {result}")
+            return False
+        if profile_manager.get_profile("ramana-maharshi").status != profile_data["status"]:
+            print("❌ Last valid version of an invalid edit is no longer served")
+            return False
+        
+        # Schemas are found from any working directory; without one, profiles load unvalidated
+        cwd = os.getcwd()
+        try:
+            os.chdir(tmp)
+            profile_manager = ProfileManager(str(Path(cwd) / "profiles"), use_snapshot=False)
+        finally:
+            os.chdir(cwd)
+        if len(profile_manager.profiles) != 4:
+            print(f"❌ Loaded {len(profile_manager.profiles)} profiles from another working directory")
+            return False
+        schema_path = profile_agent.PROFILE_SCHEMA
+        try:
+            profile_agent.PROFILE_SCHEMA = Path(tmp) / "missing.schema.json"
+            profile_manager = ProfileManager(str(Path(cwd) / "profiles"), use_snapshot=False)
+        finally:
+            profile_agent.PROFILE_SCHEMA = schema_path
+        if len(profile_manager.profiles) != 4 or profile_manager.validate:
+            print("❌ A missing schema rejected every profile")
+            return False
+    
+    print("✅ Schema validation reports errors, caches results and rejects invalid profiles")
+    return True
+
+def test_ask_many():
+    """Test concurrent fan-out with a stub client: completion order, bounds and timeouts."""
+    print("\nTesting Concurrent Fan-out...")
+    
+    import asyncio
+    import time
+    from types import SimpleNamespace
+    
+    delays = {"ramana-maharshi": 0.15, "ramakrishna": 0.05, "anandamayi-ma": 0.10, "nisargadatta-maharaj": 5.0}
+    
+    class StubCompletions:
+        def __init__(self):
+            self.in_flight = 0
+            self.peak = 0
+        
+        async def create(self, model, messages, **kwargs):
+            name = messages[0]["content"].split(" (", 1)[0][len("You are "):]
+            delay = delays_by_name[name]
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.in_flight -= 1
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"answer from {name}"))])
+    
+    profile_manager = ProfileManager()
+    delays_by_name = {profile_manager.get_profile(pid).canonical_name: delay for pid, delay in delays.items()}
+    completions = StubCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    
+    async def collect():
+        return [result async for result in profile_manager.ask_many(
+            "What is the Self?", list(delays) + ["unknown"], client, concurrency=3, timeout=0.5)]
+    
+    start = time.perf_counter()
+    results = asyncio.run(collect())
+    elapsed = time.perf_counter() - start
+    
+    order = [result.profile_id for result in results]
+    if order != ["unknown", "ramakrishna", "anandamayi-ma", "ramana-maharshi", "nisargadatta-maharaj"]:
+        print(f"❌ Results not yielded in completion order: {order}")
+        return False
+    statuses = {result.profile_id: result.status for result in results}
+    if statuses["nisargadatta-maharaj"] != "timeout" or statuses["unknown"] != "error" or statuses["ramakrishna"] != "ok":
+        print(f"❌ Unexpected statuses: {statuses}")
+        return False
+    if completions.peak > 3 or elapsed > 1.0:
+        print(f"❌ Concurrency not bounded or requests ran serially (peak {completions.peak}, {elapsed:.2f}s)")
+        return False
+    
+    print(f"✅ Fan-out to {len(delays)} personas finished in {elapsed:.2f}s with results in completion order")
+    return True
+
+def test_streaming_response():
+    """Test respond_stream yields chunks progressively and records per-turn latency."""
+    print("\nTesting Streaming Responses...")
+    
+    import asyncio
+    from types import SimpleNamespace
+    from profile_agent import ProfileAgent
+    
+    pieces = ["Who ", "is ", "asking ", "the ", "question?"]
+    
+    class StubCompletions:
+        async def create(self, stream=False, **kwargs):
+            if not stream:
+                raise AssertionError("respond_stream must request a streamed completion")
+            
+            async def chunks():
+                await asyncio.sleep(0.05)
+                # Role-only and empty chunks carry no content and must be skipped
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))])
+                for piece in pieces:
+                    yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+                    await asyncio.sleep(0.02)
+                yield SimpleNamespace(choices=[])
+            return chunks()
+    
+    profile_manager = ProfileManager()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    agent = ProfileAgent(profile_manager.get_profile("ramana-maharshi"), client)
+    
+    async def collect():
+        return [piece async for piece in agent.respond_stream("Who am I?")]
+    
+    received = asyncio.run(collect())
+    if received != pieces:
+        print(f"❌ Unexpected stream chunks: {received}")
+        return False
+    metrics = agent.turn_metrics[-1]
+    if len(agent.turn_metrics) != 1 or metrics.chunks != len(pieces) or metrics.characters != len(''.join(pieces)):
+        print(f"❌ Unexpected turn metrics: {agent.turn_metrics}")
+        return False
+    if not 0.04 < metrics.time_to_first_token < metrics.total_latency:
+        print(f"❌ Time to first token not measured: {metrics}")
+        return False
+    
+    # A turn failing before the stream starts must not report the previous turn's metrics
+    from profile_agent import console, stream_reply
+    
+    def broken_prompt(user_message):
+        raise RuntimeError("prompt failed")
+    
+    for failing in (ProfileAgent(profile_manager.get_profile("ramana-maharshi"), client), agent):
+        failing._build_focused_system_prompt = broken_prompt
+        turns = len(failing.turn_metrics)
+        console.quiet = True
+        try:
+            reply = asyncio.run(stream_reply(failing, "Who am I?"))
+        except Exception as e:
+            print(f"❌ stream_reply raised for a turn that failed early: {e!r}")
+            return False
+        finally:
+            console.quiet = False
+        if "prompt failed" not in reply or len(failing.turn_metrics) != turns:
+            print(f"❌ Early failure not reported: {reply}")
+            return False
+    
+    print(f"✅ Streamed {metrics.chunks} chunks, first token after {metrics.time_to_first_token:.2f}s "
+          f"of {metrics.total_latency:.2f}s")
+    return True
+
+def test_response_cache():
+    """Test response cache keys, expiry, eviction, the SQLite tier and agent integration."""
+    print("\nTesting Response Cache...")
+    
+    import asyncio
+    import tempfile
+    import time
+    from types import SimpleNamespace
+    from profile_agent import ProfileAgent
+    from response_cache import (MemoryResponseCache, ResponseCache, SQLiteResponseCache, TieredResponseCache,
+                                normalize_question)
+    
+    if normalize_question("  What is your CORE teaching method?") != normalize_question("what is your core teaching method"):
+        print("❌ Equivalent questions normalize differently")
+        return False
+    
+    class ReadOnlyCache(ResponseCache):
+        def _get(self, key):
+            return None
+    
+    try:
+        ReadOnlyCache()
+        print("❌ Cache backend without _put could be created")
+        return False
+    except TypeError:
+        pass
+    
+    memory = MemoryResponseCache(max_entries=2, ttl=0.05)
+    memory.put("a", "1")
+    memory.put("b", "2")
+    memory.get("a")
+    memory.put("c", "3")
+    if memory.get("b") is not None or memory.get("a") != "1":
+        print("❌ LRU eviction removed the wrong entry")
+        return False
+    time.sleep(0.06)
+    if memory.get("a") is not None:
+        print("❌ Expired entry was returned")
+        return False
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "responses.sqlite3"
+        disk = SQLiteResponseCache(db_path)
+        disk.put("k", "persisted")
+        disk.close()
+        # The size cap holds without counting the table on every insert
+        capped = SQLiteResponseCache(Path(tmp) / "capped.sqlite3", max_entries=300)
+        counts = []
+        capped._db.set_trace_callback(lambda sql: counts.append(sql) if "COUNT(*)" in sql else None)
+        for i in range(450):
+            capped.put(f"k{i}", "v")
+        capped._db.set_trace_callback(None)
+        if len(capped) > 300 or capped.get("k0") is not None or capped.get("k449") != "v" or len(counts) > 60:
+            print(f"❌ SQLite cap not enforced cheaply: {len(capped)} rows, {len(counts)} counts")
+            return False
+        capped.close()
+        tiered = TieredResponseCache(MemoryResponseCache(), SQLiteResponseCache(db_path))
+        if tiered.get("k") != "persisted" or tiered.get("k") != "persisted" or tiered.stats()["memory_hits"] != 1:
+            print(f"❌ SQLite tier not read or not promoted: {tiered.stats()}")
+            return False
+        tiered.disk.close()
+    
+    class StubCompletions:
+        calls = 0
+        
+        async def create(self, stream=False, **kwargs):
+            StubCompletions.calls += 1
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Be still."))])
+    
+    profile_manager = ProfileManager()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    cache = MemoryResponseCache()
+    profile_data = profile_manager.get_profile("ramana-maharshi")
+    agent = ProfileAgent(profile_data, client, cache)
+    
+    async def ask(agent, question):
+        return await agent.complete(question)
+    
+    asyncio.run(ask(agent, "What is your core teaching method?"))
+    answer = asyncio.run(ask(agent, "what is your core teaching method"))
+    streamed = asyncio.run(agent.respond_stream("What is your core teaching method?").__anext__())
+    if StubCompletions.calls != 1 or answer != "Be still." or streamed != answer or agent.turn_metrics[-1].source != "cache":
+        print(f"❌ Repeated question was not served from the cache ({StubCompletions.calls} API calls)")
+        return False
+    
+    revised = ProfileAgent(dict(profile_data.to_dict(), version="9.9.9"), client, cache)
+    asyncio.run(ask(revised, "What is your core teaching method?"))
+    if StubCompletions.calls != 2 or cache.stats()["hits"] != 2:
+        print(f"❌ New profile version hit a stale cache entry: {cache.stats()}")
+        return False
+    
+    print("✅ Response cache normalizes questions, expires, evicts, persists and is keyed by profile version")
+    return True
+
+def test_qa_lookup():
+    """Test that close matches to ai.qa_pairs are answered locally and misses reach the model."""
+    print("\nTesting QA Pair Lookup...")
+    
+    import asyncio
+    from types import SimpleNamespace
+    from profile_agent import ProfileAgent
+    
+    class StubCompletions:
+        calls = 0
+        
+        async def create(self, stream=False, **kwargs):
+            StubCompletions.calls += 1
+            if stream:
+                return self.chunks()
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="From the model."))])
+        
+        async def chunks(self):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="From the model."))])
+    
+    profile_manager = ProfileManager()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    profile_data = profile_manager.get_profile("ramakrishna")
+    curated = profile_data.ai.qa_pairs[0].a
+    agent = ProfileAgent(profile_data, client)
+    
+    for question in ("What did you teach about religions?", "What did Ramakrishna teach about religion?"):
+        if asyncio.run(agent.complete(question)) != curated:
+            print(f"❌ Curated answer not used for: {question}")
+            return False
+    streamed = asyncio.run(agent.respond_stream("what did he teach about religions").__anext__())
+    if StubCompletions.calls != 0 or streamed != curated or agent.turn_metrics[-1].source != "qa_pairs":
+        print("❌ Matching question reached the model")
+        return False
+    
+    if asyncio.run(agent.complete("What did you teach about meditation?")) != "From the model.":
+        print("❌ Unrelated question did not fall through to the model")
+        return False
+    # Same topic words, but a different question or a negation: never a curated answer
+    from qa_lookup import get_qa_matcher
+    false_positives = [("anandamayi-ma", "How do I surrender?"), ("anandamayi-ma", "Why should I not surrender?"),
+                       ("ramakrishna", "What did you NOT teach about religions?"),
+                       ("ramakrishna", "Why did you teach about religions?"),
+                       ("ramakrishna", "Didn't you teach about religions?"),
+                       ("ramana-maharshi", "Why is this your core method?"),
+                       # Similar wording, but about someone or something the curated question is not
+                       ("ramakrishna", "What did Jesus teach about religions?"),
+                       ("ramakrishna", "What did the Buddha teach about religions?"),
+                       ("ramana-maharshi", "What's the core method in Zen?")]
+    for profile_id, question in false_positives:
+        if get_qa_matcher(profile_manager.get_profile(profile_id)).lookup(question) is not None:
+            print(f"❌ Curated answer used for a different question: {question}")
+            return False
+    if get_qa_matcher(profile_manager.get_profile("ramana-maharshi")).lookup("What is your core method?") is None \
+            or get_qa_matcher(profile_data).lookup("Teachings on religions?") != curated:
+        print("❌ Plain rephrasing of a curated question no longer matches")
+        return False
+    # Mid-conversation the question may refer to earlier turns, so it goes to the model
+    from conversation_memory import ConversationMemory
+    memory = ConversationMemory()
+    memory.add_exchange("Tell me about Jesus.", "He loved God with his whole heart.")
+    calls = StubCompletions.calls
+    followup = asyncio.run(agent.complete("What did he teach about religions?", memory))
+    streamed = asyncio.run(agent.respond_stream("What did he teach about religions?", memory).__anext__())
+    if followup == curated or streamed == curated or StubCompletions.calls != calls + 2:
+        print("❌ Curated answer used for a follow-up question with conversation history")
+        return False
+    if asyncio.run(agent.complete("What did he teach about religions?", ConversationMemory())) != curated:
+        print("❌ Curated answer not used to open a conversation")
+        return False
+    strict = ProfileAgent(profile_data, client, qa_threshold=1.01)
+    if asyncio.run(strict.complete("What did you teach about religions?")) != "From the model.":
+        print("❌ QA threshold is not configurable")
+        return False
+    
+    print("✅ Curated qa_pairs answer close matches locally; other questions reach the model")
+    return True
+
+def test_prompt_item_ranking():
+    """Test that rich profiles include only the most relevant items within the budget."""
+    print("\nTesting Prompt Item Ranking...")
+    
+    import pickle
+    from profile_model import Profile
+    from prompt_fragments import PromptFragments, category_mask
+    from token_counter import count_tokens
+    from semantics import SEMANTIC_CLASSIFIER
+    from synthetic_corpus import generate_corpus
+    
+    profile_data = generate_corpus(1, seed=3, richness=6)[0]
+    profile_data["claims"].append({"text": "Kundalini awakening needs a steady teacher.", "evidence": ["src:1"]})
+    fragments = PromptFragments(Profile.from_dict(profile_data), token_budget=120, top_k=6)
+    unbounded = PromptFragments(Profile.from_dict(profile_data), token_budget=10 ** 6, top_k=10 ** 6)
+    
+    question = "What is the truth about kundalini awakening? How should I practice?"
+    scores = SEMANTIC_CLASSIFIER.score(question)
+    prompt = fragments.build(scores, question)
+    full = unbounded.build(scores, question)
+    selection = fragments.select_items(category_mask(scores), question)
+    
+    if not selection or len(selection) > 6 or sum(fragments.item_tokens[i] for i in selection) > 120:
+        print(f"❌ Selection ignores top_k or the token budget: {selection}")
+        return False
+    if "Kundalini awakening" not in prompt or "PRACTICE - " not in prompt or count_tokens(prompt) >= count_tokens(full):
+        print("❌ Ranked prompt is missing the most relevant items or is not smaller")
+        return False
+    if fragments.build(scores, question) is not prompt:
+        print("❌ Ranked prompt was not memoized")
+        return False
+    
+    restored = pickle.loads(pickle.dumps(fragments))
+    if restored._item_vectors is not None or restored.build(scores, question) != prompt:
+        print("❌ Pickled fragments do not rebuild the same prompt")
+        return False
+    
+    print(f"✅ Ranked prompt keeps {len(selection)} of {len(fragments.items)} items "
+          f"(~{count_tokens(prompt)} vs ~{count_tokens(full)} tokens)")
+    return True
+
+def test_prompt_token_budget():
+    """Test that prompts fill sections by priority within an input-token budget."""
+    print("\nTesting Prompt Token Budget...")
+    
+    import asyncio
+    from types import SimpleNamespace
+    from profile_agent import ProfileAgent
+    from profile_model import Profile
+    from prompt_fragments import PromptFragments
+    from semantics import SEMANTIC_CLASSIFIER
+    from synthetic_corpus import generate_corpus
+    from token_counter import count_tokens, get_token_counter, heuristic_count
+    
+    if heuristic_count("") != 0 or heuristic_count("Self-inquiry, 2024!") != 8:
+        print(f"❌ Heuristic token count is off: {heuristic_count('Self-inquiry, 2024!')}")
+        return False
+    if get_token_counter() is not get_token_counter():
+        print("❌ Token counter is not shared")
+        return False
+    
+    profile_data = generate_corpus(1, seed=5, richness=6)[0]
+    fragments = PromptFragments(Profile.from_dict(profile_data))
+    question = "I'm grieving. How do I practice meditation, and what is the truth about the unity of all faiths?"
+    scores = SEMANTIC_CLASSIFIER.score(question)
+    
+    unlimited = fragments.assemble(scores, question)
+    if unlimited.total_tokens != count_tokens(unlimited.text) or sum(unlimited.section_tokens.values()) != unlimited.total_tokens:
+        print(f"❌ Section usage does not add up: {unlimited.section_tokens} vs {count_tokens(unlimited.text)}")
+        return False
+    
+    for budget in (250, 150):
+        prompt = fragments.assemble(scores, question, budget)
+        if prompt.total_tokens > budget or prompt.total_tokens != count_tokens(prompt.text):
+            print(f"❌ Prompt overruns a budget of {budget}: {prompt.total_tokens} tokens")
+            return False
+        if not all(section in prompt.section_tokens for section in ('head', 'tone', 'tail')):
+            print(f"❌ Mandatory sections were dropped: {prompt.section_tokens}")
+            return False
+    if not prompt.omitted or any(section in prompt.section_tokens for section in prompt.omitted):
+        print(f"❌ A tight budget should omit whole sections: {prompt.omitted}")
+        return False
+    
+    # The agent reports per-section usage for every turn
+    async def create(**params):
+        async def stream():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Be still."))])
+        return stream()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    agent = ProfileAgent(profile_data, client, prompt_budget=250)
+    
+    async def run():
+        return [chunk async for chunk in agent.respond_stream(question)]
+    asyncio.run(run())
+    usage = agent.turn_metrics[-1].prompt_tokens
+    if not usage or sum(usage.values()) > 250 or usage != agent.last_prompt.section_tokens:
+        print(f"❌ Turn metrics lack the prompt's token usage: {usage}")
+        return False
+    
+    print(f"✅ Prompt fits budgets ({unlimited.total_tokens} → {prompt.total_tokens} tokens, "
+          f"omitted {', '.join(prompt.omitted)}) with {get_token_counter().name} counts")
+    return True
+
+def test_conversation_memory():
+    """Test that chat history stays bounded, is summarized, and persists."""
+    print("\nTesting Conversation Memory...")
+    
+    import asyncio
+    import tempfile
+    from types import SimpleNamespace
+    from conversation_memory import ConversationMemory, ConversationStore
+    from profile_agent import ProfileAgent
+    
+    memory = ConversationMemory(window=4, token_budget=200, summary_tokens=60)
+    for i in range(10):
+        memory.add('user' if i % 2 == 0 else 'assistant', f"Message {i} about stillness. More detail follows here.")
+    if len(memory) != 4 or [turn.content.split()[1] for turn in memory.turns()] != ['6', '7', '8', '9']:
+        print(f"❌ Ring buffer does not keep the newest turns: {memory.turns()}")
+        return False
+    if memory.evicted != 6 or "Message 5 about stillness." not in memory.summary or "More detail" in memory.summary:
+        print(f"❌ Evicted turns were not summarized: {memory.summary!r}")
+        return False
+    
+    for i in range(50):
+        memory.add('user', "A long question about awareness and the nature of mind. " * 8)
+        if memory.tokens > 200 or memory.summary_tokens > 60:
+            print(f"❌ History exceeds its token budget: {memory.tokens} tokens")
+            return False
+    if memory.messages()[0]["role"] != "system" or "Summary of the earlier conversation" not in memory.messages()[0]["content"]:
+        print("❌ Summary is not sent ahead of the recent turns")
+        return False
+    
+    # Later turns carry the earlier ones
+    requests = []
+    async def create(**params):
+        requests.append(params["messages"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"Answer {len(requests)}."))])
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    with open("profiles/ramana-maharshi.json", "r", encoding="utf-8") as f:
+        agent = ProfileAgent(json.load(f), client)
+    chat = ConversationMemory()
+    
+    async def run():
+        await agent.complete("How do I quiet the mind?", chat)
+        await agent.complete("And after that?", chat)
+    asyncio.run(run())
+    roles = [message["role"] for message in requests[1]]
+    if len(requests[0]) != 2 or roles != ['system', 'user', 'assistant', 'user'] or requests[1][2]["content"] != "Answer 1.":
+        print(f"❌ Follow-up question was sent without history: {roles}")
+        return False
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ConversationStore(Path(tmp) / "sessions.sqlite3")
+        store.save("morning", agent.id, memory)
+        store.save("morning", agent.id, memory)
+        profile_id, restored = store.load("morning", window=4, token_budget=200, summary_tokens=60)
+        sessions = store.sessions()
+        missing = store.load("evening")
+        store.close()
+    if (profile_id != agent.id or restored.turns() != memory.turns() or restored.summary != memory.summary
+            or restored.tokens != memory.tokens or missing is not None or len(sessions) != 1):
+        print("❌ Session did not round-trip through SQLite")
+        return False
+    
+    print(f"✅ History stays within {memory.tokens}/200 tokens after {memory.evicted} summarized messages; "
+          f"sessions persist to SQLite")
+    return True
+
+def test_llm_client():
+    """Test the shared client's pooling, retries, rate limiting and circuit breaker against a stub server."""
+    print("\nTesting Shared LLM Client...")
+    
+    import asyncio
+    import os
+    import time
+    import llm_client
+    from llm_client import CircuitBreaker, CircuitOpenError, LLMClient, TokenBucket
+    from profile_agent import ProfileAgent
+    from stub_llm_server import StubChatServer
+    
+    question = [{"role": "user", "content": "What is silence?"}]
+    
+    async def run():
+        async with StubChatServer(failures=[429, 503]) as server:
+            client = LLMClient(api_key="test", base_url=server.base_url, max_connections=3)
+            response = await client.chat.completions.create(model="stub", messages=question)
+            if response.choices[0].message.content != "Stub answer to: What is silence?" or client.retries != 2:
+                return f"429/503 were not retried: {client.stats()}"
+            
+            await asyncio.gather(*(client.chat.completions.create(model="stub", messages=question) for _ in range(20)))
+            if server.connections > 3:
+                return f"pool opened {server.connections} connections for max_connections=3"
+            
+            with open("profiles/ramana-maharshi.json", "r", encoding="utf-8") as f:
+                agent = ProfileAgent(json.load(f), client)
+            streamed = [chunk async for chunk in agent.respond_stream("What is silence?")]
+            if ''.join(streamed) != "Stub answer to: What is silence?" or len(streamed) < 2:
+                return f"agent did not stream through the shared client: {streamed}"
+            await client.aclose()
+            
+            server.failures.extend([500] * 10)
+            failing = LLMClient(api_key="test", base_url=server.base_url, max_retries=1,
+                                breaker=CircuitBreaker(threshold=2, cooldown=0.2))
+            for _ in range(2):
+                try:
+                    await failing.chat.completions.create(model="stub", messages=question)
+                    return "persistent 500s did not raise"
+                except CircuitOpenError:
+                    break
+                except Exception:
+                    pass
+            sent = server.requests
+            try:
+                await failing.chat.completions.create(model="stub", messages=question)
+                return "open circuit let a request through"
+            except CircuitOpenError:
+                pass
+            if server.requests != sent or failing.breaker.state != llm_client.OPEN:
+                return "open circuit did not fail fast"
+            server.failures.clear()
+            await asyncio.sleep(0.25)
+            await failing.chat.completions.create(model="stub", messages=question)
+            if failing.breaker.state != llm_client.CLOSED:
+                return "successful trial did not close the circuit"
+            await failing.aclose()
+        
+        bucket = TokenBucket(per_minute=1200, capacity=2)
+        start = time.perf_counter()
+        for _ in range(6):
+            await bucket.acquire()
+        # Two from the burst, then four at 20 per second
+        elapsed = time.perf_counter() - start
+        if not 0.15 <= elapsed <= 0.5:
+            return f"token bucket paced 6 requests in {elapsed:.2f}s"
+        return None
+    
+    base_delay = llm_client.RETRY_BASE_DELAY
+    llm_client.RETRY_BASE_DELAY = 0.01
+    try:
+        failure = asyncio.run(run())
+    finally:
+        llm_client.RETRY_BASE_DELAY = base_delay
+    if failure:
+        print(f"❌ {failure}")
+        return False
+    
+    # A pool created under asyncio.run() is closed when that loop shuts down
+    reused = LLMClient(api_key="test", base_url="http://127.0.0.1:9/v1")
+    
+    async def open_pool():
+        return reused.client
+    
+    pools = [asyncio.run(open_pool()) for _ in range(2)]
+    if pools[0] is pools[1] or not all(pool.is_closed() for pool in pools) or reused._client is not None:
+        print("❌ Connection pools of finished event loops were left open")
+        return False
+    
+    # Forked server workers split the per-minute budget
+    rpm = os.environ.get("OPENAI_RPM")
+    os.environ["OPENAI_RPM"] = "600"
+    try:
+        llm_client.share_rate_limits(4)
+        shared = llm_client.get_llm_client(api_key="share-test", base_url="http://127.0.0.1:9/v1")
+    finally:
+        llm_client.share_rate_limits(1)
+        llm_client._shared_clients.pop((llm_client.llm_backend(), "share-test", "http://127.0.0.1:9/v1"), None)
+        if rpm is None:
+            del os.environ["OPENAI_RPM"]
+        else:
+            os.environ["OPENAI_RPM"] = rpm
+    if shared.request_bucket is None or shared.request_bucket.rate != 150 / 60.0:
+        print("❌ Rate limit not divided across workers")
+        return False
+    
+    print("✅ Shared client retries 429/5xx, reuses pooled connections, paces requests and trips its breaker")
+    return True
+
+def test_profile_server():
+    """Test the HTTP endpoints, JSON and SSE chat, and sessions against a stub model."""
+    print("\nTesting HTTP Server...")
+    
+    import asyncio
+    import tempfile
+    import aiohttp
+    from aiohttp import web
+    from conversation_memory import ConversationStore
+    from llm_client import LLMClient
+    from profile_agent import ProfileManager
+    from profile_server import create_app
+    from response_cache import MemoryResponseCache
+    from stub_llm_server import StubChatServer
+    
+    async def run(tmp):
+        async with StubChatServer() as stub:
+            app = create_app(ProfileManager(), LLMClient(api_key="test", base_url=stub.base_url),
+                             MemoryResponseCache(), ConversationStore(Path(tmp) / "sessions.sqlite3"))
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f"{url}/health") as r:
+                        if r.status != 200:
+                            return f"health returned {r.status}"
+                    async with session.get(f"{url}/profiles", params={"limit": 2}) as r:
+                        listing = await r.json()
+                        if len(listing["profiles"]) != 2 or listing["total"] < 4:
+                            return f"bad listing: {listing}"
+                    async with session.get(f"{url}/profiles", params={"filter": "tradition=Advaita"}) as r:
+                        listing = await r.json()
+                        if listing["total"] != 2 or listing["facets"]["tradition"].get("Advaita") != 2:
+                            return f"bad faceted listing: {listing}"
+                    async with session.get(f"{url}/profiles/near",
+                                           params={"lat": "23", "lng": "91", "radius_km": "50"}) as r:
+                        near = await r.json()
+                        if [p["id"] for p in near["profiles"]] != ["anandamayi-ma"]:
+                            return f"bad radius query: {near}"
+                    async with session.get(f"{url}/profiles/search", params={"q": "ramana"}) as r:
+                        if [p["id"] for p in (await r.json())["profiles"]][:1] != ["ramana-maharshi"]:
+                            return "search did not rank ramana-maharshi first"
+                    async with session.get(f"{url}/profiles/ramana-maharshi") as r:
+                        if (await r.json()).get("id") != "ramana-maharshi":
+                            return "profile endpoint returned the wrong profile"
+                    async with session.get(f"{url}/profiles/nobody") as r:
+                        if r.status != 404:
+                            return f"unknown profile returned {r.status}"
+                    
+                    chat_url = f"{url}/profiles/ramana-maharshi/chat"
+                    async with session.post(chat_url, json={"message": ""}) as r:
+                        if r.status != 400:
+                            return f"empty message returned {r.status}"
+                    async with session.post(chat_url, json={"message": "What is silence?", "session_id": "s1"}) as r:
+                        answer = await r.json()
+                        if answer.get("response") != "Stub answer to: What is silence?":
+                            return f"bad JSON chat answer: {answer}"
+                    async with session.post(chat_url, json={"message": "And stillness?", "session_id": "s1",
+                                                            "stream": True}) as r:
+                        body = (await r.text()).split("\n\n")
+                    deltas = [json.loads(e[len("data: "):])["delta"] for e in body if e.startswith("data: ")]
+                    done = [json.loads(e.split("\n")[1][len("data: "):]) for e in body if e.startswith("event: done")]
+                    if ''.join(deltas) != "Stub answer to: And stillness?" or len(deltas) < 2:
+                        return f"bad streamed answer: {deltas}"
+                    if not done or not done[0]["prompt_tokens"].get("history"):
+                        return "streamed turn did not carry on the stored session"
+                    async with session.post(f"{url}/profiles/ramakrishna/chat",
+                                            json={"message": "Hello", "session_id": "s1"}) as r:
+                        if r.status != 409:
+                            return f"session reused across profiles returned {r.status}"
+            finally:
+                await runner.cleanup()
+        return None
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        failure = asyncio.run(run(tmp))
+    if failure:
+        print(f"❌ {failure}")
+        return False
+    
+    print("✅ Server lists, searches and serves profiles, and chats over JSON and SSE with sessions")
+    return True
+
+def test_batch_runner():
+    """Test batch answering: dedup, invalid lines, incremental output and resuming after a crash."""
+    print("\nTesting Batch Runner...")
+    
+    import asyncio
+    import tempfile
+    from types import SimpleNamespace
+    from batch_runner import completed_keys, run_batch
+    
+    class StubCompletions:
+        calls = 0
+        flaky = True
+        
+        async def create(self, stream=False, **kwargs):
+            StubCompletions.calls += 1
+            question = kwargs["messages"][-1]["content"]
+            await asyncio.sleep(0.01)
+            if "flaky" in question and StubCompletions.flaky:
+                raise RuntimeError("upstream failure")
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"On {question}"))])
+    
+    client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    profile_manager = ProfileManager()
+    records = [{"id": i, "profile_id": "ramana-maharshi", "question": f"What is silence number {i}?"} for i in range(20)]
+    records += [
+        {"id": "repeat", "profile_id": "ramana-maharshi", "question": "what is SILENCE number 3"},
+        {"profile_id": "ramakrishna", "question": "What is silence number 3?"},
+        {"profile_id": "ramana-maharshi", "question": "A flaky question"},
+        {"id": "flaky-again", "profile_id": "ramana-maharshi", "question": "a flaky question"},
+        {"profile_id": "nobody", "question": "Hello?"},
+        {"question": "No profile"},
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path, output_path = Path(tmp) / "questions.jsonl", Path(tmp) / "answers.jsonl"
+        input_path.write_text('\n'.join(json.dumps(record) for record in records) + '\nnot json\n', encoding="utf-8")
+        
+        stats = asyncio.run(run_batch(input_path, output_path, profile_manager, client, concurrency=4))
+        results = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+        summary = stats.summary()
+        if (summary["answered"], summary["failed"], summary["duplicates"], summary["invalid"]) != (21, 3, 1, 2):
+            print(f"❌ Unexpected first run: {summary}")
+            return False
+        if len(results) != 25 or StubCompletions.calls != 22 or summary["prompt_tokens"] <= 0:
+            print(f"❌ {len(results)} results written for {StubCompletions.calls} model calls")
+            return False
+        repeat = next((result for result in results if result["id"] == "repeat"), {})
+        if repeat.get("duplicate_of") != repeat.get("key") or repeat.get("response") != "On What is silence number 3?":
+            print(f"❌ Duplicate record has no result line of its own: {repeat}")
+            return False
+        flaky_again = next((result for result in results if result["id"] == "flaky-again"), {})
+        if flaky_again.get("status") != "error" or "duplicate_of" in flaky_again:
+            print(f"❌ Duplicate of a failed request not marked failed: {flaky_again}")
+            return False
+        
+        # A crash mid-write leaves a torn last line behind
+        kept = output_path.read_text(encoding="utf-8").splitlines()[:10]
+        output_path.write_text('\n'.join(kept) + '\n{"key": "torn', encoding="utf-8")
+        kept_ok = [result for result in map(json.loads, kept) if result["status"] == "ok"]
+        done = {result["key"] for result in kept_ok}
+        StubCompletions.flaky = False
+        StubCompletions.calls = 0
+        stats = asyncio.run(run_batch(input_path, output_path, profile_manager, client, concurrency=4))
+        if stats.resumed != len(kept_ok) or stats.answered != 22 - len(done) or StubCompletions.calls != 22 - len(done):
+            print(f"❌ Resumed run redid or skipped work: {stats.summary()}")
+            return False
+        ids = {result["id"] for result in map(json.loads, output_path.read_text(encoding="utf-8").splitlines())
+               if result["status"] == "ok"}
+        if len(completed_keys(output_path)) != 22 or not {str(i) for i in range(20)} | {"repeat", "flaky-again"} <= ids:
+            print("❌ Resumed output is missing answers")
+            return False
+    
+        # Edited input: lines shift and one question changes; results follow the content, not the line
+        edited = [{"profile_id": "ramana-maharshi", "question": "A brand new question"}] + records
+        edited[1] = dict(records[0], question="What is stillness number 0?")
+        input_path.write_text('\n'.join(json.dumps(record) for record in edited) + '\n', encoding="utf-8")
+        StubCompletions.calls = 0
+        stats = asyncio.run(run_batch(input_path, output_path, profile_manager, client, concurrency=4))
+        if StubCompletions.calls != 2 or stats.stale != 1 or stats.resumed != len(edited) - 4:
+            print(f"❌ Resume after editing the input misattributed results: {stats.summary()}")
+            return False
+    
+    print(f"✅ Batch runner dedups, skips bad lines and resumes ({len(done)} answers kept after a crash)")
+    return True
+
+def test_mock_llm():
+    """Test the offline mock backend: determinism, latency, streaming and injected failures."""
+    print("\nTesting Mock LLM Backend...")
+    
+    import asyncio
+    import os
+    import random
+    import llm_client
+    from llm_client import LLMClient, api_key_missing, get_llm_client
+    from mock_llm import LatencyDistribution, MockLLM
+    from profile_agent import ProfileAgent
+    
+    spread = LatencyDistribution.parse("uniform:0.1,0.2")
+    rng = random.Random(1)
+    if not all(0.1 <= spread.sample(rng) <= 0.2 for _ in range(100)) or LatencyDistribution.parse("0.3").sample(rng) != 0.3:
+        print("❌ Latency distribution sampled out of range")
+        return False
+    try:
+        LatencyDistribution.parse("uniform:0.1")
+        print("❌ Malformed latency spec was accepted")
+        return False
+    except ValueError:
+        pass
+    
+    profile_data = ProfileManager().get_profile("ramana-maharshi")
+    
+    async def run():
+        first = ProfileAgent(profile_data, MockLLM(reply_words=20))
+        again = ProfileAgent(profile_data, MockLLM(reply_words=20, seed=7))
+        answer = await first.complete("How do I quiet the mind?")
+        if answer != await again.complete("How do I quiet the mind?") or answer == await first.complete("What is grace?"):
+            return "answers are not determined by the request"
+        
+        streaming = ProfileAgent(profile_data, MockLLM(latency=0.03, chunk_delay=0.005, chunk_words=4, reply_words=20))
+        chunks = [chunk async for chunk in streaming.respond_stream("How do I quiet the mind?")]
+        metrics = streaming.turn_metrics[-1]
+        if ''.join(chunks) != answer or len(chunks) != 5 or not 0.03 <= metrics.time_to_first_token < metrics.total_latency:
+            return f"unexpected stream: {len(chunks)} chunks, {metrics}"
+        
+        mock = MockLLM(reply_words=20, failures=[429, 503], retry_after=0)
+        client = LLMClient(backend=mock)
+        if await ProfileAgent(profile_data, client).complete("How do I quiet the mind?") != answer:
+            return "answer changed after retried failures"
+        if client.retries != 2 or mock.stats() != {"requests": 3, "errors": 2}:
+            return f"injected 429/503 were not retried: {client.stats()} {mock.stats()}"
+        
+        failing = LLMClient(backend=MockLLM(error_rate=1.0), max_retries=1)
+        reply = await ProfileAgent(profile_data, failing).respond("How do I quiet the mind?")
+        if "difficulty" not in reply or failing.failures != 1:
+            return f"persistent 5xx did not surface as an error: {reply}"
+        return None
+    
+    saved = {name: os.environ.get(name) for name in ("LLM_BACKEND", "OPENAI_API_KEY")}
+    base_delay = llm_client.RETRY_BASE_DELAY
+    llm_client.RETRY_BASE_DELAY = 0.01
+    try:
+        os.environ.pop("OPENAI_API_KEY", None)
+        os.environ["LLM_BACKEND"] = "mock"
+        if api_key_missing() or not isinstance(get_llm_client().backend, MockLLM):
+            print("❌ LLM_BACKEND=mock did not select the mock backend")
+            return False
+        failure = asyncio.run(run())
+    finally:
+        llm_client.RETRY_BASE_DELAY = base_delay
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    if failure:
+        print(f"❌ {failure}")
+        return False
+    
+    print("✅ Mock backend answers deterministically, streams on schedule and injects retried 429/5xx")
+    return True
+
+def test_benchmark_suite():
+    """Test the benchmark suite's scenarios, baseline comparison and corpus conformance."""
+    print("\nTesting Benchmark Suite...")
+    
+    from benchmark import compare_results, run_suite
+    from profile_validation import validate_data
+    from synthetic_corpus import generate_corpus
+    
+    invalid = [profile["id"] for profile in generate_corpus(200) + generate_corpus(20, richness=6)
+               if validate_data(profile)]
+    if invalid:
+        print(f"❌ Synthetic profiles do not match the schema: {invalid[:3]}")
+        return False
+    
+    results = run_suite(count=30, turns=20)
+    expected = {"load.eager", "load.lazy", "load.snapshot", "search.keyword", "semantics.question",
+                "prompt.build_cold", "respond.sequential", "respond.concurrent_10ms"}
+    if not expected <= set(results) or any(result["value"] <= 0 for result in results.values()):
+        print(f"❌ Missing or empty scenarios: {sorted(expected - set(results))}")
+        return False
+    
+    baseline = {"fast": {"value": 10.0, "unit": "µs"}, "rate": {"value": 100.0, "unit": "turns/s"}}
+    current = {"fast": {"value": 14.0, "unit": "µs"}, "rate": {"value": 90.0, "unit": "turns/s"},
+               "added": {"value": 1.0, "unit": "ms"}}
+    rows = {name: (slowdown, regressed) for name, slowdown, regressed in compare_results(current, baseline, 0.25)}
+    if not rows["fast"][1] or rows["rate"][1] or rows["added"] != (None, False) or abs(rows["rate"][0] - 1 / 9) > 1e-9:
+        print(f"❌ Wrong baseline comparison: {rows}")
+        return False
+    
+    print(f"✅ Suite times {len(results)} scenarios, flags regressions against a baseline, corpus conforms to the schema")
+    return True
+
+def test_profile_graph():
+    """Test link graph loading, neighbour, k-hop, path and lineage queries, and reload on change."""
+    print("\nTesting Profile Link Graph...")
+    
+    import os
+    import shutil
+    import tempfile
+    from profile_graph import IN, OUT, ProfileGraph, edge_tuples, iter_edges
+    
+    edges = [
+        {"from": "totapuri", "to": "ramakrishna", "type": "teacher_of"},
+        {"from": "ramakrishna", "to": "vivekananda", "type": "teacher_of", "evidence": ["src:1"]},
+        {"from": "ramakrishna", "to": "vivekananda", "type": "teacher_of"},
+        {"from": "papaji", "to": "ramana-maharshi", "type": "disciple_of"},
+        {"from": "vivekananda", "to": "ramana-maharshi", "type": "influence"},
+        {"from": "ramana-maharshi", "to": "nisargadatta-maharaj", "type": "influence"},
+        {"from": "broken"},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        links = Path(tmp) / "links" / "edges.json"
+        links.parent.mkdir()
+        links.write_text(json.dumps(edges, indent=2), encoding="utf-8")
+        
+        # A tiny read size splits records across reads
+        skipped = []
+        graph = ProfileGraph(edge_tuples(iter_edges(links, read_size=16), skipped))
+        if skipped != [6] or graph.edge_count != 5 or len(graph) != 6:
+            print(f"❌ Unexpected graph: {graph.stats()}, skipped {skipped}")
+            return False
+        
+        checks = {
+            "neighbors": (graph.neighbors("ramakrishna"), ["totapuri", "vivekananda"]),
+            "out": (graph.neighbors("ramakrishna", direction=OUT), ["vivekananda"]),
+            "typed in": (graph.neighbors("ramana-maharshi", "influence", IN), ["vivekananda"]),
+            "unknown type": (graph.neighbors("ramakrishna", "sibling_of"), []),
+            "k-hop": (graph.k_hop("totapuri", 3, direction=OUT),
+                      {"ramakrishna": 1, "vivekananda": 2, "ramana-maharshi": 3}),
+            "path": (graph.shortest_path("totapuri", "nisargadatta-maharaj"),
+                     ["totapuri", "ramakrishna", "vivekananda", "ramana-maharshi", "nisargadatta-maharaj"]),
+            "no path": (graph.shortest_path("nisargadatta-maharaj", "totapuri", direction=OUT), None),
+            "lineage": (graph.lineage("vivekananda"), {"ramakrishna": 1, "totapuri": 2}),
+            "disciple_of lineage": (graph.lineage("papaji"), {"ramana-maharshi": 1}),
+        }
+        for name, (actual, expected) in checks.items():
+            if actual != expected:
+                print(f"❌ {name}: expected {expected}, got {actual}")
+                return False
+        
+        profiles_dir = Path(tmp) / "profiles"
+        shutil.copytree("profiles", profiles_dir)
+        profile_manager = ProfileManager(str(profiles_dir))
+        if profile_manager.linked_profiles("ramana-maharshi", "influence") != ["vivekananda", "nisargadatta-maharaj"]:
+            print(f"❌ ProfileManager links: {profile_manager.linked_profiles('ramana-maharshi', 'influence')}")
+            return False
+        
+        links.write_text(json.dumps(edges[:1]), encoding="utf-8")
+        os.utime(links, ns=(1, 1))
+        result = profile_manager.refresh()
+        if result['links'] != ["edges.json"] or profile_manager.linked_profiles("ramana-maharshi"):
+            print(f"❌ Changed links file not reloaded: {result}")
+            return False
+    
+    print("✅ Link graph answers neighbour, k-hop, path and lineage queries and reloads on change")
+    return True
+
+def test_linked_prompt_enrichment():
+    """Test that tradition questions quote linked profiles' synopses, cached until links or profiles change."""
+    print("\nTesting Linked Profile Prompt Enrichment...")
+    
+    import os
+    import shutil
+    import tempfile
+    from profile_agent import ProfileAgent, console
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_dir = Path(tmp) / "profiles"
+        shutil.copytree("profiles", profiles_dir)
+        links = Path(tmp) / "links" / "edges.json"
+        links.parent.mkdir()
+        links.write_text(json.dumps([
+            {"from": "ramakrishna", "to": "ramana-maharshi", "type": "teacher_of"},
+            {"from": "ramana-maharshi", "to": "not-in-corpus", "type": "influence"},
+        ]), encoding="utf-8")
+        console.quiet = True
+        try:
+            profile_manager = ProfileManager(str(profiles_dir))
+            agent = ProfileAgent(profile_manager.get_profile("ramana-maharshi"), None,
+                                 linked_sections=profile_manager.linked_section)
+            
+            prompt = agent._build_focused_system_prompt("Who was your teacher, and what is your lineage?")
+            synopsis = profile_manager.get_profile("ramakrishna").ai.synopsis
+            if "Ramakrishna (teacher of → you)" not in prompt or synopsis[:40] not in prompt:
+                print("❌ Linked synopsis missing from a lineage question's prompt")
+                return False
+            if agent.last_prompt.section_tokens.get('tradition', 0) <= 0:
+                print(f"❌ Tradition section not counted: {agent.last_prompt.section_tokens}")
+                return False
+            if "RELATED FIGURES" in agent._build_focused_system_prompt("How do I practice self-inquiry?"):
+                print("❌ Linked synopses added to an unrelated question")
+                return False
+            section = profile_manager.linked_section("ramana-maharshi")
+            if profile_manager.linked_section("ramana-maharshi") is not section:
+                print("❌ Linked section rebuilt instead of cached")
+                return False
+            
+            # A changed neighbour drops the cached section
+            ramakrishna = profile_manager.get_profile("ramakrishna").to_dict()
+            ramakrishna["ai"]["synopsis"] = "Zzlinked mystic of Dakshineswar."
+            profile_manager.add_profile(ramakrishna)
+            if "Zzlinked mystic" not in agent._build_focused_system_prompt("Tell me about your teacher"):
+                print("❌ Updated neighbour synopsis not picked up")
+                return False
+            
+            # The first section built, graph load included, is cached too
+            fresh = ProfileManager(str(profiles_dir))
+            section = fresh.linked_section("ramana-maharshi")
+            if section is None or fresh.linked_section("ramana-maharshi") is not section:
+                print("❌ Section built while loading the graph was not cached")
+                return False
+            
+            # A neighbour that only appears later is quoted once refresh() adds it
+            parked = Path(tmp) / "ramakrishna.json"
+            shutil.move(str(profiles_dir / "ramakrishna.json"), parked)
+            partial = ProfileManager(str(profiles_dir))
+            if partial.linked_section("ramana-maharshi") is not None:
+                print("❌ Section quotes a profile that is not loaded")
+                return False
+            shutil.move(str(parked), profiles_dir / "ramakrishna.json")
+            if partial.refresh()["added"] != ["ramakrishna"] or partial.linked_section("ramana-maharshi") is None:
+                print("❌ Added neighbour not picked up by the cached linked section")
+                return False
+            
+            # So does a changed links file
+            links.write_text("[]", encoding="utf-8")
+            os.utime(links, ns=(1, 1))
+            profile_manager.refresh()
+            if "RELATED FIGURES" in agent._build_focused_system_prompt("Tell me about your teacher"):
+                print("❌ Removed link still quoted after refresh")
+                return False
+        finally:
+            console.quiet = False
+    
+    print("✅ Lineage questions quote cached synopses of linked profiles")
+    return True
+
+def test_provenance_index():
+    """Test source deduplication, evidence resolution, reliable-claim queries and claim weighting."""
+    print("\nTesting Provenance Index...")
+    
+    from profile_model import Profile
+    from prompt_fragments import PromptFragments
+    from provenance_index import ProvenanceIndex, source_key
+    
+    gospel = {"id": "src:1", "title": "The Gospel of Sri Ramakrishna", "reliability": 0.9,
+              "url": "https://archive.org/details/TheGospelOfSriRamakrishna"}
+    base = ProfileManager().get_profile("ramakrishna").to_dict()
+    first = dict(base, id="first", claims=[
+        {"text": "Well sourced claim.", "evidence": ["src:1"]},
+        {"text": "Weakly sourced claim.", "evidence": ["src:2"]},
+        {"text": "Unsourced claim.", "evidence": ["src:9"]},
+    ], provenance=dict(base["provenance"], sources=[gospel, {"id": "src:2", "title": "A rumour", "reliability": 0.3}]))
+    # Same book under another local id, URL spelled differently
+    second = dict(base, id="second", claims=[{"text": "Shared source claim.", "evidence": ["ref:a"]}],
+                  provenance=dict(base["provenance"], sources=[
+                      dict(gospel, id="ref:a", reliability=0.8,
+                           url="http://www.archive.org/details/TheGospelOfSriRamakrishna/")]))
+    
+    index = ProvenanceIndex([("first", first), ("second", second)])
+    key = source_key(gospel["title"], gospel["url"])
+    if len(index) != 2 or sorted(index.entries[key].cited_by) != ["first", "second"]:
+        print(f"❌ Sources not deduplicated: {index.bibliography()}")
+        return False
+    # Generic titles without a URL stay per profile; URL paths keep their case
+    generic = {"id": "src:1", "title": "Primary discourse", "reliability": 0.5}
+    third = dict(base, id="third", provenance=dict(base["provenance"], sources=[generic]))
+    fourth = dict(base, id="fourth", provenance=dict(base["provenance"], sources=[generic]))
+    separate = ProvenanceIndex([("third", third), ("fourth", fourth)])
+    if len(separate) != 2 or source_key("Primary discourse", None, "third") == source_key("Primary discourse", None, "fourth"):
+        print(f"❌ Same URL-less title merged across profiles: {separate.bibliography()}")
+        return False
+    if source_key(None, "HTTPS://WWW.Archive.org/details/Gospel") != source_key(None, "https://archive.org/details/Gospel") \
+            or source_key(None, "https://archive.org/details/gospel") == source_key(None, "https://archive.org/details/Gospel"):
+        print("❌ URL case handled wrong: only scheme and host are case-insensitive")
+        return False
+    citation = index.resolve("second", "ref:a")
+    if citation is None or citation.key != key or citation.reliability != 0.8 or index.resolve("first", "src:9"):
+        print(f"❌ Evidence resolution wrong: {citation}")
+        return False
+    
+    backed = [(claim.profile_id, claim.text) for claim in index.claims_backed_by(0.8)]
+    if backed != [("first", "Well sourced claim."), ("second", "Shared source claim.")]:
+        print(f"❌ Reliable claim query wrong: {backed}")
+        return False
+    if [claim.text for claim in index.claims_backed_by(0.0, ["first"])][-1] != "Unsourced claim.":
+        print("❌ Claims not ordered by reliability")
+        return False
+    
+    index.remove("first")
+    if key not in index.entries or len(index) != 1 or index.claims_backed_by(0.9):
+        print(f"❌ Removal left stale entries: {index.bibliography()}")
+        return False
+    
+    fragments = PromptFragments(Profile.from_dict(first))
+    claim_weights = [float(fragments.item_weights[i]) for i, (section, group, _) in enumerate(fragments.items)
+                     if section == 'philosophy' and group == 0]
+    if claim_weights != sorted(claim_weights, reverse=True) or len(set(claim_weights)) != 3 or claim_weights[2] != 0.5:
+        print(f"❌ Claims not weighted by evidence reliability: {claim_weights}")
+        return False
+    
+    profile_manager = ProfileManager()
+    if profile_manager.provenance.resolve("ramakrishna", "src:1") is None:
+        print("❌ ProfileManager.provenance does not resolve corpus evidence")
+        return False
+    
+    print("✅ Sources deduplicated across profiles; evidence resolves and reliable claims come from the index")
+    return True
+
+def test_facet_index():
+    """Test facet filters (OR within a facet, AND across), date ranges, disjunctive counts and updates."""
+    print("\nTesting Facet Index...")
+    
+    from facet_index import FacetIndex, parse_filter, parse_filters
+    
+    index = FacetIndex([
+        ("a", {"traditions": ["Zen"], "status": "verified", "born": "1850-03-01", "last_reviewed": "2025-01-02"}),
+        ("b", {"traditions": ["Sufism"], "schools": ["Chishti"], "status": "draft", "born": "1901-01-01"}),
+        ("c", {"traditions": ["Zen", "Taoism"], "status": "reviewed", "born": "1899-12-31"}),
+        ("d", {"traditions": ["Bhakti"], "status": "verified"}),
+    ])
+    values, ranges = parse_filters(["tradition=zen,Sufism", "born=1800..1900"])
+    result = index.query(values, ranges)
+    if result.ids != ["a", "c"] or result.total != 2:
+        print(f"❌ Filter matched {result.ids}")
+        return False
+    # Tradition counts ignore the tradition filter itself: Sufism's "b" is excluded only by its birth date
+    if result.counts["tradition"] != {"Zen": 2, "Taoism": 1} or result.counts["born"] != {"1800s": 2, "1900s": 1}:
+        print(f"❌ Facet counts wrong: {result.counts}")
+        return False
+    if index.query({"status": ["verified"]}, limit=1, offset=1).ids != ["d"]:
+        print("❌ Paging wrong")
+        return False
+    
+    try:
+        parse_filter("colour=blue")
+        print("❌ Unknown facet accepted")
+        return False
+    except ValueError:
+        pass
+    
+    index.remove("a")
+    index.add("e", {"traditions": ["Zen"], "status": "draft", "born": "1880"})
+    if index.query({"tradition": ["zen"]}).ids != ["e", "c"] or index.facet_counts()["status"].get("verified") != 1:
+        print(f"❌ Updates not reflected: {index.query({'tradition': ['zen']}).ids}")
+        return False
+    
+    profile_manager = ProfileManager(lazy=True)
+    advaita = profile_manager.filter_profiles(["tradition=Advaita"]).ids
+    profile_manager.remove_profile(advaita[0])
+    if not advaita or profile_manager.filter_profiles(["tradition=Advaita"]).ids != advaita[1:]:
+        print(f"❌ ProfileManager facets out of sync: {advaita}")
+        return False
+    
+    print("✅ Facet filters, date ranges and sidebar counts come from bitmaps and follow profile changes")
+    return True
+
+def test_geo_index():
+    """Test radius and bounding-box queries against a brute-force scan, antimeridian wrap and updates."""
+    print("\nTesting Geo Index...")
+    
+    import numpy as np
+    from geo_index import GeoIndex, haversine_km
+    
+    rng = np.random.default_rng(7)
+    lats, lngs = rng.uniform(-89, 89, 5000), rng.uniform(-180, 180, 5000)
+    index = GeoIndex((f"p{i}", {"geo": [{"place": f"place {i}", "lat": lat, "lng": lng}]})
+                     for i, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist())))
+    for lat, lng, radius in ((10.0, 77.0, 800.0), (0.0, 179.5, 1500.0), (85.0, -30.0, 900.0)):
+        hits = index.within_radius(lat, lng, radius)
+        expected = {f"p{i}" for i in np.flatnonzero(haversine_km(lat, lng, lats, lngs) <= radius)}
+        distances = [hit.distance_km for hit in hits]
+        if {hit.profile_id for hit in hits} != expected or distances != sorted(distances):
+            print(f"❌ Radius query around ({lat}, {lng}) found {len(hits)} profiles, expected {len(expected)}")
+            return False
+    # West > east crosses the antimeridian
+    hits = index.within_bbox(-10, 170, 10, -170)
+    expected = {f"p{i}" for i in np.flatnonzero((np.abs(lats) <= 10) & (np.abs(lngs) >= 170))}
+    if {hit.profile_id for hit in hits} != expected or not expected:
+        print(f"❌ Bounding box across the antimeridian found {len(hits)} profiles, expected {len(expected)}")
+        return False
+    
+    # One hit per profile, at its nearest place
+    index.add("two-places", {"geo": [{"place": "far", "lat": 40.0, "lng": 10.0},
+                                     {"place": "near", "lat": 45.0, "lng": 10.0}]})
+    hits = [hit for hit in index.within_radius(45.1, 10.0, 2000) if hit.profile_id == "two-places"]
+    index.remove("p0")
+    if [hit.place for hit in hits] != ["near"] or index.within_radius(lats[0], lngs[0], 0.001):
+        print(f"❌ Nearest place or removal wrong: {hits}")
+        return False
+    
+    profile_manager = ProfileManager(lazy=True)
+    if [hit.profile_id for hit in profile_manager.profiles_near(23.0, 91.0, 50)] != ["anandamayi-ma"]:
+        print("❌ ProfileManager.profiles_near did not find Kheora from the manifest")
+        return False
+    
+    print("✅ Radius and bounding-box queries match a full scan, only reading nearby grid cells")
+    return True
+
 def main():
     """Run all tests."""
     print("CLEARLIST Profile Agent System Tests")
@@ -158,7 +1691,32 @@ def main():
         test_profile_loading,
         test_profile_data_structure,
         test_profile_search,
-        test_system_prompt_generation
+        test_system_prompt_generation,
+        test_semantic_classifier,
+        test_prompt_fragment_cache,
+        test_search_index,
+        test_lazy_loading,
+        test_incremental_refresh,
+        test_snapshot,
+        test_profile_model,
+        test_schema_validation,
+        test_ask_many,
+        test_streaming_response,
+        test_response_cache,
+        test_qa_lookup,
+        test_prompt_item_ranking,
+        test_prompt_token_budget,
+        test_conversation_memory,
+        test_llm_client,
+        test_profile_server,
+        test_batch_runner,
+        test_mock_llm,
+        test_benchmark_suite,
+        test_profile_graph,
+        test_linked_prompt_enrichment,
+        test_provenance_index,
+        test_facet_index,
+        test_geo_index
     ]
     
     passed = 0
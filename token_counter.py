@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Local token counting for CLEARLIST prompt budgets.
+
+Uses tiktoken when it is installed and its encoding is available (it is
+downloaded once and cached by tiktoken), otherwise a fast heuristic that
+splits words, numbers and symbols the way BPE tokenizers roughly do.
+Counts are memoized per text, since prompts are built from a small set of
+repeated fragments.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Optional
+
+try:
+    # Optional: exact counts for OpenAI models
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_ENCODING = "o200k_base"
+
+# One match per estimated token: up to 6 letters, up to 3 digits, or a symbol
+_PIECES = re.compile(r"[^\W\d_]{1,6}|\d{1,3}|[^\w\s]|_")
+
+
+def heuristic_count(text: str) -> int:
+    """Approximate BPE token count without a vocabulary.
+
+    Common words are a single token and long words split every ~6 letters;
+    digits group in threes; each symbol or emoji counts as one token.
+    """
+    return len(_PIECES.findall(text))
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken if possible, else with heuristic_count."""
+
+    def __init__(self, model: Optional[str] = None, cache_size: int = 4096):
+        self.encoding = _load_encoding(model or os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
+        self.name = f"tiktoken:{self.encoding.name}" if self.encoding is not None else "heuristic"
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    def _count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return heuristic_count(text)
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(model: str):
+    """tiktoken encoding for a model, or None if unavailable (failures are remembered)."""
+    if tiktoken is None or os.getenv("TOKENIZER", "").lower() == "heuristic":
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:
+        return None
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """Shared counter for a model (OPENAI_MODEL by default)."""
+    return TokenCounter(model)
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text with the default model's counter."""
+    return get_token_counter().count(text)